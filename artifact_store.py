@@ -0,0 +1,336 @@
+"""
+산출물 보관소 - 스크린샷 중복 제거, 보관 기간/용량/세션 정책, 오래된 스크린샷 압축 보관
+
+야간 스케줄을 몇 주 돌리면 screenshot/test_results 폴더가 정리되지 않아 디스크가 가득 찹니다.
+
+- 내용 기반 중복 제거: 저장할 이미지의 픽셀 해시가 이미 저장한 파일과 같으면 새로 쓰지 않고
+  기존 파일 경로를 반환 (연속 폴링으로 같은 화면을 여러 번 저장하는 경우)
+  캡처 인덱스에는 해시와 함께 기록되므로 세션/단계별 조회는 그대로 동작합니다.
+- 보관 정책 (RetentionPolicy): 기간(일), 전체 용량(MB), 최근 세션 수 중 설정한 조건을 넘는
+  스크린샷을 오래된 것부터 삭제하고, 리포트 폴더는 기간 기준으로 삭제
+- 압축 보관: compact_days보다 오래된 JPEG는 낮은 품질로 다시 인코딩해 날짜별 ZIP
+  (screenshot/archive/YYMMDD.zip)으로 묶고 원본을 삭제 (파일 수/클러스터 낭비 감소)
+- 정리/압축은 실행 종료 시 백그라운드 스레드에서 실행 (maintain_async)
+"""
+
+# 로그 설정을 가장 먼저 import
+import logger_setup
+
+import io
+import os
+import time
+import zipfile
+import threading
+from collections import OrderedDict
+from datetime import datetime
+from PIL import Image
+from constants import screenshot_dir, test_results_dir
+from capture_index import get_capture_index
+from artifact_writer import get_artifact_writer
+
+ARCHIVE_DIR_NAME = 'archive'
+ARCHIVE_QUALITY = 50
+# 중복 제거용 해시 → 파일 기록 최대 개수
+_MAX_DIGESTS = 4096
+_DAY = 24 * 60 * 60
+
+
+class RetentionPolicy:
+    """보관 정책 (0이면 해당 조건 사용 안 함, 기본값은 모두 0 - 설정에서 켠 조건만 적용)
+
+    Args:
+        max_age_days: 스크린샷 보관 기간
+        max_mb: 스크린샷 폴더 전체 용량 한도 (압축 보관 포함)
+        max_sessions: 최근 N개 실행 세션의 스크린샷만 보관 (압축 보관 파일은 기간/용량 기준으로만 정리)
+        compact_days: 이 기간보다 오래된 스크린샷은 압축 보관
+        report_max_age_days: 리포트(test_results) 보관 기간
+    """
+
+    def __init__(self, max_age_days=0, max_mb=0, max_sessions=0, compact_days=0, report_max_age_days=0):
+        self.max_age_days = max_age_days
+        self.max_mb = max_mb
+        self.max_sessions = max_sessions
+        self.compact_days = compact_days
+        self.report_max_age_days = report_max_age_days
+
+    @classmethod
+    def from_settings(cls, settings):
+        return cls(max_age_days=settings.get("artifact_retention_days", 0),
+                   max_mb=settings.get("artifact_retention_mb", 0),
+                   max_sessions=settings.get("artifact_retention_sessions", 0),
+                   compact_days=settings.get("artifact_compact_days", 0),
+                   report_max_age_days=settings.get("report_retention_days", 0))
+
+
+class ArtifactStore:
+    """스크린샷/리포트 폴더 관리 (중복 제거 + 보관 정책 + 압축 보관)"""
+
+    def __init__(self, directory=screenshot_dir, results_dir=test_results_dir):
+        self.directory = directory
+        self.results_dir = results_dir
+        self.archive_dir = os.path.join(directory, ARCHIVE_DIR_NAME)
+        self.dedup = True
+        self.policy = RetentionPolicy()
+        self._digests = OrderedDict()  # 픽셀 해시 → 저장 경로 (최근 사용 순)
+        self._lock = threading.Lock()
+        self._maintenance = None
+        self.deduplicated = 0
+        self.deleted = 0
+        self.archived = 0
+        self.freed_bytes = 0
+
+    # ------------------------------------------------------------------
+    # 중복 제거
+    # ------------------------------------------------------------------
+    def lookup(self, digest):
+        """같은 내용으로 이미 저장한 파일 경로 (없거나 삭제되었으면 None)"""
+        with self._lock:
+            path = self._digests.get(digest)
+            if path is None:
+                return None
+            self._digests.move_to_end(digest)
+        writing = not get_artifact_writer().wait_for(path, 0)
+        if writing or os.path.exists(path):
+            with self._lock:
+                self.deduplicated += 1
+            return path
+        with self._lock:
+            self._digests.pop(digest, None)
+        return None
+
+    def remember(self, digest, path):
+        with self._lock:
+            self._digests[digest] = path
+            self._digests.move_to_end(digest)
+            while len(self._digests) > _MAX_DIGESTS:
+                self._digests.popitem(last=False)
+
+    def _forget(self, filenames):
+        """삭제/압축할 파일은 중복 제거 대상에서 제외 (잠금 안에서 호출)"""
+        for digest, path in list(self._digests.items()):
+            if os.path.basename(path) in filenames:
+                del self._digests[digest]
+
+    # ------------------------------------------------------------------
+    # 보관 정책
+    # ------------------------------------------------------------------
+    def _files(self):
+        """스크린샷 파일별 {이름: (마지막 사용 시각, 세션 집합, 크기)} (인덱스 기록 + 기록 없는 파일)"""
+        files = {}
+        for entry in get_capture_index().entries():
+            if entry.get('archive'):
+                continue
+            last, sessions, size = files.get(entry['file'], (0, set(), 0))
+            if entry.get('session'):
+                sessions.add(entry['session'])
+            files[entry['file']] = (max(last, entry['time']), sessions, size)
+        result = {}
+        if not os.path.isdir(self.directory):
+            return result
+        for item in os.scandir(self.directory):
+            if not item.is_file() or not item.name.lower().endswith(('.jpg', '.png')):
+                continue
+            stat = item.stat()
+            last, sessions, _ = files.get(item.name, (stat.st_mtime, set(), 0))
+            result[item.name] = (last, sessions, stat.st_size)
+        return result
+
+    def _archives(self):
+        """압축 보관 파일 [(이름, 수정 시각, 크기)]"""
+        if not os.path.isdir(self.archive_dir):
+            return []
+        return [(item.name, item.stat().st_mtime, item.stat().st_size)
+                for item in os.scandir(self.archive_dir) if item.name.endswith('.zip')]
+
+    def apply_retention(self, policy=None):
+        """보관 정책을 넘는 스크린샷/압축 보관/리포트 삭제 → 삭제한 파일 수"""
+        policy = policy or self.policy
+        now = time.time()
+        index = get_capture_index()
+        files = self._files()
+        expired = set()
+
+        if policy.max_age_days:
+            cutoff = now - policy.max_age_days * _DAY
+            expired.update(name for name, (last, _, _) in files.items() if last < cutoff)
+        if policy.max_sessions:
+            kept_sessions = set(index.sessions()[-policy.max_sessions:])
+            if index.session:
+                kept_sessions.add(index.session)
+            # 세션 기록이 있는 파일만 대상 (이전 버전 파일은 기간/용량 조건으로 정리)
+            expired.update(name for name, (_, sessions, _) in files.items()
+                           if sessions and not sessions & kept_sessions)
+
+        archives = self._archives()
+        expired_archives = set()
+        if policy.max_age_days:
+            cutoff = now - policy.max_age_days * _DAY
+            expired_archives.update(name for name, mtime, _ in archives if mtime < cutoff)
+        if policy.max_mb:
+            # 오래된 것부터 삭제 (압축 보관 파일과 원본을 같은 기준으로)
+            limit = policy.max_mb * 1024 * 1024
+            candidates = [(last, 'file', name, size) for name, (last, _, size) in files.items() if name not in expired]
+            candidates += [(mtime, 'archive', name, size) for name, mtime, size in archives
+                           if name not in expired_archives]
+            total = sum(c[3] for c in candidates)
+            for last, kind, name, size in sorted(candidates):
+                if total <= limit:
+                    break
+                (expired if kind == 'file' else expired_archives).add(name)
+                total -= size
+
+        # 현재 세션에서 저장한 파일은 삭제하지 않음
+        if index.session:
+            expired = {name for name in expired if index.session not in files[name][1]}
+
+        with self._lock:
+            self._forget(expired)
+        removed = self._remove([os.path.join(self.directory, name) for name in expired])
+        removed += self._remove([os.path.join(self.archive_dir, name) for name in expired_archives])
+        if expired or expired_archives:
+            archived_names = {os.path.join(ARCHIVE_DIR_NAME, name) for name in expired_archives}
+            index.update(lambda entries: [e for e in entries
+                                          if e['file'] not in expired and e.get('archive') not in archived_names])
+
+        if policy.report_max_age_days and os.path.isdir(self.results_dir):
+            cutoff = now - policy.report_max_age_days * _DAY
+            reports = [item.path for item in os.scandir(self.results_dir)
+                       if item.is_file() and item.stat().st_mtime < cutoff]
+            removed += self._remove(reports)
+        return removed
+
+    def _remove(self, paths):
+        removed = 0
+        for path in paths:
+            try:
+                size = os.path.getsize(path)
+                os.remove(path)
+            except OSError as e:
+                print(f"보관 기간 지난 파일 삭제 실패 ({path}): {e}")
+                continue
+            removed += 1
+            with self._lock:
+                self.deleted += 1
+                self.freed_bytes += size
+        return removed
+
+    # ------------------------------------------------------------------
+    # 압축 보관
+    # ------------------------------------------------------------------
+    def compact(self, policy=None):
+        """compact_days보다 오래된 JPEG를 날짜별 ZIP으로 압축 보관 → 보관한 파일 수"""
+        policy = policy or self.policy
+        if not policy.compact_days:
+            return 0
+        cutoff = time.time() - policy.compact_days * _DAY
+        index = get_capture_index()
+        by_day = {}
+        for name, (last, sessions, _) in self._files().items():
+            if last >= cutoff or not name.lower().endswith('.jpg'):
+                continue
+            if index.session and index.session in sessions:
+                continue
+            day = datetime.fromtimestamp(last).strftime('%y%m%d')
+            by_day.setdefault(day, []).append(name)
+        if not by_day:
+            return 0
+
+        os.makedirs(self.archive_dir, exist_ok=True)
+        archived = {}
+        for day, names in sorted(by_day.items()):
+            archive_name = f"{day}.zip"
+            archive_path = os.path.join(self.archive_dir, archive_name)
+            temp_path = archive_path + '.tmp'
+            done = []
+            try:
+                with zipfile.ZipFile(temp_path, 'w', zipfile.ZIP_STORED) as target:
+                    # 같은 날짜의 기존 보관 파일 내용 유지
+                    if os.path.exists(archive_path):
+                        with zipfile.ZipFile(archive_path) as source:
+                            for info in source.infolist():
+                                target.writestr(info, source.read(info))
+                    existing = set(target.namelist())
+                    for name in sorted(names):
+                        if name in existing:
+                            done.append(name)
+                            continue
+                        with Image.open(os.path.join(self.directory, name)) as image:
+                            buffer = io.BytesIO()
+                            image.convert('RGB').save(buffer, format='JPEG', quality=ARCHIVE_QUALITY, optimize=True)
+                        target.writestr(name, buffer.getvalue())
+                        done.append(name)
+                os.replace(temp_path, archive_path)
+            except Exception as e:
+                print(f"스크린샷 압축 보관 실패 ({archive_name}): {e}")
+                if os.path.exists(temp_path):
+                    os.remove(temp_path)
+                continue
+            for name in done:
+                archived[name] = os.path.join(ARCHIVE_DIR_NAME, archive_name)
+
+        with self._lock:
+            self._forget(set(archived))
+
+        def mark(entries):
+            for entry in entries:
+                if entry['file'] in archived:
+                    entry['archive'] = archived[entry['file']]
+            return entries
+        index.update(mark)
+
+        for name in archived:
+            path = os.path.join(self.directory, name)
+            try:
+                size = os.path.getsize(path)
+                os.remove(path)
+            except OSError:
+                continue
+            with self._lock:
+                self.archived += 1
+                self.freed_bytes += size
+        print(f"🗜️ 스크린샷 {len(archived)}장 압축 보관 ({len(by_day)}일치)")
+        return len(archived)
+
+    def read_archived(self, entry):
+        """압축 보관된 스크린샷을 PIL 이미지로 읽음 (캡처 인덱스 기록 기준)"""
+        with zipfile.ZipFile(os.path.join(self.directory, entry['archive'])) as archive:
+            return Image.open(io.BytesIO(archive.read(entry['file'])))
+
+    # ------------------------------------------------------------------
+    # 백그라운드 정리
+    # ------------------------------------------------------------------
+    def maintain(self, policy=None):
+        """보관 정책 적용 후 압축 보관 (순서대로)"""
+        start_time = time.time()
+        try:
+            removed = self.apply_retention(policy)
+            archived = self.compact(policy)
+        except Exception as e:
+            print(f"산출물 정리 오류: {e}")
+            return
+        if removed or archived:
+            print(f"🧹 산출물 정리: 삭제 {removed}개, 압축 보관 {archived}장 ({time.time() - start_time:.2f}s)")
+
+    def maintain_async(self, policy=None):
+        """백그라운드 스레드에서 정리 (이미 정리 중이면 건너뜀)"""
+        with self._lock:
+            if self._maintenance is not None and self._maintenance.is_alive():
+                return None
+            self._maintenance = threading.Thread(target=self.maintain, args=(policy,),
+                                                 name='artifact-maintenance', daemon=True)
+            self._maintenance.start()
+            return self._maintenance
+
+    def stats(self):
+        with self._lock:
+            return {'deduplicated': self.deduplicated, 'deleted': self.deleted,
+                    'archived': self.archived, 'freed_bytes': self.freed_bytes}
+
+
+# 전역 산출물 보관소
+_artifact_store = ArtifactStore()
+
+
+def get_artifact_store():
+    """전역 산출물 보관소 반환"""
+    return _artifact_store
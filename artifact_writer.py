@@ -0,0 +1,195 @@
+"""
+스크린샷 백그라운드 저장 - 인코딩(JPEG/PNG)과 파일 쓰기를 실행 스레드에서 분리
+
+실패 증거/리포트/디버그 모드로 프레임을 저장할 때마다 실행 스레드가 인코딩과 디스크 쓰기를
+기다리면 캡처가 많은 단계가 그만큼 느려집니다. 저장 경로는 즉시 정해서 반환하고,
+실제 인코딩/쓰기는 작업 스레드가 처리합니다 (Pillow 인코더는 GIL을 놓고 실행됨).
+
+- 큐 크기 제한: 큐가 가득 차면 submit()이 빈 자리가 날 때까지 대기 (역압, 대기 횟수/시간 기록)
+- fsync 묶음 처리: 파일마다 fsync하지 않고 큐가 비었거나 fsync_batch개가 쌓이면 한 번에 처리
+- 파일을 바로 읽어야 하는 곳(OCR 테스트 다이얼로그 등)은 wait_for(path)로 해당 파일만 대기
+- 리포트 출력 전과 실행 종료 시 flush()로 남은 파일을 모두 기록 (프로세스 종료 시에도 atexit로 flush)
+"""
+
+# 로그 설정을 가장 먼저 import
+import logger_setup
+
+import os
+import time
+import atexit
+import queue
+import threading
+from PIL import Image
+
+DEFAULT_MAX_QUEUE = 32
+DEFAULT_FSYNC_BATCH = 16
+
+
+class ArtifactWriter:
+    """크기 제한 큐 + 작업 스레드 하나로 이미지 파일 저장
+
+    Args:
+        max_queue: 대기 중인 이미지 최대 개수 (넘으면 submit이 대기)
+        fsync_batch: 한 번에 fsync할 최대 파일 수
+        fsync: False면 fsync 생략 (OS 쓰기 캐시에 맡김)
+    """
+
+    def __init__(self, max_queue=DEFAULT_MAX_QUEUE, fsync_batch=DEFAULT_FSYNC_BATCH, fsync=True):
+        self.max_queue = max_queue
+        self.fsync_batch = fsync_batch
+        self.fsync = fsync
+        self._queue = queue.Queue(maxsize=max_queue)
+        self._thread = None
+        self._lock = threading.Lock()
+        self._done = threading.Condition(self._lock)
+        self._inflight = set()  # 아직 기록이 끝나지 않은 경로
+        self._reset_stats()
+
+    def _reset_stats(self):
+        self.submitted = 0
+        self.written = 0
+        self.failed = 0
+        self.bytes_written = 0
+        self.max_depth = 0
+        self.blocked = 0
+        self.blocked_seconds = 0.0
+        self.fsyncs = 0
+
+    def _ensure_worker(self):
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name='artifact-writer', daemon=True)
+                self._thread.start()
+
+    def submit(self, image, path):
+        """이미지 저장 예약 → 경로 즉시 반환 (큐가 가득 차면 빈 자리가 날 때까지 대기)"""
+        self._ensure_worker()
+        with self._lock:
+            self._inflight.add(path)
+            self.submitted += 1
+        try:
+            self._queue.put_nowait((image, path))
+        except queue.Full:
+            start_time = time.perf_counter()
+            self._queue.put((image, path))
+            with self._lock:
+                self.blocked += 1
+                self.blocked_seconds += time.perf_counter() - start_time
+        with self._lock:
+            self.max_depth = max(self.max_depth, self._queue.qsize())
+        return path
+
+    def _write(self, image, path):
+        """인코딩 + 쓰기 → 열린 파일 (fsync 전)"""
+        extension = os.path.splitext(path)[1].lower()
+        fmt = Image.registered_extensions().get(extension, 'PNG')
+        if fmt == 'JPEG' and image.mode not in ('RGB', 'L'):
+            image = image.convert('RGB')
+        f = open(path, 'wb')
+        try:
+            image.save(f, format=fmt)
+            f.flush()
+        except Exception:
+            f.close()
+            raise
+        return f
+
+    def _sync(self, batch):
+        """묶음의 파일을 fsync 후 닫고 완료 처리"""
+        for f, path in batch:
+            if f is None:
+                continue
+            try:
+                if self.fsync:
+                    os.fsync(f.fileno())
+                size = f.tell()
+                f.close()
+            except Exception as e:
+                print(f"스크린샷 저장 실패 ({path}): {e}")
+                f.close()
+                size = None
+            with self._lock:
+                if size is None:
+                    self.failed += 1
+                else:
+                    self.written += 1
+                    self.bytes_written += size
+        with self._lock:
+            if self.fsync and batch:
+                self.fsyncs += 1
+            for _, path in batch:
+                self._inflight.discard(path)
+            self._done.notify_all()
+        for _ in batch:
+            self._queue.task_done()
+
+    def _run(self):
+        batch = []
+        while True:
+            image, path = self._queue.get()
+            try:
+                batch.append((self._write(image, path), path))
+            except Exception as e:
+                print(f"스크린샷 저장 실패 ({path}): {e}")
+                with self._lock:
+                    self.failed += 1
+                batch.append((None, path))
+            if self._queue.empty() or len(batch) >= self.fsync_batch:
+                self._sync(batch)
+                batch = []
+
+    @property
+    def pending(self):
+        with self._lock:
+            return len(self._inflight)
+
+    def wait_for(self, path, timeout=None):
+        """해당 경로의 기록이 끝날 때까지 대기 (저장 예약된 경로가 아니면 즉시 반환)"""
+        with self._done:
+            return self._done.wait_for(lambda: path not in self._inflight, timeout)
+
+    def flush(self, timeout=None):
+        """남은 저장을 모두 기록할 때까지 대기 (리포트 출력 전/실행 종료 시)
+
+        Returns:
+            시간 안에 기록하지 못한 파일 수
+        """
+        remaining = self.pending
+        if not remaining:
+            return 0
+        print(f"⏳ 스크린샷 {remaining}장 저장 대기...")
+        start_time = time.time()
+        with self._done:
+            self._done.wait_for(lambda: not self._inflight, timeout)
+            left = len(self._inflight)
+        print(f"✓ 스크린샷 저장 대기 완료 ({time.time() - start_time:.2f}s)")
+        return left
+
+    def reset_stats(self):
+        with self._lock:
+            self._reset_stats()
+
+    def stats(self):
+        with self._lock:
+            return {'submitted': self.submitted, 'written': self.written, 'failed': self.failed,
+                    'pending': len(self._inflight), 'bytes': self.bytes_written,
+                    'max_depth': self.max_depth, 'blocked': self.blocked,
+                    'blocked_seconds': self.blocked_seconds, 'fsyncs': self.fsyncs}
+
+
+# 전역 저장기
+_artifact_writer = ArtifactWriter()
+atexit.register(_artifact_writer.flush)
+
+
+def get_artifact_writer():
+    """전역 스크린샷 저장기 반환"""
+    return _artifact_writer
+
+
+def format_artifact_writer_stats():
+    """저장기 통계 한 줄 요약"""
+    stats = _artifact_writer.stats()
+    return (f"저장 {stats['written']}장 ({stats['bytes'] / 1024 / 1024:.1f}MB), 실패 {stats['failed']}장, "
+            f"최대 대기열 {stats['max_depth']}/{_artifact_writer.max_queue}, "
+            f"역압 대기 {stats['blocked']}회 ({stats['blocked_seconds']:.2f}s), fsync {stats['fsyncs']}회")
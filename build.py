@@ -203,6 +203,7 @@ a = Analysis(
         'pytesseract',
         'openpyxl',
         'PIL',
+        'numpy',
         'requests',
         'packaging',
         'unittest',
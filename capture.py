@@ -0,0 +1,376 @@
+"""
+화면 캡처 백엔드 - 모든 명령어의 화면 캡처를 한 인터페이스로 처리
+
+pyautogui.screenshot은 호출마다 화면 DC/비트맵을 새로 만들고(Windows) 리눅스에서는
+외부 스크린샷 프로그램을 실행하므로 느립니다. 이 모듈은 용도별 백엔드를 제공합니다.
+
+- GdiBackend: Windows GDI BitBlt (ctypes) - 영역 크기별 메모리 DC/비트맵/버퍼를 재사용
+- X11Backend: Linux X11 (Pillow XCB 캡처, $DISPLAY 필요)
+- PyAutoGuiBackend: 기존 pyautogui 방식 (Windows에서 GDI를 사용할 수 없을 때)
+- ReplayBackend: 폴더의 이미지/동영상 프레임을 화면 대신 제공 (GUI 없는 결정적 테스트용)
+
+백엔드는 grab(x, y, width, height) / grab_screen()으로 PIL RGB 이미지를 반환하며
+여러 스레드(실행 스레드, 지연 검사 작업자)에서 동시에 호출해도 안전합니다.
+선택: 설정 capture_backend 또는 환경변수 PBBAUTO_CAPTURE (auto/gdi/x11/pyautogui/replay),
+리플레이 원본은 PBBAUTO_REPLAY (폴더, 이미지, 동영상 경로)
+"""
+
+# 로그 설정을 가장 먼저 import
+import logger_setup
+
+import os
+import sys
+import time
+import threading
+from collections import OrderedDict
+from PIL import Image
+from profiler import profile_span
+
+try:
+    from PIL import ImageGrab
+except ImportError:
+    ImageGrab = None
+
+try:
+    import cv2
+except ImportError:
+    cv2 = None
+
+IMAGE_EXTENSIONS = ('.png', '.jpg', '.jpeg', '.bmp')
+VIDEO_EXTENSIONS = ('.mp4', '.avi', '.mkv', '.mov', '.webm')
+
+# 실제 화면 백엔드 (설정 창 선택 항목) / 전체 백엔드 이름
+SCREEN_BACKENDS = ('auto', 'gdi', 'x11', 'pyautogui')
+BACKEND_NAMES = SCREEN_BACKENDS + ('replay',)
+
+# 리플레이 백엔드가 디코딩해 둘 프레임 수 (폴링 중 같은 프레임 반복 디코딩 방지)
+_REPLAY_CACHE = 16
+
+
+class PyAutoGuiBackend:
+    """pyautogui 기반 캡처 (기존 방식)"""
+
+    name = 'pyautogui'
+
+    def __init__(self):
+        import pyautogui
+        self._pyautogui = pyautogui
+
+    def grab(self, x, y, width, height):
+        return self._pyautogui.screenshot(region=(x, y, width, height))
+
+    def grab_screen(self):
+        return self._pyautogui.screenshot()
+
+    def close(self):
+        pass
+
+
+class GdiBackend:
+    """Windows GDI BitBlt 캡처 - 영역 크기별 메모리 DC/DIB 버퍼 재사용
+
+    Args:
+        max_buffers: 보관할 영역 크기별 버퍼 수 (명령어마다 영역 크기가 몇 가지로 반복됨)
+    """
+
+    name = 'gdi'
+
+    _SRCCOPY = 0x00CC0020
+    _CAPTUREBLT = 0x40000000
+    _DIB_RGB_COLORS = 0
+
+    def __init__(self, max_buffers=8):
+        import ctypes
+        from ctypes import wintypes
+
+        class BITMAPINFOHEADER(ctypes.Structure):
+            _fields_ = [('biSize', wintypes.DWORD), ('biWidth', wintypes.LONG), ('biHeight', wintypes.LONG),
+                        ('biPlanes', wintypes.WORD), ('biBitCount', wintypes.WORD),
+                        ('biCompression', wintypes.DWORD), ('biSizeImage', wintypes.DWORD),
+                        ('biXPelsPerMeter', wintypes.LONG), ('biYPelsPerMeter', wintypes.LONG),
+                        ('biClrUsed', wintypes.DWORD), ('biClrImportant', wintypes.DWORD)]
+
+        self._ctypes = ctypes
+        self._header_type = BITMAPINFOHEADER
+        self._user32 = ctypes.WinDLL('user32', use_last_error=True)
+        self._gdi32 = ctypes.WinDLL('gdi32', use_last_error=True)
+        # 64비트에서 핸들이 잘리지 않도록 반환/인자 형식 지정
+        self._user32.GetDC.restype = wintypes.HDC
+        self._user32.GetDC.argtypes = [wintypes.HWND]
+        self._user32.ReleaseDC.argtypes = [wintypes.HWND, wintypes.HDC]
+        self._gdi32.CreateCompatibleDC.restype = wintypes.HDC
+        self._gdi32.CreateCompatibleDC.argtypes = [wintypes.HDC]
+        self._gdi32.CreateCompatibleBitmap.restype = wintypes.HBITMAP
+        self._gdi32.CreateCompatibleBitmap.argtypes = [wintypes.HDC, ctypes.c_int, ctypes.c_int]
+        self._gdi32.SelectObject.restype = wintypes.HGDIOBJ
+        self._gdi32.SelectObject.argtypes = [wintypes.HDC, wintypes.HGDIOBJ]
+        self._gdi32.BitBlt.argtypes = [wintypes.HDC, ctypes.c_int, ctypes.c_int, ctypes.c_int, ctypes.c_int,
+                                       wintypes.HDC, ctypes.c_int, ctypes.c_int, wintypes.DWORD]
+        self._gdi32.GetDIBits.argtypes = [wintypes.HDC, wintypes.HBITMAP, wintypes.UINT, wintypes.UINT,
+                                          ctypes.c_void_p, ctypes.c_void_p, wintypes.UINT]
+        self._gdi32.DeleteObject.argtypes = [wintypes.HGDIOBJ]
+        self._gdi32.DeleteDC.argtypes = [wintypes.HDC]
+
+        self.max_buffers = max_buffers
+        self._buffers = OrderedDict()  # (width, height) → (mem_dc, bitmap, header, buffer)
+        self._lock = threading.Lock()
+
+    def _buffer(self, width, height, screen_dc):
+        key = (width, height)
+        entry = self._buffers.get(key)
+        if entry is not None:
+            self._buffers.move_to_end(key)
+            return entry
+        mem_dc = self._gdi32.CreateCompatibleDC(screen_dc)
+        bitmap = self._gdi32.CreateCompatibleBitmap(screen_dc, width, height)
+        self._gdi32.SelectObject(mem_dc, bitmap)
+        header = self._header_type()
+        header.biSize = self._ctypes.sizeof(self._header_type)
+        header.biWidth = width
+        header.biHeight = -height  # 위→아래 순서
+        header.biPlanes = 1
+        header.biBitCount = 32
+        header.biCompression = 0  # BI_RGB
+        entry = (mem_dc, bitmap, header, self._ctypes.create_string_buffer(width * height * 4))
+        self._buffers[key] = entry
+        while len(self._buffers) > self.max_buffers:
+            self._release(self._buffers.popitem(last=False)[1])
+        return entry
+
+    def _release(self, entry):
+        mem_dc, bitmap, _, _ = entry
+        self._gdi32.DeleteObject(bitmap)
+        self._gdi32.DeleteDC(mem_dc)
+
+    def grab(self, x, y, width, height):
+        width, height = max(1, int(width)), max(1, int(height))
+        with self._lock:
+            screen_dc = self._user32.GetDC(None)
+            try:
+                mem_dc, bitmap, header, buffer = self._buffer(width, height, screen_dc)
+                if not self._gdi32.BitBlt(mem_dc, 0, 0, width, height, screen_dc, int(x), int(y),
+                                          self._SRCCOPY | self._CAPTUREBLT):
+                    raise OSError(f"BitBlt 실패 (오류 코드 {self._ctypes.get_last_error()})")
+            finally:
+                self._user32.ReleaseDC(None, screen_dc)
+            self._gdi32.GetDIBits(mem_dc, bitmap, 0, height, buffer, self._ctypes.byref(header),
+                                  self._DIB_RGB_COLORS)
+            # frombuffer(BGRX)는 RGB로 변환하며 복사하므로 버퍼를 다음 캡처에 재사용해도 안전
+            return Image.frombuffer('RGB', (width, height), buffer, 'raw', 'BGRX', 0, 1)
+
+    def grab_screen(self):
+        # 주 모니터 전체 (pyautogui.screenshot()과 같은 범위)
+        return self.grab(0, 0, self._user32.GetSystemMetrics(0), self._user32.GetSystemMetrics(1))
+
+    def close(self):
+        with self._lock:
+            while self._buffers:
+                self._release(self._buffers.popitem()[1])
+
+
+class X11Backend:
+    """Linux X11 캡처 (Pillow XCB)"""
+
+    name = 'x11'
+
+    def __init__(self, display=None):
+        if ImageGrab is None:
+            raise RuntimeError("PIL.ImageGrab을 사용할 수 없습니다")
+        self.display = display or os.environ.get('DISPLAY')
+        if not self.display:
+            raise RuntimeError("DISPLAY 환경변수가 없습니다 (X 서버 필요)")
+
+    def grab(self, x, y, width, height):
+        image = ImageGrab.grab(bbox=(x, y, x + width, y + height), xdisplay=self.display)
+        return image.convert('RGB')
+
+    def grab_screen(self):
+        return ImageGrab.grab(xdisplay=self.display).convert('RGB')
+
+    def close(self):
+        pass
+
+
+class ReplayBackend:
+    """기록된 프레임을 화면 대신 제공 (화면 좌표 (0, 0) = 프레임 좌상단)
+
+    Args:
+        source: 이미지 폴더(파일명 순서), 이미지 파일 1개, 또는 동영상 파일 (OpenCV 필요)
+        step: 캡처 호출마다 넘길 프레임 수 (0이면 set_frame/advance로만 이동)
+        fps: 지정하면 호출 횟수 대신 첫 캡처 이후 경과 시간으로 프레임 선택
+            (True면 동영상 자체 fps - 실시간 재생)
+        loop: 마지막 프레임 이후 처음으로 돌아갈지 (False면 마지막 프레임 유지)
+    """
+
+    name = 'replay'
+
+    def __init__(self, source, step=1, fps=None, loop=False):
+        self.source = source
+        self.step = step
+        self.fps = fps
+        self.loop = loop
+        self._lock = threading.Lock()
+        self._video = None
+        self._video_pos = -1
+        self._cached = OrderedDict()  # 프레임 번호 → 디코딩된 이미지 (최근 _REPLAY_CACHE개)
+        self._start = None
+        self.index = 0
+        self.captures = 0
+
+        if os.path.isdir(source):
+            self._files = sorted(
+                os.path.join(source, f) for f in os.listdir(source)
+                if f.lower().endswith(IMAGE_EXTENSIONS))
+            if not self._files:
+                raise ValueError(f"리플레이 폴더에 이미지가 없습니다: {source}")
+            self.frame_count = len(self._files)
+        elif source.lower().endswith(VIDEO_EXTENSIONS):
+            if cv2 is None:
+                raise RuntimeError("동영상 리플레이에는 OpenCV(cv2)가 필요합니다")
+            self._files = None
+            self._video = cv2.VideoCapture(source)
+            if not self._video.isOpened():
+                raise ValueError(f"동영상을 열 수 없습니다: {source}")
+            self.frame_count = int(self._video.get(cv2.CAP_PROP_FRAME_COUNT)) or 1
+            if self.fps is True:
+                self.fps = self._video.get(cv2.CAP_PROP_FPS) or 30
+        elif os.path.isfile(source):
+            self._files = [source]
+            self.frame_count = 1
+        else:
+            raise ValueError(f"리플레이 원본을 찾을 수 없습니다: {source}")
+        print(f"리플레이 캡처: {source} ({self.frame_count}프레임)")
+
+    def _clamp(self, index):
+        if self.loop:
+            return index % self.frame_count
+        return max(0, min(index, self.frame_count - 1))
+
+    def set_frame(self, index):
+        """현재 프레임 지정"""
+        with self._lock:
+            self.index = self._clamp(index)
+            self._start = None
+
+    def advance(self, count=1):
+        """프레임 이동 (step=0으로 테스트가 직접 화면 전환 시점을 정할 때 사용)"""
+        with self._lock:
+            self.index = self._clamp(self.index + count)
+
+    def _load(self, index):
+        image = self._cached.get(index)
+        if image is not None:
+            self._cached.move_to_end(index)
+            return image
+        if self._files is not None:
+            with Image.open(self._files[index]) as img:
+                image = img.convert('RGB')
+        else:
+            if index != self._video_pos + 1:
+                self._video.set(cv2.CAP_PROP_POS_FRAMES, index)
+            ok, frame = self._video.read()
+            if not ok:
+                raise RuntimeError(f"동영상 프레임 {index} 읽기 실패")
+            self._video_pos = index
+            image = Image.fromarray(cv2.cvtColor(frame, cv2.COLOR_BGR2RGB))
+        self._cached[index] = image
+        while len(self._cached) > _REPLAY_CACHE:
+            self._cached.popitem(last=False)
+        return image
+
+    def _next_frame(self):
+        with self._lock:
+            if self.fps:
+                now = time.monotonic()
+                if self._start is None:
+                    self._start = now - self.index / self.fps
+                self.index = self._clamp(int((now - self._start) * self.fps))
+                index = self.index
+            else:
+                index = self.index
+                self.index = self._clamp(self.index + self.step)
+            self.captures += 1
+            return self._load(index)
+
+    def grab(self, x, y, width, height):
+        # 프레임 밖 영역은 검은색 (실제 화면 밖 캡처와 같음)
+        return self._next_frame().crop((x, y, x + width, y + height))
+
+    def grab_screen(self):
+        return self._next_frame().copy()
+
+    def close(self):
+        if self._video is not None:
+            self._video.release()
+            self._video = None
+
+
+def create_backend(name='auto', replay_source=None):
+    """캡처 백엔드 생성 ('auto': Windows는 GDI(실패 시 pyautogui), 그 외는 X11)
+
+    Windows가 아닌 환경에서 X11 캡처를 만들 수 없으면 pyautogui로 대체하지 않고 RuntimeError를 발생시킵니다.
+    (pyautogui도 같은 X 서버가 필요해 첫 캡처에서야 실패하므로, 헤드리스 실행은 리플레이 백엔드 사용)
+    """
+    if name == 'replay':
+        source = replay_source or os.environ.get('PBBAUTO_REPLAY')
+        if not source:
+            raise ValueError("replay 백엔드에는 원본 경로(PBBAUTO_REPLAY)가 필요합니다")
+        return ReplayBackend(source)
+
+    candidates = {'gdi': [GdiBackend], 'x11': [X11Backend], 'pyautogui': []}.get(name)
+    if candidates is None:
+        candidates = [GdiBackend] if sys.platform == 'win32' else [X11Backend]
+    for backend_cls in candidates:
+        try:
+            backend = backend_cls()
+            print(f"✅ 화면 캡처: {backend.name}")
+            return backend
+        except Exception as e:
+            if sys.platform != 'win32':
+                raise RuntimeError(
+                    f"{backend_cls.name} 화면 캡처를 초기화할 수 없습니다: {e} - "
+                    "X 서버가 없는 환경에서는 리플레이 캡처를 사용하세요 "
+                    "(pbbauto --replay 프레임 폴더 또는 환경변수 PBBAUTO_REPLAY)") from e
+            print(f"⚠️ {backend_cls.name} 캡처 초기화 실패, pyautogui 사용: {e}")
+    return PyAutoGuiBackend()
+
+
+_backend = None
+_backend_lock = threading.Lock()
+
+
+def get_capture_backend():
+    """전역 캡처 백엔드 반환 (최초 호출 시 생성, 환경변수 PBBAUTO_CAPTURE로 강제 가능)"""
+    global _backend
+    if _backend is None:
+        with _backend_lock:
+            if _backend is None:
+                default = 'replay' if os.environ.get('PBBAUTO_REPLAY') else 'auto'
+                _backend = create_backend(os.environ.get('PBBAUTO_CAPTURE', default))
+    return _backend
+
+
+def set_capture_backend(backend):
+    """전역 캡처 백엔드 교체 (이름 또는 백엔드 인스턴스 - 테스트에서 ReplayBackend 지정)"""
+    global _backend
+    if isinstance(backend, str):
+        if _backend is not None and _backend.name == backend and backend != 'replay':
+            return _backend
+        backend = create_backend(backend)
+    with _backend_lock:
+        if _backend is not None and _backend is not backend:
+            _backend.close()
+        _backend = backend
+    return _backend
+
+
+def grab(x, y, width, height):
+    """화면 영역 캡처 (PIL RGB)"""
+    with profile_span('capture', 'stage', width=width, height=height):
+        return get_capture_backend().grab(x, y, width, height)
+
+
+def grab_screen():
+    """주 모니터 전체 캡처 (PIL RGB)"""
+    with profile_span('capture', 'stage', screen=True):
+        return get_capture_backend().grab_screen()
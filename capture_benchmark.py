@@ -0,0 +1,119 @@
+"""
+화면 캡처 지연 벤치마크 - 캡처 백엔드별/영역 크기별 p50/p95/p99 측정
+
+사용법:
+    python capture_benchmark.py [--backends gdi pyautogui] [--sizes full 1280x720 200x50]
+                                [--repeat 50] [--replay 프레임 폴더] [--output results.json]
+
+--backends를 생략하면 현재 환경에서 만들 수 있는 백엔드(gdi/x11/pyautogui)를 모두 측정합니다.
+--replay를 지정하면 리플레이 백엔드(파일 프레임)도 함께 측정하므로 화면이 없는 환경에서도 실행됩니다.
+"""
+
+# 로그 설정을 가장 먼저 import
+import logger_setup
+
+import sys
+import json
+import time
+import argparse
+from datetime import datetime
+
+import capture
+from profiler import percentile
+
+DEFAULT_SIZES = ('full', '1280x720', '400x100', '200x50')
+
+
+def parse_size(spec):
+    """'full' 또는 'WxH' → (width, height) (full은 None)"""
+    if spec == 'full':
+        return None
+    width, height = spec.lower().split('x')
+    return int(width), int(height)
+
+
+def benchmark_backend(backend, sizes, repeat, warmup=2):
+    """백엔드 하나의 크기별 캡처 지연 (ms)"""
+    results = {}
+    for spec in sizes:
+        size = parse_size(spec)
+        grab = backend.grab_screen if size is None else (lambda: backend.grab(0, 0, *size))
+        for _ in range(warmup):
+            grab()
+        latencies = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            image = grab()
+            latencies.append((time.perf_counter() - start) * 1000)
+        mean = sum(latencies) / len(latencies)
+        results[spec] = {
+            'p50': percentile(latencies, 50),
+            'p95': percentile(latencies, 95),
+            'p99': percentile(latencies, 99),
+            'mean': mean,
+            'fps': 1000 / mean if mean else 0,
+            'image_size': list(image.size),
+        }
+    return results
+
+
+def create_backends(names, replay):
+    """측정할 백엔드 목록 (만들 수 없는 백엔드는 건너뜀)"""
+    factories = {'gdi': capture.GdiBackend, 'x11': capture.X11Backend, 'pyautogui': capture.PyAutoGuiBackend}
+    backends = []
+    for name in names:
+        try:
+            backends.append(factories[name]())
+        except Exception as e:
+            print(f"⚠️ {name} 백엔드 건너뜀: {e}")
+    if replay:
+        backends.append(capture.ReplayBackend(replay, loop=True))
+    return backends
+
+
+def print_report(results):
+    print("\n" + "=" * 72)
+    print(f"{'백엔드':<12}{'크기':<12}{'p50':>10}{'p95':>10}{'p99':>10}{'fps':>10}")
+    print("-" * 72)
+    for name, sizes in results['backends'].items():
+        for spec, row in sizes.items():
+            print(f"{name:<12}{spec:<12}{row['p50']:>8.2f}ms{row['p95']:>8.2f}ms{row['p99']:>8.2f}ms{row['fps']:>10.1f}")
+    print("=" * 72)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="화면 캡처 지연 벤치마크")
+    parser.add_argument('--backends', nargs='+', choices=['gdi', 'x11', 'pyautogui'],
+                        help="측정할 백엔드 (기본: 사용 가능한 백엔드 전체)")
+    parser.add_argument('--sizes', nargs='+', default=list(DEFAULT_SIZES), help="영역 크기 (full 또는 WxH)")
+    parser.add_argument('--repeat', type=int, default=50, help="크기별 반복 횟수")
+    parser.add_argument('--replay', help="리플레이 백엔드로 함께 측정할 프레임 폴더/이미지/동영상")
+    parser.add_argument('--output', help="결과 JSON 저장 경로")
+    args = parser.parse_args(argv)
+
+    names = args.backends
+    if not names:
+        names = ['gdi', 'pyautogui'] if sys.platform == 'win32' else ['x11', 'pyautogui']
+    backends = create_backends(names, args.replay)
+    if not backends:
+        print("측정할 수 있는 캡처 백엔드가 없습니다")
+        return 1
+
+    results = {'created': datetime.now().isoformat(timespec='seconds'), 'repeat': args.repeat, 'backends': {}}
+    for backend in backends:
+        print(f"\n▶ 백엔드: {backend.name}")
+        try:
+            results['backends'][backend.name] = benchmark_backend(backend, args.sizes, args.repeat)
+        finally:
+            backend.close()
+    print_report(results)
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(results, f, ensure_ascii=False, indent=2)
+        print(f"결과 저장: {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
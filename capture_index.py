@@ -0,0 +1,208 @@
+"""
+캡처 인덱스 - 스크린샷 폴더를 정렬하지 않고 최신/세션/단계/시간 범위로 스크린샷 조회
+
+image_to_text("")가 최신 스크린샷을 찾을 때마다 screenshot 폴더 전체를 나열하고
+파일마다 getmtime을 호출해 정렬하면, 야간 실행이 쌓인 폴더에서는 호출마다 수만 번의 stat이 발생합니다.
+
+- 마지막 캡처 포인터: 이 프로세스에서 저장한 최신 스크린샷은 O(1)로 반환
+- 추가 전용 매니페스트(screenshot/manifest.jsonl): 저장할 때마다 한 줄
+  {"file", "time", "session", "step", "kind"} 를 덧붙여 세션/단계/시간 범위 조회에 사용
+- 새 프로세스에서는 매니페스트를 한 번만 읽어 메모리에 올리고, 매니페스트가 없으면
+  (이전 버전에서 만든 폴더) 한 번만 폴더를 훑어 최신 파일을 찾습니다.
+"""
+
+# 로그 설정을 가장 먼저 import
+import logger_setup
+
+import os
+import re
+import json
+import threading
+from constants import screenshot_dir
+
+MANIFEST_NAME = 'manifest.jsonl'
+
+# 파일명의 시각 뒤에 붙는 부분 제거 → 접두어(kind): 'fail_250101_120000_123.jpg' → 'fail'
+_STAMP_PATTERN = re.compile(r'\d{6}_\d{6}_\d{3}(_\d+)?\.\w+$')
+
+
+def capture_kind(filename):
+    """파일명 접두어 (예: 'fail', 'waituntil', 일반 캡처는 '')"""
+    return _STAMP_PATTERN.sub('', filename).rstrip('_')
+
+
+class CaptureIndex:
+    """스크린샷 저장 기록 (메모리 목록 + 추가 전용 매니페스트)
+
+    Args:
+        directory: 스크린샷 폴더 (매니페스트도 이 폴더에 저장)
+    """
+
+    def __init__(self, directory=screenshot_dir):
+        self.directory = directory
+        self.manifest_path = os.path.join(directory, MANIFEST_NAME)
+        self.session = None  # 현재 실행 세션 ID (begin_session)
+        self.step = None     # 현재 실행 중인 명령어 번호 (1-based)
+        self._entries = []
+        self._loaded = False  # 이전 실행의 매니페스트를 읽었는지
+        self._last = None
+        self._lock = threading.Lock()
+
+    def begin_session(self, session_id):
+        """실행 세션 시작 (이후 저장하는 스크린샷에 세션 ID 기록)"""
+        self.session = session_id
+        self.step = None
+
+    def end_session(self):
+        self.session = None
+        self.step = None
+
+    def record(self, path, timestamp, digest=None):
+        """저장한 스크린샷 기록 (utils.save_screenshot에서 호출)
+
+        Args:
+            digest: 픽셀 내용 해시 (같은 내용을 이미 저장해 기존 파일을 가리키는 경우에도 기록)
+        """
+        filename = os.path.basename(path)
+        entry = {'file': filename, 'time': round(timestamp, 3), 'session': self.session,
+                 'step': self.step, 'kind': capture_kind(filename)}
+        if digest:
+            entry['hash'] = digest
+        with self._lock:
+            # 매니페스트가 아직 없으면 기존 폴더의 파일로 먼저 채움 (이전 버전에서 만든 스크린샷 유지)
+            seed = not os.path.exists(self.manifest_path)
+            if seed:
+                self._load()
+            self._entries.append(entry)
+            self._last = entry
+            lines = self._entries if seed else [entry]
+            try:
+                os.makedirs(self.directory, exist_ok=True)
+                with open(self.manifest_path, 'a', encoding='utf-8') as f:
+                    f.writelines(json.dumps(e, ensure_ascii=False) + '\n' for e in lines)
+            except Exception as e:
+                print(f"캡처 매니페스트 기록 실패: {e}")
+        return entry
+
+    def _load(self):
+        """이전 실행의 매니페스트를 한 번만 읽음 (잠금 안에서 호출)"""
+        if self._loaded:
+            return
+        self._loaded = True
+        previous = []
+        try:
+            with open(self.manifest_path, encoding='utf-8') as f:
+                for line in f:
+                    try:
+                        previous.append(json.loads(line))
+                    except ValueError:
+                        continue  # 기록 도중 종료된 마지막 줄
+        except FileNotFoundError:
+            previous = self._scan_directory()
+        except Exception as e:
+            print(f"캡처 매니페스트 읽기 실패: {e}")
+        # 이 프로세스에서 먼저 기록한 항목은 매니페스트에도 있으므로 한 번만 유지
+        recorded = {e['file'] for e in self._entries}
+        self._entries = [e for e in previous if e.get('file') not in recorded] + self._entries
+
+    def _scan_directory(self):
+        """매니페스트가 없는 기존 폴더: 한 번만 훑어 시각 순 기록 생성"""
+        if not os.path.isdir(self.directory):
+            return []
+        entries = []
+        for entry in os.scandir(self.directory):
+            if entry.name.endswith('.jpg'):
+                entries.append({'file': entry.name, 'time': entry.stat().st_mtime, 'session': None,
+                                'step': None, 'kind': capture_kind(entry.name)})
+        entries.sort(key=lambda e: e['time'])
+        return entries
+
+    def entries(self):
+        """전체 기록 사본 (보관 정책/압축에서 사용)"""
+        with self._lock:
+            self._load()
+            return list(self._entries)
+
+    def update(self, transform):
+        """기록 목록을 transform(entries) 결과로 바꾸고 매니페스트를 통째로 다시 씀
+
+        보관 정책/압축이 삭제·이동한 파일을 반영할 때 사용합니다. 잠금 안에서 현재 목록에 적용하므로
+        그 사이에 새로 기록된 항목도 유지됩니다.
+        """
+        with self._lock:
+            self._load()
+            self._entries = list(transform(list(self._entries)))
+            if self._last is not None and self._last not in self._entries:
+                self._last = None
+            temp_path = self.manifest_path + '.tmp'
+            try:
+                with open(temp_path, 'w', encoding='utf-8') as f:
+                    f.writelines(json.dumps(e, ensure_ascii=False) + '\n' for e in self._entries)
+                os.replace(temp_path, self.manifest_path)
+            except Exception as e:
+                print(f"캡처 매니페스트 다시 쓰기 실패: {e}")
+
+    def path_of(self, entry):
+        return os.path.join(self.directory, entry['file'])
+
+    def latest(self, kind=None):
+        """최신 스크린샷 경로 (없으면 None)
+
+        이 프로세스에서 저장한 스크린샷이 있으면 포인터로 바로 반환하고, 없으면 이전 실행 기록에서
+        아직 남아 있는 가장 최근 파일을 찾습니다.
+        """
+        with self._lock:
+            if kind is None and self._last is not None:
+                return self.path_of(self._last)
+            self._load()
+            entries = list(self._entries)
+        for entry in reversed(entries):
+            if kind is not None and entry.get('kind') != kind:
+                continue
+            path = self.path_of(entry)
+            if os.path.exists(path):
+                return path
+        return None
+
+    def query(self, session=None, step=None, since=None, until=None, kind=None):
+        """조건에 맞는 스크린샷 경로 목록 (저장 순서)
+
+        Args:
+            session: 세션 ID
+            step: 명령어 번호 (1-based)
+            since, until: 저장 시각 범위 (time.time() 값, 양 끝 포함)
+            kind: 파일명 접두어 (예: 'fail')
+        """
+        with self._lock:
+            self._load()
+            entries = list(self._entries)
+        return [self.path_of(e) for e in entries
+                if (session is None or e.get('session') == session)
+                and (step is None or e.get('step') == step)
+                and (since is None or e['time'] >= since)
+                and (until is None or e['time'] <= until)
+                and (kind is None or e.get('kind') == kind)]
+
+    def sessions(self):
+        """기록된 세션 ID 목록 (오래된 것부터)"""
+        with self._lock:
+            self._load()
+            entries = list(self._entries)
+        seen = []
+        for entry in entries:
+            if entry.get('session') and entry['session'] not in seen:
+                seen.append(entry['session'])
+        return seen
+
+    def stats(self):
+        with self._lock:
+            return {'entries': len(self._entries), 'loaded': self._loaded, 'session': self.session}
+
+
+# 전역 캡처 인덱스
+_capture_index = CaptureIndex()
+
+
+def get_capture_index():
+    """전역 캡처 인덱스 반환"""
+    return _capture_index
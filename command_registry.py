@@ -7,16 +7,25 @@
 import logger_setup
 
 from abc import ABC, abstractmethod
-from PyQt5.QtWidgets import (QWidget, QHBoxLayout, QVBoxLayout, QLabel, QLineEdit, 
-                             QSpinBox, QComboBox, QPushButton, QMessageBox, QCheckBox,
-                             QRadioButton, QButtonGroup, QTextEdit, QFileDialog, QDialog,
-                             QScrollArea, QFrame)
-from PyQt5.QtGui import QPixmap, QFont
-from PyQt5.QtCore import Qt
+from headless import HEADLESS
+if HEADLESS:
+    # 헤드리스 실행(pbbauto.py): PyQt5를 불러오지 않고 UI 이름은 자리표시 사용, 입력은 PBBAUTO_INPUT 백엔드
+    from headless import (QWidget, QHBoxLayout, QVBoxLayout, QLabel, QLineEdit,
+                          QSpinBox, QDoubleSpinBox, QComboBox, QPushButton, QMessageBox, QCheckBox,
+                          QRadioButton, QButtonGroup, QTextEdit, QFileDialog, QDialog,
+                          QScrollArea, QFrame, QPixmap, QFont, Qt, input_modules)
+    pyd, pyperclip = input_modules('pyd', 'pyperclip')
+else:
+    from PyQt5.QtWidgets import (QWidget, QHBoxLayout, QVBoxLayout, QLabel, QLineEdit, 
+                                 QSpinBox, QDoubleSpinBox, QComboBox, QPushButton, QMessageBox, QCheckBox,
+                                 QRadioButton, QButtonGroup, QTextEdit, QFileDialog, QDialog,
+                                 QScrollArea, QFrame)
+    from PyQt5.QtGui import QPixmap, QFont
+    from PyQt5.QtCore import Qt
+    import pyperclip
+    import pydirectinput as pyd
 import time
 import os
-import pyperclip
-import pydirectinput as pyd
 from openpyxl import Workbook, load_workbook
 from openpyxl.drawing.image import Image as ExcelImage
 from openpyxl.utils import get_column_letter
@@ -26,12 +35,170 @@ except ImportError:
     print("PIL(Pillow) 라이브러리가 필요합니다. 'pip install Pillow' 명령어로 설치해주세요.")
     PILImage = None
 from constants import test_results_dir
-from utils import take_screenshot, take_screenshot_with_coords, image_to_text, calculate_adjusted_coordinates, calculate_offset_coordinates
+from utils import take_screenshot, take_screenshot_with_coords, capture_region, capture_screen, save_screenshot, image_to_text, calculate_adjusted_coordinates, calculate_offset_coordinates
+from frame_change import get_change_detector
+from preprocess import get_pipeline
+from tes import is_expected_match
+from text_match import resolve_threshold
+from template_match import find_template, resolve_template_path, template_dir
+from screen_text_index import get_screen_text_index
+from ocr_batch import OCR_TYPE_LANGS
+from deferred_checks import get_deferred_checks
+from frame_buffer import get_frame_buffer
+from artifact_writer import get_artifact_writer
+from window_geometry import get_window_geometry
+from input_arbiter import input_burst
 from datetime import datetime
 import glob
+import re
 import subprocess
 
 
+def split_option_tokens(params):
+    """'key=value' 형태의 선택 옵션 토큰을 위치 파라미터와 분리
+
+    따옴표로 묶인 텍스트 안의 토큰은 옵션으로 보지 않습니다.
+    기존 위치 기반 파라미터 해석에 영향을 주지 않고 새 옵션을 추가하기 위해 사용합니다.
+
+    Returns:
+        (positional, options): 남은 파라미터 리스트, {key: value} 옵션 딕셔너리
+    """
+    positional = []
+    options = {}
+    in_quotes = False
+    for token in params:
+        if not in_quotes and re.match(r'^[a-z_]+=[^"]*$', token):
+            key, value = token.split('=', 1)
+            options[key] = value
+            continue
+        positional.append(token)
+        if token.count('"') % 2 == 1:
+            in_quotes = not in_quotes
+    return positional, options
+
+
+def parse_preprocess_option(options):
+    """pp= 옵션(전처리 파이프라인 명세) 검증 - 잘못된 명세는 경고 후 기본 전처리 사용"""
+    spec = options.get('pp')
+    if not spec:
+        return None
+    try:
+        get_pipeline(spec)
+    except ValueError as e:
+        print(f"전처리 옵션 무시 (기본 전처리 사용): {e}")
+        return None
+    return spec
+
+
+def parse_fuzzy_option(options, default=None):
+    """fuzzy= 옵션(유사 일치 기준) 해석
+
+    on/true: 전역 기준 사용, off/false: 사용 안 함, 0~1 숫자: 해당 유사도 기준
+    잘못된 값은 경고 후 default 사용
+    """
+    value = options.get('fuzzy')
+    if value is None:
+        return default
+    lowered = value.lower()
+    if lowered in ('on', 'true', 'yes'):
+        return True
+    if lowered in ('off', 'false', 'no'):
+        return None
+    try:
+        threshold = float(value)
+    except ValueError:
+        threshold = None
+    if threshold is None or not 0 < threshold <= 1:
+        print(f"유사 일치 옵션 무시: fuzzy={value} (on/off 또는 0~1 사이 숫자)")
+        return default
+    return threshold
+
+
+def parse_defer_option(options):
+    """defer= 옵션(지연 검사) 해석 - on/1: 사용, off/0: 사용 안 함, 없거나 잘못된 값은 None (설정 따름)"""
+    value = options.get('defer')
+    if value is None:
+        return None
+    lowered = value.lower()
+    if lowered in ('on', 'true', 'yes', '1'):
+        return True
+    if lowered in ('off', 'false', 'no', '0'):
+        return False
+    print(f"지연 검사 옵션 무시: defer={value} (on/off)")
+    return None
+
+
+def format_fuzzy_option(fuzzy, mode_index):
+    """명령어 문자열에 붙일 fuzzy= 옵션 (매칭 모드 콤보 인덱스 기준, 필요 없으면 빈 문자열)
+
+    일부포함(0)은 옵션 없음, 유사 일치(2)는 기준을 바꾼 경우만, 완전일치(1)는 유사 일치를 켠 경우만 추가
+    """
+    if mode_index == 0 or fuzzy is None or fuzzy is False:
+        return ""
+    if fuzzy is True:
+        return " fuzzy=on" if mode_index == 1 else ""
+    return f" fuzzy={fuzzy:g}"
+
+
+def match_mode_label(exact_match, fuzzy=None):
+    """로그/결과용 매칭 모드 이름 (예: '일부포함', '완전일치', '일부포함·유사 0.85')"""
+    label = "완전일치" if exact_match else "일부포함"
+    threshold = resolve_threshold(fuzzy)
+    if threshold is None:
+        return label
+    return f"{label}·유사 {threshold:g}"
+
+
+def lookup_indexed_text(x, y, width, height, frame, ocr_type, expected_text, exact_match=False, fuzzy=None):
+    """유효한 화면 텍스트 인덱스에서 영역 텍스트 확인 (FindText/ClickText가 만든 인덱스 재사용)
+
+    인덱스가 없거나, 영역이 인덱스 이후 바뀌었거나, 통과 조건을 만족하지 못하면 None을 반환하여
+    영역별 OCR로 다시 확인합니다. (창 전체 OCR 품질 때문에 Fail이 나지 않도록)
+    """
+    lang_code = OCR_TYPE_LANGS.get(ocr_type)
+    if lang_code is None or not expected_text:
+        return None
+    text = get_screen_text_index().lookup_region(x, y, width, height, frame, lang_code)
+    if text is None or not is_expected_match(text, expected_text, exact_match, fuzzy):
+        return None
+    print(f"⚡ 화면 텍스트 인덱스 결과 사용: '{text}'")
+    return text
+
+
+def region_changed(key, image):
+    """폴링 영역이 마지막 OCR 시점 이후 바뀌었는지 (판단 실패 시 바뀐 것으로 간주)
+
+    Args:
+        image: 메모리 이미지(PIL) 또는 스크린샷 경로
+    """
+    try:
+        if isinstance(image, str):
+            with PILImage.open(image) as opened:
+                return get_change_detector().has_changed(key, opened)
+        return get_change_detector().has_changed(key, image)
+    except Exception as e:
+        print(f"화면 변화 감지 실패 (OCR 진행): {e}")
+        return True
+
+
+def ensure_result_screenshots(test_results):
+    """메모리에만 있는 테스트 결과 프레임을 디스크에 저장 (리포트 이미지용 지연 저장)
+
+    통과한 검사는 프레임을 메모리에만 들고 있다가 리포트/엑셀 출력 직전에 저장합니다.
+    (보관 한도를 넘어 프레임이 해제된 결과는 이미지 없이 출력)
+    """
+    for result in test_results or []:
+        image = result.pop('screenshot_image', None)
+        get_frame_buffer().release_evidence(result)
+        if image is None or result.get('screenshot_path'):
+            continue
+        try:
+            result['screenshot_path'] = save_screenshot(image)
+        except Exception as e:
+            print(f"테스트 결과 스크린샷 저장 실패: {e}")
+            result['screenshot_path'] = "N/A"
+
+
 def show_unified_ocr_test_dialog(
     x, y, width, height, 
     screenshot_path, 
@@ -40,7 +207,8 @@ def show_unified_ocr_test_dialog(
     expected_text=None, 
     exact_match=False,
     ocr_attempts=None,
-    total_time=0
+    total_time=0,
+    fuzzy=None
 ):
     """
     통합 OCR 테스트 결과 팝업 다이얼로그
@@ -54,6 +222,7 @@ def show_unified_ocr_test_dialog(
         exact_match: 완전일치 모드 여부
         ocr_attempts: [(텍스트, 신뢰도, 정보), ...] 형태의 시도 목록
         total_time: 총 소요 시간
+        fuzzy: 유사 일치 기준 (None이면 사용 안 함)
     """
     import tes
     
@@ -95,7 +264,7 @@ def show_unified_ocr_test_dialog(
     layout.addWidget(line1)
     
     # 2. 시도 정보 (모든 OCR 시도)
-    attempts = ocr_attempts if ocr_attempts is not None else tes._last_ocr_attempts
+    attempts = ocr_attempts if ocr_attempts is not None else tes.get_last_ocr_attempts()
     
     if attempts:
         attempts_label = QLabel("🔍 OCR 시도 내역:")
@@ -147,8 +316,7 @@ def show_unified_ocr_test_dialog(
     
     # 4. 기대 텍스트 비교
     if expected_text:
-        match_type = "완전일치" if exact_match else "일부포함"
-        match_found = False
+        match_type = match_mode_label(exact_match, fuzzy)
         
         # 실제 추출된 텍스트로 비교
         compare_text = display_text or ""
@@ -157,6 +325,8 @@ def show_unified_ocr_test_dialog(
             match_found = compare_text.strip() == expected_text.strip()
         else:
             match_found = expected_text in compare_text
+        if not match_found and fuzzy:
+            match_found = is_expected_match(compare_text, expected_text, exact_match, fuzzy)
         
         if match_found:
             match_label = QLabel(f"✅ Pass: 기대 텍스트 '{expected_text}'를 발견했습니다! ({match_type})")
@@ -175,7 +345,8 @@ def show_unified_ocr_test_dialog(
     line3.setFrameShadow(QFrame.Sunken)
     layout.addWidget(line3)
     
-    # 5. 스크린샷 이미지
+    # 5. 스크린샷 이미지 (백그라운드 저장 중이면 기록 완료 대기)
+    get_artifact_writer().wait_for(screenshot_path)
     if os.path.exists(screenshot_path):
         img_label = QLabel("🖼️ 캡처된 이미지:")
         img_label.setFont(QFont("맑은 고딕", 10, QFont.Bold))
@@ -209,6 +380,13 @@ def show_unified_ocr_test_dialog(
 class CommandBase(ABC):
     """명령어 기본 클래스"""
     
+    # 실행 전체가 키보드/마우스 입력인 명령어 (다중 클라이언트 실행 시 입력 중재 잠금 안에서 실행)
+    uses_input = False
+    # parse_params가 빈 딕셔너리를 반환하면 실행할 수 없는 명령어 (실행 계획 컴파일 시 오류로 보고)
+    requires_params = False
+    # 파라미터를 사용하지 않는 명령어 (인자가 있어도 빈 딕셔너리가 정상)
+    accepts_params = True
+    
     def __init__(self):
         self.screenshot_path = None
         self.extracted_text = ""
@@ -347,6 +525,8 @@ class CommandBase(ABC):
 class PressCommand(CommandBase):
     """키 입력 명령어"""
     
+    uses_input = True
+    
     @property
     def name(self) -> str:
         return "Press"
@@ -489,6 +669,8 @@ class PressCommand(CommandBase):
 class WriteCommand(CommandBase):
     """텍스트 입력 명령어"""
     
+    uses_input = True
+    
     @property
     def name(self) -> str:
         return "Write"
@@ -1298,6 +1480,8 @@ class ScreenshotCommand(CommandBase):
         w = params.get('w')
         h = params.get('h')
         
+        # 명시적 스크린샷은 파일로 저장 (백그라운드 저장기, 같은 화면은 기존 파일 재사용)
+        frame = None
         if x and y and w and h:
             try:
                 x, y, w, h = int(x), int(y), int(w), int(h)
@@ -1305,26 +1489,32 @@ class ScreenshotCommand(CommandBase):
                 # 상대 좌표를 절대 좌표로 변환
                 if window_coords:
                     adjusted_x, adjusted_y = calculate_adjusted_coordinates(x, y, window_coords)
-                    screenshot_path = take_screenshot_with_coords(adjusted_x, adjusted_y, w, h)
-                    print(f"Screenshot taken at relative ({x},{y},{w},{h}) -> absolute ({adjusted_x},{adjusted_y},{w},{h}): {screenshot_path}")
+                    frame = capture_region(adjusted_x, adjusted_y, w, h)
+                    print(f"Screenshot taken at relative ({x},{y},{w},{h}) -> absolute ({adjusted_x},{adjusted_y},{w},{h})")
                 else:
                     # window_coords가 없으면 절대 좌표로 처리
-                    screenshot_path = take_screenshot_with_coords(x, y, w, h)
-                    print(f"Screenshot taken at absolute ({x},{y},{w},{h}): {screenshot_path}")
+                    frame = capture_region(x, y, w, h)
+                    print(f"Screenshot taken at absolute ({x},{y},{w},{h})")
             except (ValueError, TypeError) as e:
                 print(f"Invalid coordinates for screenshot: {e}")
-                screenshot_path = take_screenshot()
-        else:
-            screenshot_path = take_screenshot()
-            print(f"Screenshot taken (full screen): {screenshot_path}")
+        if frame is None:
+            frame = capture_screen()
+            print("Screenshot taken (full screen)")
+        
+        screenshot_path = save_screenshot(frame)
+        print(f"Screenshot saved: {screenshot_path}")
         
         if processor_state:
             processor_state['screenshot_path'] = screenshot_path
+            # I2S/OCR 명령어는 저장 완료를 기다리지 않고 메모리 프레임 사용
+            processor_state['screenshot_image'] = frame
 
 
 class ClickCommand(CommandBase):
     """클릭 명령어"""
     
+    uses_input = True
+    
     @property
     def name(self) -> str:
         return "Click"
@@ -1557,6 +1747,8 @@ class ClickCommand(CommandBase):
 class DragCommand(CommandBase):
     """마우스 드래그 명령어 - 새로운 명령어 예시! 🎉"""
     
+    uses_input = True
+    
     @property
     def name(self) -> str:
         return "Drag"
@@ -1752,6 +1944,7 @@ class DragCommand(CommandBase):
 
 # 간단한 명령어들 (파라미터가 없는 것들)
 class I2sCommand(CommandBase):
+    accepts_params = False
     @property
     def name(self): return "I2S"
     @property 
@@ -1766,12 +1959,14 @@ class I2sCommand(CommandBase):
     def set_ui_values(self, params): pass
     def get_command_string(self): return "i2s"
     def execute(self, params, window_coords=None, processor_state=None):
-        if processor_state and processor_state.get('screenshot_path'):
-            processor_state['extracted_text'] = image_to_text(processor_state['screenshot_path'], lang='eng')
+        source = processor_state and (processor_state.get('screenshot_image') or processor_state.get('screenshot_path'))
+        if source:
+            processor_state['extracted_text'] = image_to_text(source, lang='eng')
             print(f'OCR (English): {processor_state["extracted_text"]}')
 
 
 class I2skrCommand(CommandBase):
+    accepts_params = False
     @property
     def name(self): return "I2SKR"
     @property
@@ -1786,14 +1981,17 @@ class I2skrCommand(CommandBase):
     def set_ui_values(self, params): pass
     def get_command_string(self): return "i2skr"
     def execute(self, params, window_coords=None, processor_state=None):
-        if processor_state and processor_state.get('screenshot_path'):
-            processor_state['extracted_text'] = image_to_text(processor_state['screenshot_path'], lang='kor')
+        source = processor_state and (processor_state.get('screenshot_image') or processor_state.get('screenshot_path'))
+        if source:
+            processor_state['extracted_text'] = image_to_text(source, lang='kor')
             print(f'OCR (Korean): {processor_state["extracted_text"]}')
 
 
 class OCRCommand(CommandBase):
     """개선된 OCR 명령어 - 자동 언어 감지 및 다중 줄 지원"""
     
+    accepts_params = False
+    
     @property
     def name(self): return "OCR"
     
@@ -1828,15 +2026,18 @@ class OCRCommand(CommandBase):
         return "ocr"
     
     def execute(self, params, window_coords=None, processor_state=None):
-        if processor_state and processor_state.get('screenshot_path'):
+        source = processor_state and (processor_state.get('screenshot_image') or processor_state.get('screenshot_path'))
+        if source:
             # 자동 언어 감지 사용
-            extracted = image_to_text(processor_state['screenshot_path'], lang='auto')
+            extracted = image_to_text(source, lang='auto')
             processor_state['extracted_text'] = extracted if extracted else ""
             print(f'🔍 OCR (자동 감지): {processor_state["extracted_text"]}')
 
 class WaitUntilCommand(CommandBase):
     """텍스트가 나타날 때까지 대기하는 명령어"""
     
+    requires_params = True
+    
     @property
     def name(self): 
         return "WaitUntil"
@@ -1936,7 +2137,9 @@ class WaitUntilCommand(CommandBase):
         match_layout = QHBoxLayout()
         match_layout.addWidget(QLabel('매칭 모드:'))
         self.match_mode_combo = QComboBox()
-        self.match_mode_combo.addItems(['일부 포함', '완전 일치'])
+        self.match_mode_combo.addItems(['일부 포함', '완전 일치', '유사 일치'])
+        self.match_mode_combo.setToolTip("유사 일치: OCR 오인식(0/O, l/1, 한글 자모) 한두 글자 차이를 허용하는 일부 포함")
+        self.fuzzy = None
         match_layout.addWidget(self.match_mode_combo)
         layout.addLayout(match_layout)
         
@@ -1948,8 +2151,25 @@ class WaitUntilCommand(CommandBase):
         self.max_tries_input.setValue(10)
         self.max_tries_input.setSuffix('회')
         tries_layout.addWidget(self.max_tries_input)
+        
+        # 재시도 간격 (화면 변화가 없으면 OCR을 생략하므로 짧게 설정 가능)
+        tries_layout.addWidget(QLabel('간격:'))
+        self.interval_input = QDoubleSpinBox()
+        self.interval_input.setRange(0.1, 60.0)
+        self.interval_input.setSingleStep(0.1)
+        self.interval_input.setValue(1.0)
+        self.interval_input.setSuffix('초')
+        tries_layout.addWidget(self.interval_input)
         layout.addLayout(tries_layout)
         
+        # 전처리 파이프라인 (비우면 기본 전처리)
+        preprocess_layout = QHBoxLayout()
+        preprocess_layout.addWidget(QLabel('전처리:'))
+        self.preprocess_input = QLineEdit()
+        self.preprocess_input.setPlaceholderText("기본 (예: sauvola, otsu, gray,invert,otsu,crop,scale2)")
+        preprocess_layout.addWidget(self.preprocess_input)
+        layout.addLayout(preprocess_layout)
+        
         # 좌표 모드 선택
         coord_mode_layout = QHBoxLayout()
         coord_mode_layout.addWidget(QLabel('좌표 모드:'))
@@ -1963,6 +2183,8 @@ class WaitUntilCommand(CommandBase):
         return widget
     
     def parse_params(self, params):
+        # key=value 옵션 분리 (interval=0.5 등)
+        params, options = split_option_tokens(params)
         if len(params) < 6:
             return {}
         
@@ -1996,6 +2218,9 @@ class WaitUntilCommand(CommandBase):
                 elif params[param_idx].lower() in ['contains', 'false', '0']:
                     parsed['exact_match'] = False
                     param_idx += 1
+                elif params[param_idx].lower() == 'fuzzy':
+                    parsed['fuzzy'] = True
+                    param_idx += 1
             
             # max_tries 확인
             if len(params) > param_idx:
@@ -2010,6 +2235,13 @@ class WaitUntilCommand(CommandBase):
             if len(params) > param_idx:
                 if params[param_idx].lower() in ['offset', 'scaled']:
                     parsed['coord_mode'] = params[param_idx].lower()
+            
+            # 재시도 간격 옵션 (기본값: 1초)
+            parsed['interval'] = float(options.get('interval', 1))
+            # 전처리 파이프라인 옵션 (기본값: 기존 전처리)
+            parsed['preprocess'] = parse_preprocess_option(options)
+            # 유사 일치 옵션 (fuzzy 매칭 모드 또는 fuzzy=기준)
+            parsed['fuzzy'] = parse_fuzzy_option(options, parsed.get('fuzzy'))
                     
             return parsed
         except (ValueError, IndexError):
@@ -2032,11 +2264,14 @@ class WaitUntilCommand(CommandBase):
             
         self.text_input.setText(params.get('target_text', ''))
         
-        # 매칭 모드 설정 (완전일치면 1, 일부포함이면 0)
+        # 매칭 모드 설정 (완전일치면 1, 유사 일치면 2, 일부포함이면 0)
         exact_match = params.get('exact_match', False)
-        self.match_mode_combo.setCurrentIndex(1 if exact_match else 0)
+        self.fuzzy = params.get('fuzzy')
+        self.match_mode_combo.setCurrentIndex(1 if exact_match else 2 if self.fuzzy else 0)
         
         self.max_tries_input.setValue(params.get('max_tries', 10))
+        self.interval_input.setValue(params.get('interval', 1))
+        self.preprocess_input.setText(params.get('preprocess') or '')
         
         # 좌표 모드 설정
         coord_mode = params.get('coord_mode', 'scaled')
@@ -2048,9 +2283,19 @@ class WaitUntilCommand(CommandBase):
     def get_command_string(self):
         ocr_type = 'i2skr' if self.ocr_combo.currentIndex() == 1 else 'i2s'
         target_text = f'"{self.text_input.text()}"'  # 텍스트를 따옴표로 묶음
-        match_mode = 'exact' if self.match_mode_combo.currentIndex() == 1 else 'contains'
+        match_mode = ['contains', 'exact', 'fuzzy'][self.match_mode_combo.currentIndex()]
         coord_mode = 'offset' if self.coord_mode_combo.currentIndex() == 1 else 'scaled'
-        return f"waituntil {self.x_input.value()} {self.y_input.value()} {self.width_input.value()} {self.height_input.value()} {ocr_type} {target_text} {match_mode} {self.max_tries_input.value()} {coord_mode}"
+        command_str = f"waituntil {self.x_input.value()} {self.y_input.value()} {self.width_input.value()} {self.height_input.value()} {ocr_type} {target_text} {match_mode} {self.max_tries_input.value()} {coord_mode}"
+        
+        # 기본 간격(1초)이 아닐 때만 옵션 추가 (기존 명령어 문자열과 호환)
+        interval = round(self.interval_input.value(), 1)
+        if interval != 1:
+            command_str += f" interval={interval:g}"
+        preprocess = self.preprocess_input.text().replace(' ', '')
+        if preprocess:
+            command_str += f" pp={preprocess}"
+        command_str += format_fuzzy_option(self.fuzzy, self.match_mode_combo.currentIndex())
+        return command_str
     
     def execute(self, params, window_coords=None, processor_state=None):
         if not params or 'target_text' not in params:
@@ -2065,6 +2310,7 @@ class WaitUntilCommand(CommandBase):
         target_text = params.get('target_text', '')
         max_tries = params.get('max_tries', 10)
         exact_match = params.get('exact_match', False)
+        fuzzy = params.get('fuzzy')
         
         # 좌표 보정
         if window_coords:
@@ -2077,8 +2323,19 @@ class WaitUntilCommand(CommandBase):
                 adjusted_coords = calculate_adjusted_coordinates(x, y, window_coords)
             x, y = adjusted_coords
         
-        match_mode_text = "완전일치" if exact_match else "일부포함"
-        print(f"'{target_text}' 텍스트가 나타날 때까지 대기 중... (매칭모드: {match_mode_text}, 최대 {max_tries}회 시도)")
+        interval = params.get('interval', 1)
+        
+        match_mode_text = match_mode_label(exact_match, fuzzy)
+        print(f"'{target_text}' 텍스트가 나타날 때까지 대기 중... (매칭모드: {match_mode_text}, 최대 {max_tries}회 시도, 간격 {interval}초)")
+        
+        # 화면 변화 감지 기준 초기화 (첫 시도는 항상 OCR)
+        change_key = f"waituntil:{x},{y},{width},{height}"
+        get_change_detector().reset(change_key)
+        # 영역별 OCR 전략 학습 키 (이 영역에서 성공한 변형을 다음 호출에서 먼저 시도)
+        preprocess = params.get('preprocess')
+        strategy_key = f"waituntil:{target_text}:{x},{y},{width},{height}:{ocr_type}"
+        if preprocess:
+            strategy_key += f":{preprocess}"
         
         for i in range(max_tries):
             # 중지 플래그 체크 (각 반복 시작 시)
@@ -2093,56 +2350,75 @@ class WaitUntilCommand(CommandBase):
                 return
             
             try:
-                # 스크린샷 촬영
-                screenshot_path = take_screenshot_with_coords(x, y, width, height)
-                if not screenshot_path:
+                # 영역 캡처 (디스크 저장 없이 메모리 프레임으로 바로 OCR)
+                frame = capture_region(x, y, width, height)
+                if frame is None:
                     print(f"[{i+1}/{max_tries}] 스크린샷 촬영 실패")
-                    # 중단 가능한 1초 대기
-                    if self._interruptible_sleep(1, params, f"screenshot retry wait ({i+1}/{max_tries})"):
+                    # 중단 가능한 대기
+                    if self._interruptible_sleep(interval, params, f"screenshot retry wait ({i+1}/{max_tries})"):
                         return
                     continue
                 
-                # OCR 실행
-                if ocr_type == 'i2s':
-                    extracted_text = image_to_text(screenshot_path, lang='eng')
-                elif ocr_type == 'i2skr':
-                    extracted_text = image_to_text(screenshot_path, lang='kor')
-                else:
-                    print(f"지원하지 않는 OCR 타입: {ocr_type}")
-                    return
+                # 마지막 OCR 이후 화면이 그대로면 결과도 같으므로 OCR 생략
+                if not region_changed(change_key, frame):
+                    print(f"[{i+1}/{max_tries}] 화면 변화 없음 - OCR 생략")
+                    if self._interruptible_sleep(interval, params, f"waituntil retry ({i+1}/{max_tries})"):
+                        return
+                    continue
+                
+                # 유효한 화면 텍스트 인덱스가 있으면 먼저 확인 (통과 시 영역 OCR 생략)
+                extracted_text = lookup_indexed_text(x, y, width, height, frame, ocr_type, target_text, exact_match, fuzzy)
+                
+                # OCR 실행 (기대 텍스트 전달: 발견 시 조기 종료, 일치한 변형만 학습)
+                if extracted_text is None:
+                    if ocr_type == 'i2s':
+                        extracted_text = image_to_text(frame, lang='eng', expected_text=target_text, exact_match=exact_match, fuzzy=fuzzy,
+                                                       strategy_key=strategy_key, preprocess=preprocess)
+                    elif ocr_type == 'i2skr':
+                        extracted_text = image_to_text(frame, lang='kor', expected_text=target_text, exact_match=exact_match, fuzzy=fuzzy,
+                                                       strategy_key=strategy_key, preprocess=preprocess)
+                    else:
+                        print(f"지원하지 않는 OCR 타입: {ocr_type}")
+                        return
                 
                 print(f"[{i+1}/{max_tries}] OCR 결과: {extracted_text}")
                 
-                # processor_state에 결과 저장
+                # processor_state에 결과 저장 (프레임은 메모리에 보관, 필요할 때만 저장)
                 if processor_state is not None:
-                    processor_state['screenshot_path'] = screenshot_path
+                    processor_state['screenshot_image'] = frame
+                    processor_state['screenshot_path'] = None
                     processor_state['extracted_text'] = extracted_text
                 
                 # 타겟 텍스트 확인 (완전일치 vs 일부포함)
-                match_found = False
                 if exact_match:
                     # 완전일치: OCR 결과가 타겟 텍스트와 정확히 일치하는지 확인
                     match_found = extracted_text.strip() == target_text.strip()
-                    match_type = "완전일치"
                 else:
                     # 일부포함: OCR 결과에 타겟 텍스트가 포함되어 있는지 확인
                     match_found = target_text in extracted_text
-                    match_type = "일부포함"
+                if not match_found and fuzzy:
+                    # 유사 일치: 오인식 한두 글자 차이는 정규화/편집 거리 기준으로 허용
+                    match_found = is_expected_match(extracted_text, target_text, exact_match, fuzzy)
+                match_type = match_mode_text
                 
                 if match_found:
                     print(f"✓ '{target_text}' 텍스트를 찾았습니다! ({match_type}, {i+1}번째 시도)")
                     return
                 
-                print(f"[{i+1}/{max_tries}] '{target_text}' 텍스트를 찾지 못했습니다. 1초 후 재시도...")
+                print(f"[{i+1}/{max_tries}] '{target_text}' 텍스트를 찾지 못했습니다. {interval}초 후 재시도...")
                 
             except Exception as e:
                 print(f"[{i+1}/{max_tries}] 오류 발생: {e}")
+                # 오류 후에는 다음 시도에서 반드시 OCR하도록 기준 초기화
+                get_change_detector().reset(change_key)
             
-            # 중단 가능한 1초 대기
-            if self._interruptible_sleep(1, params, f"waituntil retry ({i+1}/{max_tries})"):
+            # 중단 가능한 대기
+            if self._interruptible_sleep(interval, params, f"waituntil retry ({i+1}/{max_tries})"):
                 return
         
         print(f"✗ 타임아웃: {max_tries}회 시도 후에도 '{target_text}' 텍스트를 찾지 못했습니다. (매칭모드: {match_mode_text})")
+        # 실패 증거: 폴링 중 캡처한 최근 프레임 저장
+        get_frame_buffer().dump((x, y, width, height), 'waituntil')
     
     def on_get_coordinates(self):
         """드래그로 영역 선택하여 좌표 설정"""
@@ -2246,6 +2522,7 @@ class WaitUntilCommand(CommandBase):
             ocr_type = 'i2skr' if self.ocr_combo.currentIndex() == 1 else 'i2s'
             target_text = self.text_input.text().strip()
             exact_match = self.match_mode_combo.currentIndex() == 1
+            fuzzy = (self.fuzzy or True) if self.match_mode_combo.currentIndex() == 2 else (self.fuzzy if exact_match else None)
             
             # 상대 좌표를 절대 좌표로 변환 후 스크린샷 촬영
             try:
@@ -2285,12 +2562,14 @@ class WaitUntilCommand(CommandBase):
                 QMessageBox.warning(None, "테스트 오류", "스크린샷 촬영에 실패했습니다.")
                 return
             
-            # OCR 실행 (expected_text를 전달하여 시도 정보를 _last_ocr_attempts에 저장)
+            # OCR 실행 (expected_text를 전달하여 시도 정보를 현재 스레드에 저장)
             if ocr_type == 'i2s':
-                extracted_text = image_to_text(screenshot_path, lang='eng', expected_text=target_text, exact_match=exact_match)
+                extracted_text = image_to_text(screenshot_path, lang='eng', expected_text=target_text, exact_match=exact_match,
+                                               fuzzy=fuzzy)
                 ocr_lang = "영어"
             else:
-                extracted_text = image_to_text(screenshot_path, lang='kor', expected_text=target_text, exact_match=exact_match)
+                extracted_text = image_to_text(screenshot_path, lang='kor', expected_text=target_text, exact_match=exact_match,
+                                               fuzzy=fuzzy)
                 ocr_lang = "한국어"
             
             if not extracted_text:
@@ -2306,17 +2585,710 @@ class WaitUntilCommand(CommandBase):
                 extracted_text=extracted_text,  # 실제 추출된 텍스트 전달
                 expected_text=target_text,
                 exact_match=exact_match,
-                ocr_attempts=None,  # _last_ocr_attempts 사용
-                total_time=total_time
+                ocr_attempts=None,  # get_last_ocr_attempts() 사용
+                total_time=total_time,
+                fuzzy=fuzzy
             )
             
         except Exception as e:
             QMessageBox.critical(None, "OCR 테스트 오류", f"테스트 중 오류가 발생했습니다:\n{e}")
 
 
+class ImageMatchCommandBase(CommandBase):
+    """템플릿 이미지 매칭 명령어 공통 기능 (WaitUntilImage / ClickImage)
+
+    명령어 형식: <이름> x y width height "템플릿 경로" [threshold] [max_tries] [coord_mode] [interval=초]
+    - width/height가 0이면 선택된 윈도우 전체에서 검색
+    - 스케일링 모드는 TestText/WaitUntil과 같이 x/y 좌표만 기준 해상도(2560x1440) 대비 창 크기 비율로 보정
+      (영역 크기와 템플릿은 캡처한 실제 픽셀 그대로 사용)
+    """
+    
+    command_word = ""
+    default_max_tries = 10
+    requires_params = True
+    
+    def _interruptible_sleep(self, duration, params, context=""):
+        """중지 플래그를 체크하면서 대기 (중지되면 True)"""
+        if duration <= 0:
+            return False
+        
+        check_interval = 0.1
+        total_slept = 0
+        while total_slept < duration:
+            processor = params.get('processor') if params else None
+            if processor and hasattr(processor, 'stop_flag') and processor.stop_flag:
+                print(f"⚠️ {self.name} {context} 중지됨 (경과시간: {total_slept:.1f}초/{duration}초)")
+                return True
+            sleep_time = min(check_interval, duration - total_slept)
+            time.sleep(sleep_time)
+            total_slept += sleep_time
+        return False
+    
+    def create_ui(self):
+        widget = QWidget()
+        layout = QVBoxLayout()
+        
+        # 검색 영역 (0이면 윈도우 전체)
+        coord_layout = QHBoxLayout()
+        coord_layout.addWidget(QLabel('상대 X:'))
+        self.x_input = QSpinBox()
+        self.x_input.setRange(-9999, 9999)
+        coord_layout.addWidget(self.x_input)
+        coord_layout.addWidget(QLabel('상대 Y:'))
+        self.y_input = QSpinBox()
+        self.y_input.setRange(-9999, 9999)
+        coord_layout.addWidget(self.y_input)
+        coord_layout.addWidget(QLabel('Width:'))
+        self.width_input = QSpinBox()
+        self.width_input.setRange(0, 9999)
+        self.width_input.setToolTip("0이면 윈도우 전체에서 검색")
+        coord_layout.addWidget(self.width_input)
+        coord_layout.addWidget(QLabel('Height:'))
+        self.height_input = QSpinBox()
+        self.height_input.setRange(0, 9999)
+        self.height_input.setToolTip("0이면 윈도우 전체에서 검색")
+        coord_layout.addWidget(self.height_input)
+        layout.addLayout(coord_layout)
+        
+        coord_btn_layout = QHBoxLayout()
+        self.get_coord_btn = QPushButton('검색 영역 선택 (드래그)')
+        self.get_coord_btn.clicked.connect(self.on_get_coordinates)
+        self.test_match_btn = QPushButton('매칭 테스트')
+        self.test_match_btn.clicked.connect(self.on_test_match)
+        coord_btn_layout.addWidget(self.get_coord_btn)
+        coord_btn_layout.addWidget(self.test_match_btn)
+        layout.addLayout(coord_btn_layout)
+        
+        # 템플릿 이미지
+        template_layout = QHBoxLayout()
+        template_layout.addWidget(QLabel('템플릿:'))
+        self.template_input = QLineEdit()
+        self.template_input.setPlaceholderText("templates 폴더 기준 상대 경로 또는 절대 경로 (예: ok_button.png)")
+        template_layout.addWidget(self.template_input)
+        browse_btn = QPushButton('찾아보기')
+        browse_btn.clicked.connect(self.on_browse_template)
+        template_layout.addWidget(browse_btn)
+        capture_btn = QPushButton('영역 캡처')
+        capture_btn.setToolTip("드래그한 화면 영역을 templates 폴더에 템플릿으로 저장")
+        capture_btn.clicked.connect(self.on_capture_template)
+        template_layout.addWidget(capture_btn)
+        layout.addLayout(template_layout)
+        
+        # 일치 기준 / 시도 횟수 / 간격
+        option_layout = QHBoxLayout()
+        option_layout.addWidget(QLabel('일치 기준:'))
+        self.threshold_input = QDoubleSpinBox()
+        self.threshold_input.setRange(0.5, 1.0)
+        self.threshold_input.setSingleStep(0.01)
+        self.threshold_input.setValue(0.9)
+        self.threshold_input.setToolTip("정규화 상호상관(NCC) 점수 기준 (1.0 = 완전히 같음)")
+        option_layout.addWidget(self.threshold_input)
+        option_layout.addWidget(QLabel('최대 시도:'))
+        self.max_tries_input = QSpinBox()
+        self.max_tries_input.setRange(1, 10000)
+        self.max_tries_input.setValue(self.default_max_tries)
+        option_layout.addWidget(self.max_tries_input)
+        option_layout.addWidget(QLabel('간격(초):'))
+        self.interval_input = QDoubleSpinBox()
+        self.interval_input.setRange(0.1, 60)
+        self.interval_input.setSingleStep(0.1)
+        self.interval_input.setValue(1)
+        option_layout.addWidget(self.interval_input)
+        layout.addLayout(option_layout)
+        
+        # 좌표 모드
+        coord_mode_layout = QHBoxLayout()
+        coord_mode_layout.addWidget(QLabel('좌표 모드:'))
+        self.coord_mode_combo = QComboBox()
+        self.coord_mode_combo.addItems(['스케일링 (기준해상도 기반)', '오프셋 (단순 위치이동)'])
+        coord_mode_layout.addWidget(self.coord_mode_combo)
+        coord_mode_layout.addStretch()
+        layout.addLayout(coord_mode_layout)
+        
+        widget.setLayout(layout)
+        return widget
+    
+    def on_get_coordinates(self):
+        """드래그로 검색 영역 선택 (WaitUntil과 동일한 선택 방식)"""
+        WaitUntilCommand.on_get_coordinates(self)
+    
+    def on_browse_template(self):
+        """템플릿 이미지 파일 선택"""
+        path, _ = QFileDialog.getOpenFileName(None, "템플릿 이미지 선택", template_dir, "Images (*.png *.jpg *.bmp)")
+        if path:
+            # templates 폴더 안의 파일은 상대 경로로 저장 (다른 PC에서도 같은 명령어 사용)
+            if os.path.abspath(path).startswith(os.path.abspath(template_dir) + os.sep):
+                path = os.path.relpath(path, template_dir)
+            self.template_input.setText(path)
+    
+    def on_capture_template(self):
+        """드래그한 화면 영역을 템플릿 파일로 저장"""
+        saved = (self.x_input.value(), self.y_input.value(), self.width_input.value(), self.height_input.value())
+        try:
+            self.on_get_coordinates()
+            x, y, width, height = self._absolute_region(
+                self.x_input.value(), self.y_input.value(), self.width_input.value(), self.height_input.value())
+            image = capture_region(x, y, width, height)
+            os.makedirs(template_dir, exist_ok=True)
+            name = f"template_{datetime.now().strftime('%y%m%d_%H%M%S')}.png"
+            image.save(os.path.join(template_dir, name))
+            self.template_input.setText(name)
+            print(f"템플릿 저장: {os.path.join(template_dir, name)}")
+        except Exception as e:
+            QMessageBox.warning(None, "템플릿 캡처 오류", f"템플릿을 저장하지 못했습니다:\n{e}")
+        finally:
+            # 템플릿 캡처용 드래그는 검색 영역을 바꾸지 않음
+            for spin, value in zip((self.x_input, self.y_input, self.width_input, self.height_input), saved):
+                spin.setValue(value)
+    
+    def _selected_window_coords(self):
+        """UI 테스트용: 선택된 윈도우 좌표 (x, y, width, height), 없으면 None"""
+        try:
+            import pygetwindow as gw
+            if self.main_app and hasattr(self.main_app, 'window_dropdown'):
+                selected_window = self.main_app.window_dropdown.currentText()
+                windows = gw.getWindowsWithTitle(selected_window) if selected_window else []
+                if windows:
+                    window = windows[0]
+                    return window.left, window.top, window.width, window.height
+        except Exception as e:
+            print(f"윈도우 좌표 확인 실패, 절대 좌표 사용: {e}")
+        return None
+    
+    def _absolute_region(self, x, y, width, height):
+        """UI 캡처용: 선택된 윈도우 기준 상대 좌표 → 절대 좌표 (윈도우가 없으면 그대로)"""
+        window_coords = self._selected_window_coords()
+        if window_coords:
+            if width == 0 or height == 0:
+                return window_coords
+            return x + window_coords[0], y + window_coords[1], width, height
+        return x, y, width, height
+    
+    def on_test_match(self):
+        """현재 설정으로 한 번 검색하여 점수와 소요시간 표시"""
+        template = self.template_input.text().strip()
+        if not template:
+            QMessageBox.warning(None, "매칭 테스트", "템플릿 이미지를 지정하세요.")
+            return
+        try:
+            # 실행과 같은 경로로 검색 영역 계산 (좌표 모드 포함)
+            params = self.parse_params(self.get_command_string().split()[1:])
+            x, y, width, height = self._resolve_search_region(params, self._selected_window_coords())
+            if width == 0 or height == 0:
+                QMessageBox.warning(None, "매칭 테스트", "검색 영역이 없습니다. 윈도우를 선택하거나 width/height를 지정하세요.")
+                return
+            frame = capture_region(x, y, width, height)
+            start = time.perf_counter()
+            match = find_template(frame, template)
+            elapsed = (time.perf_counter() - start) * 1000
+            if match is None:
+                QMessageBox.warning(None, "매칭 테스트", "템플릿이 검색 영역보다 큽니다.")
+                return
+            found = match.score >= self.threshold_input.value()
+            QMessageBox.information(
+                None, "매칭 테스트",
+                f"{'✅ 발견' if found else '❌ 기준 미달'}\n"
+                f"점수: {match.score:.3f} (기준 {self.threshold_input.value():.2f})\n"
+                f"위치: ({x + match.x}, {y + match.y}) {match.width}x{match.height}\n"
+                f"소요시간: {elapsed:.1f}ms")
+        except Exception as e:
+            QMessageBox.critical(None, "매칭 테스트 오류", f"테스트 중 오류가 발생했습니다:\n{e}")
+    
+    def parse_params(self, params):
+        params, options = split_option_tokens(params)
+        if len(params) < 5:
+            return {}
+        try:
+            parsed = {
+                'x': int(params[0]),
+                'y': int(params[1]),
+                'width': int(params[2]),
+                'height': int(params[3]),
+                'threshold': 0.9,
+                'max_tries': self.default_max_tries,
+                'coord_mode': 'scaled',
+            }
+            
+            # 템플릿 경로 (따옴표 안의 공백 허용)
+            param_idx = 4
+            if params[param_idx].startswith('"'):
+                parts = []
+                while param_idx < len(params):
+                    parts.append(params[param_idx])
+                    param_idx += 1
+                    if parts[-1].endswith('"') and (len(parts) > 1 or len(parts[0]) > 1):
+                        break
+                parsed['template'] = ' '.join(parts).strip('"')
+            else:
+                parsed['template'] = params[param_idx]
+                param_idx += 1
+            
+            # 선택 파라미터: threshold(소수), max_tries(정수), coord_mode
+            for token in params[param_idx:]:
+                lowered = token.lower()
+                if lowered in ['offset', 'scaled']:
+                    parsed['coord_mode'] = lowered
+                elif '.' in token:
+                    parsed['threshold'] = float(token)
+                else:
+                    parsed['max_tries'] = int(token)
+            
+            parsed['interval'] = float(options.get('interval', 1))
+            return parsed
+        except (ValueError, IndexError):
+            return {}
+    
+    def set_ui_values(self, params):
+        if not params:
+            return
+        self.x_input.setValue(params.get('x', 0))
+        self.y_input.setValue(params.get('y', 0))
+        self.width_input.setValue(params.get('width', 0))
+        self.height_input.setValue(params.get('height', 0))
+        self.template_input.setText(params.get('template', ''))
+        self.threshold_input.setValue(params.get('threshold', 0.9))
+        self.max_tries_input.setValue(params.get('max_tries', self.default_max_tries))
+        self.interval_input.setValue(params.get('interval', 1))
+        self.coord_mode_combo.setCurrentIndex(1 if params.get('coord_mode', 'scaled') == 'offset' else 0)
+    
+    def get_command_string(self):
+        coord_mode = 'offset' if self.coord_mode_combo.currentIndex() == 1 else 'scaled'
+        template = f'"{self.template_input.text().strip()}"'
+        command_str = (f"{self.command_word} {self.x_input.value()} {self.y_input.value()} "
+                       f"{self.width_input.value()} {self.height_input.value()} {template} "
+                       f"{self.threshold_input.value():.2f} {self.max_tries_input.value()} {coord_mode}")
+        interval = round(self.interval_input.value(), 1)
+        if interval != 1:
+            command_str += f" interval={interval:g}"
+        return command_str
+    
+    def _resolve_search_region(self, params, window_coords):
+        """검색 영역 절대 좌표 → (x, y, width, height) (실행/매칭 테스트 공용)"""
+        x = params.get('x', 0)
+        y = params.get('y', 0)
+        width = params.get('width', 0)
+        height = params.get('height', 0)
+        if not window_coords:
+            return x, y, width, height
+        
+        if width == 0 or height == 0:
+            # 윈도우 전체 검색
+            return window_coords
+        if params.get('coord_mode', 'scaled') == 'offset':
+            x, y = calculate_offset_coordinates(x, y, window_coords)
+        else:
+            # 스케일링: TestText/WaitUntil과 같이 x/y만 보정
+            x, y = calculate_adjusted_coordinates(x, y, window_coords)
+        return x, y, width, height
+    
+    def search(self, params, window_coords=None, processor_state=None):
+        """템플릿이 나타날 때까지 반복 검색
+
+        Returns:
+            (screen_x, screen_y, match) - 발견한 템플릿의 화면 좌상단 좌표와 결과, 못 찾거나 중지되면 None
+        """
+        template = params.get('template')
+        if not template:
+            print(f"오류: {self.command_word} 명령어에 템플릿 경로가 없습니다.")
+            return None
+        if not os.path.exists(resolve_template_path(template)):
+            print(f"오류: 템플릿 파일을 찾을 수 없습니다: {resolve_template_path(template)}")
+            return None
+        
+        x, y, width, height = self._resolve_search_region(params, window_coords)
+        if width == 0 or height == 0:
+            print(f"오류: {self.command_word} 검색 영역이 없습니다. (윈도우 미선택 시 width/height 지정 필요)")
+            return None
+        threshold = params.get('threshold', 0.9)
+        max_tries = params.get('max_tries', self.default_max_tries)
+        interval = params.get('interval', 1)
+        print(f"🖼 템플릿 '{template}' 검색 중... (영역 {x},{y},{width},{height}, 기준 {threshold:.2f}, 최대 {max_tries}회)")
+        
+        change_key = f"{self.command_word}:{x},{y},{width},{height}"
+        get_change_detector().reset(change_key)
+        
+        for i in range(max_tries):
+            processor = params.get('processor') if params else None
+            if processor and hasattr(processor, 'stop_flag') and processor.stop_flag:
+                print(f"⚠️ {self.name} 중지됨 ({i}/{max_tries}번째 시도)")
+                return None
+            if processor_state and processor_state.get('stop_requested', False):
+                print(f"⚠️ {self.name} 중지됨 (state 플래그, {i}/{max_tries}번째 시도)")
+                return None
+            
+            try:
+                frame = capture_region(x, y, width, height)
+                if frame is None:
+                    print(f"[{i+1}/{max_tries}] 스크린샷 촬영 실패")
+                elif not region_changed(change_key, frame):
+                    # 화면이 그대로면 결과도 같으므로 매칭 생략
+                    print(f"[{i+1}/{max_tries}] 화면 변화 없음 - 매칭 생략")
+                else:
+                    start = time.perf_counter()
+                    match = find_template(frame, template)
+                    elapsed = (time.perf_counter() - start) * 1000
+                    if match is None:
+                        print(f"오류: 템플릿이 검색 영역보다 큽니다. ({width}x{height})")
+                        return None
+                    if processor_state is not None:
+                        processor_state['screenshot_image'] = frame
+                        processor_state['screenshot_path'] = None
+                    if match.score >= threshold:
+                        print(f"✓ 템플릿 발견: ({x + match.x}, {y + match.y}) 점수 {match.score:.3f} "
+                              f"({elapsed:.1f}ms, {i+1}번째 시도)")
+                        return x + match.x, y + match.y, match
+                    print(f"[{i+1}/{max_tries}] 최고 점수 {match.score:.3f} < {threshold:.2f} ({elapsed:.1f}ms)")
+            except Exception as e:
+                print(f"[{i+1}/{max_tries}] 오류 발생: {e}")
+                get_change_detector().reset(change_key)
+            
+            if i < max_tries - 1 and self._interruptible_sleep(interval, params, f"retry wait ({i+1}/{max_tries})"):
+                return None
+        
+        print(f"✗ 타임아웃: {max_tries}회 시도 후에도 템플릿 '{template}'을 찾지 못했습니다.")
+        get_frame_buffer().dump((x, y, width, height), self.command_word)
+        return None
+
+
+class WaitUntilImageCommand(ImageMatchCommandBase):
+    """템플릿 이미지가 나타날 때까지 대기하는 명령어"""
+    
+    command_word = "waituntilimage"
+    default_max_tries = 10
+    
+    @property
+    def name(self):
+        return "WaitUntilImage"
+    
+    @property
+    def description(self):
+        return "아이콘/버튼 등 참조 이미지가 화면 영역에 나타날 때까지 반복 검색 (OCR 없이 이미지 매칭)"
+    
+    def execute(self, params, window_coords=None, processor_state=None):
+        if not params:
+            print("오류: waituntilimage 명령어에 필요한 파라미터가 없습니다.")
+            return
+        self.search(params, window_coords, processor_state)
+
+
+class ClickImageCommand(ImageMatchCommandBase):
+    """템플릿 이미지를 찾아 중앙을 클릭하는 명령어"""
+    
+    command_word = "clickimage"
+    default_max_tries = 1
+    
+    @property
+    def name(self):
+        return "ClickImage"
+    
+    @property
+    def description(self):
+        return "참조 이미지를 화면 영역에서 찾아 그 중앙을 클릭 (못 찾으면 클릭하지 않음)"
+    
+    def execute(self, params, window_coords=None, processor_state=None):
+        if not params:
+            print("오류: clickimage 명령어에 필요한 파라미터가 없습니다.")
+            return
+        found = self.search(params, window_coords, processor_state)
+        if found is None:
+            print("템플릿을 찾지 못해 클릭하지 않습니다.")
+            return
+        left, top, match = found
+        click_x = left + match.width // 2
+        click_y = top + match.height // 2
+        # 검색은 다른 클라이언트와 겹쳐 실행하고 클릭만 입력 중재 잠금 안에서 실행
+        with input_burst(params.get('processor')):
+            pyd.moveTo(click_x, click_y)
+            pyd.mouseDown()
+            time.sleep(0.05)
+            pyd.mouseUp()
+        print(f'Clicked image at ({click_x}, {click_y})')
+
+
+class ScreenTextCommandBase(CommandBase):
+    """화면 텍스트 인덱스 질의 명령어 공통 기능 (FindText / ClickText)
+
+    명령어 형식: <이름> "텍스트" [contains|exact|fuzzy] [max_tries] [i2s|i2skr] [interval=초] [region=x,y,w,h] [fuzzy=기준]
+    - 창 전체를 한 번 OCR한 인덱스에서 찾으므로 좌표 지정이 필요 없음
+    - region은 창 기준 상대 좌표 (같은 텍스트가 여러 곳에 있을 때 범위 제한)
+    """
+    
+    command_word = ""
+    default_max_tries = 10
+    requires_params = True
+    
+    def _interruptible_sleep(self, duration, params, context=""):
+        """중지 플래그를 체크하면서 대기 (중지되면 True)"""
+        if duration <= 0:
+            return False
+        
+        check_interval = 0.1
+        total_slept = 0
+        while total_slept < duration:
+            processor = params.get('processor') if params else None
+            if processor and hasattr(processor, 'stop_flag') and processor.stop_flag:
+                print(f"⚠️ {self.name} {context} 중지됨 (경과시간: {total_slept:.1f}초/{duration}초)")
+                return True
+            sleep_time = min(check_interval, duration - total_slept)
+            time.sleep(sleep_time)
+            total_slept += sleep_time
+        return False
+    
+    def create_ui(self):
+        widget = QWidget()
+        layout = QVBoxLayout()
+        
+        text_layout = QHBoxLayout()
+        text_layout.addWidget(QLabel('찾을 텍스트:'))
+        self.text_input = QLineEdit()
+        self.text_input.setPlaceholderText("화면에서 찾을 텍스트 (좌표 지정 불필요)")
+        text_layout.addWidget(self.text_input)
+        layout.addLayout(text_layout)
+        
+        option_layout = QHBoxLayout()
+        option_layout.addWidget(QLabel('매칭 모드:'))
+        self.match_mode_combo = QComboBox()
+        self.match_mode_combo.addItems(['일부 포함', '완전 일치', '유사 일치'])
+        self.fuzzy = None
+        option_layout.addWidget(self.match_mode_combo)
+        option_layout.addWidget(QLabel('OCR:'))
+        self.ocr_combo = QComboBox()
+        self.ocr_combo.addItems(['i2s (English)', 'i2skr (Korean)'])
+        self.ocr_combo.setCurrentIndex(1)
+        option_layout.addWidget(self.ocr_combo)
+        layout.addLayout(option_layout)
+        
+        tries_layout = QHBoxLayout()
+        tries_layout.addWidget(QLabel('최대 시도:'))
+        self.max_tries_input = QSpinBox()
+        self.max_tries_input.setRange(1, 10000)
+        self.max_tries_input.setValue(self.default_max_tries)
+        tries_layout.addWidget(self.max_tries_input)
+        tries_layout.addWidget(QLabel('간격(초):'))
+        self.interval_input = QDoubleSpinBox()
+        self.interval_input.setRange(0.1, 60)
+        self.interval_input.setSingleStep(0.1)
+        self.interval_input.setValue(1)
+        tries_layout.addWidget(self.interval_input)
+        layout.addLayout(tries_layout)
+        
+        region_layout = QHBoxLayout()
+        region_layout.addWidget(QLabel('검색 범위:'))
+        self.region_input = QLineEdit()
+        self.region_input.setPlaceholderText("창 전체 (제한하려면 상대 좌표 x,y,w,h)")
+        region_layout.addWidget(self.region_input)
+        layout.addLayout(region_layout)
+        
+        self.test_find_btn = QPushButton('찾기 테스트')
+        self.test_find_btn.clicked.connect(self.on_test_find)
+        layout.addWidget(self.test_find_btn)
+        
+        widget.setLayout(layout)
+        return widget
+    
+    def on_test_find(self):
+        """선택된 창을 인덱싱하여 일치 구절 표시"""
+        params = self.parse_params(self.get_command_string().split()[1:])
+        try:
+            import pygetwindow as gw
+            window_coords = None
+            if self.main_app and hasattr(self.main_app, 'window_dropdown'):
+                selected_window = self.main_app.window_dropdown.currentText()
+                windows = gw.getWindowsWithTitle(selected_window) if selected_window else []
+                if windows:
+                    window = windows[0]
+                    window_coords = (window.left, window.top, window.width, window.height)
+            if window_coords is None:
+                QMessageBox.warning(None, "찾기 테스트", "대상 윈도우를 선택하세요.")
+                return
+            start = time.perf_counter()
+            matches = self.find_once(params, window_coords)
+            elapsed = time.perf_counter() - start
+            if matches:
+                lines = [f"({box.x}, {box.y}) {box.width}x{box.height} '{box.text}' 신뢰도 {box.confidence:.0f}"
+                         for box in matches]
+                QMessageBox.information(None, "찾기 테스트", f"✅ {len(matches)}곳 발견 ({elapsed:.2f}s)\n" + '\n'.join(lines))
+            else:
+                QMessageBox.information(None, "찾기 테스트", f"❌ 찾지 못했습니다. ({elapsed:.2f}s)")
+        except Exception as e:
+            QMessageBox.critical(None, "찾기 테스트 오류", f"테스트 중 오류가 발생했습니다:\n{e}")
+    
+    def parse_params(self, params):
+        params, options = split_option_tokens(params)
+        match = re.match(r'^"([^"]*)"\s*(.*)$', ' '.join(params))
+        if match:
+            text, rest = match.group(1), match.group(2).split()
+        elif params:
+            text, rest = params[0], params[1:]
+        else:
+            return {}
+        if not text:
+            return {}
+        
+        parsed = {
+            'text': text,
+            'exact_match': False,
+            'fuzzy': None,
+            'max_tries': self.default_max_tries,
+            'ocr_type': 'i2skr',
+            'region': None,
+        }
+        try:
+            for token in rest:
+                lowered = token.lower()
+                if lowered in ['exact', 'contains']:
+                    parsed['exact_match'] = lowered == 'exact'
+                elif lowered == 'fuzzy':
+                    parsed['fuzzy'] = True
+                elif lowered in OCR_TYPE_LANGS:
+                    parsed['ocr_type'] = lowered
+                else:
+                    parsed['max_tries'] = int(token)
+            parsed['interval'] = float(options.get('interval', 1))
+            if options.get('region'):
+                region = tuple(int(v) for v in options['region'].split(','))
+                if len(region) != 4:
+                    raise ValueError(f"region은 x,y,w,h 형식이어야 합니다: {options['region']}")
+                parsed['region'] = region
+        except ValueError as e:
+            print(f"{self.command_word} 파싱 오류: {e}")
+            return {}
+        parsed['fuzzy'] = parse_fuzzy_option(options, parsed['fuzzy'])
+        return parsed
+    
+    def set_ui_values(self, params):
+        if not params:
+            return
+        self.text_input.setText(params.get('text', ''))
+        exact_match = params.get('exact_match', False)
+        self.fuzzy = params.get('fuzzy')
+        self.match_mode_combo.setCurrentIndex(1 if exact_match else 2 if self.fuzzy else 0)
+        self.ocr_combo.setCurrentIndex(0 if params.get('ocr_type') == 'i2s' else 1)
+        self.max_tries_input.setValue(params.get('max_tries', self.default_max_tries))
+        self.interval_input.setValue(params.get('interval', 1))
+        region = params.get('region')
+        self.region_input.setText(','.join(str(v) for v in region) if region else '')
+    
+    def get_command_string(self):
+        match_mode = ['contains', 'exact', 'fuzzy'][self.match_mode_combo.currentIndex()]
+        ocr_type = 'i2s' if self.ocr_combo.currentIndex() == 0 else 'i2skr'
+        command_str = f'{self.command_word} "{self.text_input.text()}" {match_mode} {self.max_tries_input.value()} {ocr_type}'
+        interval = round(self.interval_input.value(), 1)
+        if interval != 1:
+            command_str += f" interval={interval:g}"
+        region = self.region_input.text().replace(' ', '')
+        if region:
+            command_str += f" region={region}"
+        command_str += format_fuzzy_option(self.fuzzy, self.match_mode_combo.currentIndex())
+        return command_str
+    
+    def find_once(self, params, window_coords):
+        """창을 캡처하여 인덱스(화면이 그대로면 재사용)에서 텍스트 검색 → 일치 구절 목록"""
+        win_x, win_y, win_w, win_h = window_coords
+        frame = capture_region(win_x, win_y, win_w, win_h)
+        lang_code = OCR_TYPE_LANGS[params.get('ocr_type', 'i2skr')]
+        index = get_screen_text_index().get((win_x, win_y, win_w, win_h), lang_code, frame)
+        region = params.get('region')
+        if region:
+            region = (win_x + region[0], win_y + region[1], region[2], region[3])
+        return index.find(params['text'], params.get('exact_match', False), params.get('fuzzy'), region)
+    
+    def search(self, params, window_coords=None, processor_state=None):
+        """텍스트가 나타날 때까지 반복 검색 → 첫 번째 일치 구절 TextBox (못 찾거나 중지되면 None)"""
+        if not params or not params.get('text'):
+            print(f"오류: {self.command_word} 명령어에 찾을 텍스트가 없습니다.")
+            return None
+        if not window_coords:
+            print(f"오류: {self.command_word}는 대상 윈도우가 필요합니다.")
+            return None
+        
+        text = params['text']
+        max_tries = params.get('max_tries', self.default_max_tries)
+        interval = params.get('interval', 1)
+        match_mode_text = match_mode_label(params.get('exact_match', False), params.get('fuzzy'))
+        print(f"🔎 화면에서 '{text}' 검색 중... (매칭모드: {match_mode_text}, 최대 {max_tries}회)")
+        
+        for i in range(max_tries):
+            processor = params.get('processor') if params else None
+            if processor and hasattr(processor, 'stop_flag') and processor.stop_flag:
+                print(f"⚠️ {self.name} 중지됨 ({i}/{max_tries}번째 시도)")
+                return None
+            if processor_state and processor_state.get('stop_requested', False):
+                print(f"⚠️ {self.name} 중지됨 (state 플래그, {i}/{max_tries}번째 시도)")
+                return None
+            
+            try:
+                matches = self.find_once(params, window_coords)
+                if matches:
+                    box = matches[0]
+                    print(f"✓ '{text}' 발견: '{box.text}' ({box.x}, {box.y}) {box.width}x{box.height} "
+                          f"({len(matches)}곳, {i+1}번째 시도)")
+                    if processor_state is not None:
+                        processor_state['extracted_text'] = box.text
+                    return box
+                print(f"[{i+1}/{max_tries}] '{text}' 텍스트를 찾지 못했습니다.")
+            except Exception as e:
+                print(f"[{i+1}/{max_tries}] 오류 발생: {e}")
+            
+            if i < max_tries - 1 and self._interruptible_sleep(interval, params, f"retry wait ({i+1}/{max_tries})"):
+                return None
+        
+        print(f"✗ 타임아웃: {max_tries}회 시도 후에도 '{text}' 텍스트를 찾지 못했습니다. (매칭모드: {match_mode_text})")
+        get_frame_buffer().dump(tuple(window_coords), self.command_word)
+        return None
+
+
+class FindTextCommand(ScreenTextCommandBase):
+    """화면 어딘가에 텍스트가 나타날 때까지 대기하는 명령어 (좌표 불필요)"""
+    
+    command_word = "findtext"
+    
+    @property
+    def name(self):
+        return "FindText"
+    
+    @property
+    def description(self):
+        return "창 전체를 OCR한 텍스트 인덱스에서 입력한 텍스트가 나타날 때까지 반복 검색 (좌표 지정 불필요)"
+    
+    def execute(self, params, window_coords=None, processor_state=None):
+        self.search(params, window_coords, processor_state)
+
+
+class ClickTextCommand(ScreenTextCommandBase):
+    """화면에서 텍스트를 찾아 그 위치를 클릭하는 명령어"""
+    
+    command_word = "clicktext"
+    default_max_tries = 1
+    
+    @property
+    def name(self):
+        return "ClickText"
+    
+    @property
+    def description(self):
+        return "창 전체 텍스트 인덱스에서 텍스트를 찾아 그 중앙을 클릭 (버튼 위치가 바뀌어도 동작)"
+    
+    def execute(self, params, window_coords=None, processor_state=None):
+        box = self.search(params, window_coords, processor_state)
+        if box is None:
+            print("텍스트를 찾지 못해 클릭하지 않습니다.")
+            return
+        click_x, click_y = box.center
+        with input_burst(params.get('processor')):
+            pyd.moveTo(click_x, click_y)
+            pyd.mouseDown()
+            time.sleep(0.05)
+            pyd.mouseUp()
+        print(f"Clicked text '{box.text}' at ({click_x}, {click_y})")
+
+
 class MouseWheelCommand(CommandBase):
     """마우스 휠 조작 명령어"""
     
+    uses_input = True
+    requires_params = True
+    
     @property
     def name(self):
         return "MouseWheel"
@@ -2543,6 +3515,8 @@ class MouseWheelCommand(CommandBase):
 class TestTextCommand(CommandBase):
     """텍스트 추출 기반 Pass/Fail 판별 명령어"""
     
+    requires_params = True
+    
     @property
     def name(self): 
         return "TestText"
@@ -2660,7 +3634,9 @@ class TestTextCommand(CommandBase):
         match_layout = QHBoxLayout()
         match_layout.addWidget(QLabel('매칭 모드:'))
         self.match_mode_combo = QComboBox()
-        self.match_mode_combo.addItems(['일부 포함', '완전 일치'])
+        self.match_mode_combo.addItems(['일부 포함', '완전 일치', '유사 일치'])
+        self.match_mode_combo.setToolTip("유사 일치: OCR 오인식(0/O, l/1, 한글 자모) 한두 글자 차이를 허용하는 일부 포함")
+        self.fuzzy = None
         match_layout.addWidget(self.match_mode_combo)
         layout.addLayout(match_layout)
         
@@ -2673,6 +3649,23 @@ class TestTextCommand(CommandBase):
         coord_mode_layout.addWidget(self.coord_mode_combo)
         layout.addLayout(coord_mode_layout)
         
+        # 전처리 파이프라인 (비우면 기본 전처리)
+        preprocess_layout = QHBoxLayout()
+        preprocess_layout.addWidget(QLabel('전처리:'))
+        self.preprocess_input = QLineEdit()
+        self.preprocess_input.setPlaceholderText("기본 (예: sauvola, otsu, gray,invert,otsu,crop,scale2)")
+        preprocess_layout.addWidget(self.preprocess_input)
+        layout.addLayout(preprocess_layout)
+        
+        # 지연 검사 (반복 확인이 아닐 때만 적용)
+        defer_layout = QHBoxLayout()
+        defer_layout.addWidget(QLabel('지연 검사:'))
+        self.defer_combo = QComboBox()
+        self.defer_combo.addItems(['설정 따름', '사용', '사용 안 함'])
+        self.defer_combo.setToolTip("사용: 영역만 캡처하고 바로 다음 명령어로 진행, OCR/비교는 백그라운드에서 실행 (결과는 ShowResults/ExportResult 전에 합쳐짐)")
+        defer_layout.addWidget(self.defer_combo)
+        layout.addLayout(defer_layout)
+        
         # 반복 확인 옵션
         repeat_layout = QHBoxLayout()
         repeat_layout.addWidget(QLabel('반복 확인:'))
@@ -2707,6 +3700,9 @@ class TestTextCommand(CommandBase):
         self.wait_interval_input.setEnabled(checked)
     
     def parse_params(self, params):
+        # key=value 옵션 분리 (pp=sauvola 등)
+        params, options = split_option_tokens(params)
+        
         # 전체 명령어 문자열 재구성
         full_command = 'testtext ' + ' '.join(params)
         print(f"testtext 전체 명령어: {full_command}")
@@ -2745,6 +3741,8 @@ class TestTextCommand(CommandBase):
                 match_mode = groups[7].lower()
                 if match_mode in ['exact', 'true', '1']:
                     parsed['exact_match'] = True
+                elif match_mode == 'fuzzy':
+                    parsed['fuzzy'] = True
                     
             # coord_mode 처리 (선택적)
             if len(groups) > 8 and groups[8]:
@@ -2778,6 +3776,13 @@ class TestTextCommand(CommandBase):
                 if no_expected in ['noexpected', 'true', '1']:
                     parsed['no_expected'] = True
             
+            # 전처리 파이프라인 옵션 (기본값: 기존 전처리)
+            parsed['preprocess'] = parse_preprocess_option(options)
+            # 유사 일치 옵션 (fuzzy 매칭 모드 또는 fuzzy=기준)
+            parsed['fuzzy'] = parse_fuzzy_option(options, parsed.get('fuzzy'))
+            # 지연 검사 옵션 (없으면 설정의 지연 검사 사용 여부를 따름)
+            parsed['defer'] = parse_defer_option(options)
+            
             print(f"testtext 파싱 성공: {parsed}")
             return parsed
             
@@ -2808,9 +3813,10 @@ class TestTextCommand(CommandBase):
         no_expected = params.get('no_expected', False)
         self.no_expected_checkbox.setChecked(no_expected)
         
-        # 매칭 모드 설정 (완전일치면 1, 일부포함이면 0)
+        # 매칭 모드 설정 (완전일치면 1, 유사 일치면 2, 일부포함이면 0)
         exact_match = params.get('exact_match', False)
-        self.match_mode_combo.setCurrentIndex(1 if exact_match else 0)
+        self.fuzzy = params.get('fuzzy')
+        self.match_mode_combo.setCurrentIndex(1 if exact_match else 2 if self.fuzzy else 0)
         
         # 좌표 모드 설정
         coord_mode = params.get('coord_mode', 'scaled')
@@ -2830,12 +3836,19 @@ class TestTextCommand(CommandBase):
         # 대기 시간
         wait_interval = params.get('wait_interval', 1)
         self.wait_interval_input.setValue(wait_interval)
+        
+        # 전처리 파이프라인
+        self.preprocess_input.setText(params.get('preprocess') or '')
+        
+        # 지연 검사 (None: 설정 따름)
+        defer = params.get('defer')
+        self.defer_combo.setCurrentIndex(0 if defer is None else 1 if defer else 2)
     
     def get_command_string(self):
         ocr_type = 'i2skr' if self.ocr_combo.currentIndex() == 1 else 'i2s'
         title = f'"{self.title_input.text()}"'  # 제목을 따옴표로 묶음
         expected_text = f'"{self.text_input.text()}"'  # 텍스트를 따옴표로 묶음
-        match_mode = 'exact' if self.match_mode_combo.currentIndex() == 1 else 'contains'
+        match_mode = ['contains', 'exact', 'fuzzy'][self.match_mode_combo.currentIndex()]
         coord_mode = 'offset' if self.coord_mode_combo.currentIndex() == 1 else 'scaled'
         
         # 반복 모드 처리
@@ -2857,21 +3870,160 @@ class TestTextCommand(CommandBase):
             if self.no_expected_checkbox.isChecked():
                 command_str += f" '' 0 0 noexpected"
         
+        # 전처리/유사 일치 옵션은 위치 파라미터 뒤에 key=value로 추가 (기존 명령어 문자열과 호환)
+        preprocess = self.preprocess_input.text().replace(' ', '')
+        if preprocess:
+            command_str += f" pp={preprocess}"
+        command_str += format_fuzzy_option(self.fuzzy, self.match_mode_combo.currentIndex())
+        command_str += ['', ' defer=on', ' defer=off'][self.defer_combo.currentIndex()]
+        
         return command_str
     
+    def _resolve_region(self, params, window_coords):
+        """윈도우 좌표 기준으로 보정한 검사 영역 (x, y, width, height)"""
+        x = params.get('x', 0)
+        y = params.get('y', 0) 
+        width = params.get('width', 100)
+        height = params.get('height', 50)
+        
+        # 좌표 보정
+        if window_coords:
+            coord_mode = params.get('coord_mode', 'scaled')
+            
+            # 좌표 모드에 따라 다른 계산 함수 사용
+            if coord_mode == 'offset':
+                adjusted_coords = calculate_offset_coordinates(x, y, window_coords)
+            else:  # 'scaled'
+                adjusted_coords = calculate_adjusted_coordinates(x, y, window_coords)
+            x, y = adjusted_coords
+        return x, y, width, height
+    
+    def batch_job(self, params, window_coords=None):
+        """일괄 OCR 대상 정보 (key, 영역, 언어) - 반복 모드 등 대상이 아니면 None"""
+        if not params or 'title' not in params or params.get('repeat_mode'):
+            return None
+        lang_code = OCR_TYPE_LANGS.get(params.get('ocr_type', 'i2s'))
+        if lang_code is None:
+            return None
+        x, y, width, height = self._resolve_region(params, window_coords)
+        return f"{x},{y},{width},{height}:{params.get('ocr_type', 'i2s')}", (x, y, width, height), lang_code
+    
+    def _use_prefetched(self, prefetched, frame, expected_text, exact_match, no_expected, fuzzy=None):
+        """일괄 OCR 결과 사용 가능 여부 판단 후 텍스트 반환 (사용 불가 시 None)
+
+        화면이 일괄 캡처 이후 바뀌었거나 통과 조건을 만족하지 못하면 None을 반환하여
+        영역별 OCR로 다시 확인합니다. (몽타주 인식 품질 때문에 Fail이 나지 않도록)
+        """
+        if get_change_detector().differs(prefetched['image'], frame):
+            print("일괄 OCR 이후 화면 변화 - 영역 OCR 실행")
+            return None
+        text = prefetched['text']
+        if no_expected:
+            accepted = bool(text) and prefetched['confidence'] >= 70
+        else:
+            accepted = is_expected_match(text, expected_text, exact_match, fuzzy)
+        if not accepted:
+            return None
+        print(f"⚡ 일괄 OCR 결과 사용 (신뢰도 {prefetched['confidence']:.1f})")
+        return text
+    
+    def _read_text(self, frame, region, ocr_type, expected_text, exact_match, fuzzy, no_expected,
+                   prefetched=None, strategy_key=None, preprocess=None):
+        """캡처한 영역의 텍스트 (일괄 OCR 결과 → 화면 텍스트 인덱스 → 영역 OCR 순)
+
+        Returns:
+            추출된 텍스트 (없으면 ""), 지원하지 않는 OCR 타입이면 None
+        """
+        # 일괄 OCR 결과가 있으면 먼저 확인 (통과 시 영역 OCR 생략)
+        extracted_text = None
+        if prefetched is not None:
+            extracted_text = self._use_prefetched(prefetched, frame, expected_text, exact_match, no_expected, fuzzy)
+        
+        # 유효한 화면 텍스트 인덱스가 있으면 영역 텍스트 확인 (통과 시 영역 OCR 생략)
+        if extracted_text is None and not no_expected:
+            extracted_text = lookup_indexed_text(*region, frame, ocr_type, expected_text, exact_match, fuzzy)
+        
+        # OCR 실행 (조기 종료 최적화: expected_text와 exact_match 전달)
+        if extracted_text is None:
+            if ocr_type == 'i2s':
+                extracted_text = image_to_text(frame, lang='eng', expected_text=expected_text, exact_match=exact_match, fuzzy=fuzzy,
+                                               strategy_key=strategy_key, preprocess=preprocess)
+            elif ocr_type == 'i2skr':
+                extracted_text = image_to_text(frame, lang='kor', expected_text=expected_text, exact_match=exact_match, fuzzy=fuzzy,
+                                               strategy_key=strategy_key, preprocess=preprocess)
+            else:
+                print(f"지원하지 않는 OCR 타입: {ocr_type}")
+                return None
+        
+        return extracted_text or ""
+    
+    @staticmethod
+    def _text_matches(extracted_text, expected_text, exact_match, fuzzy):
+        """기대 텍스트 통과 여부"""
+        if exact_match:
+            # 완전일치: OCR 결과가 기대 텍스트와 정확히 일치하는지 확인
+            match_found = extracted_text.strip() == expected_text.strip()
+        else:
+            # 일부포함: OCR 결과에 기대 텍스트가 포함되어 있는지 확인
+            match_found = expected_text in extracted_text
+        if not match_found and fuzzy:
+            # 유사 일치: 오인식 한두 글자 차이는 정규화/편집 거리 기준으로 허용
+            match_found = is_expected_match(extracted_text, expected_text, exact_match, fuzzy)
+        return match_found
+    
+    def _defer_check(self, params, region, processor_state, prefetched, strategy_key):
+        """영역만 지금 캡처하고 OCR/비교는 백그라운드 검사로 넘김 (결과 순서는 유지)"""
+        title = params.get('title', '테스트 항목')
+        ocr_type = params.get('ocr_type', 'i2s')
+        expected_text = params.get('expected_text', '')
+        exact_match = params.get('exact_match', False)
+        fuzzy = params.get('fuzzy')
+        no_expected = params.get('no_expected', False)
+        match_mode_text = '텍스트 추출' if no_expected else match_mode_label(exact_match, fuzzy)
+        
+        frame = capture_region(*region)
+        if frame is None:
+            print("스크린샷 촬영 실패")
+            return
+        
+        def check():
+            extracted_text = self._read_text(frame, region, ocr_type, expected_text, exact_match, fuzzy,
+                                             no_expected, prefetched, strategy_key, params.get('preprocess'))
+            if extracted_text is None:
+                return {'extracted_text': f"지원하지 않는 OCR 타입: {ocr_type}", 'result': 'Fail',
+                        'screenshot_path': save_screenshot(frame), 'screenshot_image': None}
+            if no_expected or self._text_matches(extracted_text, expected_text, exact_match, fuzzy):
+                print(f"✓ [지연 검사] Pass: {title} - '{extracted_text}'")
+                return {'extracted_text': extracted_text, 'result': 'Pass'}
+            print(f"✗ [지연 검사] Fail: {title} - '{expected_text}' 텍스트를 찾지 못했습니다. (OCR: '{extracted_text}')")
+            return {'extracted_text': extracted_text, 'result': 'Fail',
+                    'screenshot_path': save_screenshot(frame), 'screenshot_image': None}
+        
+        placeholder = {
+            'title': title,
+            'expected_text': '(기대값 없음)' if no_expected else expected_text,
+            'extracted_text': '',
+            'screenshot_path': None,
+            'screenshot_image': frame,
+            'match_mode': match_mode_text,
+            'attempt': 1
+        }
+        if 'test_results' not in processor_state:
+            processor_state['test_results'] = []
+        get_deferred_checks().submit(processor_state['test_results'], placeholder, check)
+        get_frame_buffer().hold_evidence(placeholder)
+        print(f"⏩ 지연 검사 등록: {title} (영역 캡처 완료, OCR은 백그라운드에서 실행)")
+    
     def execute(self, params, window_coords=None, processor_state=None):
         if not params or 'expected_text' not in params or 'title' not in params:
             print("오류: testtext 명령어에 필요한 파라미터가 없습니다.")
             return
             
         title = params.get('title', '테스트 항목')
-        x = params.get('x', 0)
-        y = params.get('y', 0) 
-        width = params.get('width', 100)
-        height = params.get('height', 50)
         ocr_type = params.get('ocr_type', 'i2s')
         expected_text = params.get('expected_text', '')
         exact_match = params.get('exact_match', False)
+        fuzzy = params.get('fuzzy')
         no_expected = params.get('no_expected', False)
         
         # 반복 확인 설정
@@ -2879,18 +4031,14 @@ class TestTextCommand(CommandBase):
         max_tries = params.get('max_tries', 10)
         wait_interval = params.get('wait_interval', 1)
         
-        # 좌표 보정
-        if window_coords:
-            coord_mode = params.get('coord_mode', 'scaled')
-            
-            # 좌표 모드에 따라 다른 계산 함수 사용
-            if coord_mode == 'offset':
-                adjusted_coords = calculate_offset_coordinates(x, y, window_coords)
-            else:  # 'scaled'
-                adjusted_coords = calculate_adjusted_coordinates(x, y, window_coords)
-            x, y = adjusted_coords
+        x, y, width, height = self._resolve_region(params, window_coords)
+        
+        # 연속 TestText 일괄 OCR로 미리 받아 둔 결과 (단일 검사만 해당)
+        prefetched = None
+        if not repeat_mode and processor_state and processor_state.get('ocr_prefetch'):
+            prefetched = processor_state['ocr_prefetch'].pop(f"{x},{y},{width},{height}:{ocr_type}", None)
         
-        match_mode_text = "완전일치" if exact_match else "일부포함"
+        match_mode_text = match_mode_label(exact_match, fuzzy)
         if no_expected:
             print(f"테스트 실행: {title} - 기대값 없음 (텍스트 추출만 수행)")
         else:
@@ -2901,6 +4049,23 @@ class TestTextCommand(CommandBase):
         current_try = 0
         max_attempts = max_tries if repeat_mode else 1
         
+        # 반복 모드: 화면 변화 감지 기준 초기화 (첫 시도는 항상 OCR)
+        change_key = f"testtext:{x},{y},{width},{height}"
+        get_change_detector().reset(change_key)
+        # 번들 단계(제목)+영역별 OCR 전략 학습 키
+        preprocess = params.get('preprocess')
+        strategy_key = f"testtext:{title}:{x},{y},{width},{height}:{ocr_type}"
+        if preprocess:
+            strategy_key += f":{preprocess}"
+        
+        # 지연 검사: 결과가 흐름에 영향을 주지 않는 단일 검사는 캡처만 하고 다음 명령어로 진행
+        defer = params.get('defer')
+        if defer is None:
+            defer = get_deferred_checks().enabled
+        if defer and not repeat_mode and processor_state is not None:
+            self._defer_check(params, (x, y, width, height), processor_state, prefetched, strategy_key)
+            return
+        
         while current_try < max_attempts:
             # 중지 플래그 체크 (각 반복 시작 시)
             processor = params.get('processor') if params else None
@@ -2913,10 +4078,11 @@ class TestTextCommand(CommandBase):
             if repeat_mode:
                 print(f"[{current_try}/{max_attempts}] 텍스트 검사 시도 중...")
             
+            frame = None
             try:
-                # 스크린샷 촬영
-                screenshot_path = take_screenshot_with_coords(x, y, width, height)
-                if not screenshot_path:
+                # 영역 캡처 (메모리 프레임으로 바로 OCR, 실패 시에만 디스크 저장)
+                frame = capture_region(x, y, width, height)
+                if frame is None:
                     print("스크린샷 촬영 실패")
                     if not repeat_mode:
                         return
@@ -2925,17 +4091,20 @@ class TestTextCommand(CommandBase):
                         return
                     continue
                 
-                # OCR 실행 (조기 종료 최적화: expected_text와 exact_match 전달)
-                if ocr_type == 'i2s':
-                    extracted_text = image_to_text(screenshot_path, lang='eng', expected_text=expected_text, exact_match=exact_match)
-                elif ocr_type == 'i2skr':
-                    extracted_text = image_to_text(screenshot_path, lang='kor', expected_text=expected_text, exact_match=exact_match)
-                else:
-                    print(f"지원하지 않는 OCR 타입: {ocr_type}")
-                    return
+                # 반복 모드에서 마지막 OCR 이후 화면이 그대로면 결과도 같으므로 OCR 생략
+                # (마지막 시도는 최종 결과 기록을 위해 항상 OCR - 동일 프레임이면 OCR 캐시 적중)
+                changed = region_changed(change_key, frame) if repeat_mode else True
+                if not changed and current_try < max_attempts:
+                    print(f"[{current_try}/{max_attempts}] 화면 변화 없음 - OCR 생략, {wait_interval}초 후 재시도...")
+                    if self._interruptible_sleep(wait_interval, params, f"retry wait ({current_try}/{max_attempts})"):
+                        return
+                    continue
                 
-                if not extracted_text:
-                    extracted_text = ""
+                extracted_text = self._read_text(frame, (x, y, width, height), ocr_type, expected_text, exact_match, fuzzy,
+                                                 no_expected, prefetched, strategy_key, preprocess)
+                prefetched = None
+                if extracted_text is None:
+                    return
                 
                 print(f"OCR 결과: '{extracted_text}'")
                 
@@ -2947,22 +4116,16 @@ class TestTextCommand(CommandBase):
                         'expected_text': '(기대값 없음)',
                         'extracted_text': extracted_text,
                         'result': 'Pass',
-                        'screenshot_path': screenshot_path,
+                        'screenshot_path': None,
+                        'screenshot_image': frame,
                         'match_mode': '텍스트 추출',
                         'attempt': current_try
                     }
                     break
                 
                 # 텍스트 매칭 확인 (기대값이 있을 경우만)
-                match_found = False
-                if exact_match:
-                    # 완전일치: OCR 결과가 기대 텍스트와 정확히 일치하는지 확인
-                    match_found = extracted_text.strip() == expected_text.strip()
-                    match_type = "완전일치"
-                else:
-                    # 일부포함: OCR 결과에 기대 텍스트가 포함되어 있는지 확인
-                    match_found = expected_text in extracted_text
-                    match_type = "일부포함"
+                match_found = self._text_matches(extracted_text, expected_text, exact_match, fuzzy)
+                match_type = match_mode_text
                 
                 # 결과 판별
                 result = "Pass" if match_found else "Fail"
@@ -2975,7 +4138,8 @@ class TestTextCommand(CommandBase):
                         'expected_text': expected_text,
                         'extracted_text': extracted_text,
                         'result': result,
-                        'screenshot_path': screenshot_path,
+                        'screenshot_path': None,
+                        'screenshot_image': frame,
                         'match_mode': match_type,
                         'attempt': current_try
                     }
@@ -2988,25 +4152,29 @@ class TestTextCommand(CommandBase):
                             return
                     else:
                         print(f"✗ {result}: '{expected_text}' 텍스트를 찾지 못했습니다. ({match_type})")
+                        if repeat_mode:
+                            # 실패 증거: 반복 확인 중 캡처한 최근 프레임 저장
+                            get_frame_buffer().dump((x, y, width, height), 'testtext')
                         final_result = {
                             'title': title,
                             'expected_text': expected_text,
                             'extracted_text': extracted_text,
                             'result': result,
-                            'screenshot_path': screenshot_path,
+                            'screenshot_path': save_screenshot(frame),
                             'match_mode': match_type,
                             'attempt': current_try
                         }
                 
             except Exception as e:
                 print(f"테스트 실행 중 오류 발생: {e}")
+                get_change_detector().reset(change_key)
                 if not repeat_mode or current_try >= max_attempts:
                     final_result = {
                         'title': title,
                         'expected_text': expected_text,
                         'extracted_text': f"오류: {str(e)}",
                         'result': "Fail",
-                        'screenshot_path': screenshot_path if 'screenshot_path' in locals() else "N/A",
+                        'screenshot_path': save_screenshot(frame) if frame is not None else "N/A",
                         'match_mode': match_type if 'match_type' in locals() else "N/A",
                         'attempt': current_try
                     }
@@ -3024,6 +4192,8 @@ class TestTextCommand(CommandBase):
                 if 'test_results' not in processor_state:
                     processor_state['test_results'] = []
                 processor_state['test_results'].append(final_result)
+                # 통과 프레임은 리포트용으로 한도 안에서만 메모리에 보관
+                get_frame_buffer().hold_evidence(final_result)
             
             print(f"테스트 결과가 저장되었습니다: {title}")
             
@@ -3135,6 +4305,7 @@ class TestTextCommand(CommandBase):
             ocr_type = 'i2skr' if self.ocr_combo.currentIndex() == 1 else 'i2s'
             expected_text = self.text_input.text().strip()
             exact_match = self.match_mode_combo.currentIndex() == 1
+            fuzzy = (self.fuzzy or True) if self.match_mode_combo.currentIndex() == 2 else (self.fuzzy if exact_match else None)
             
             # 상대 좌표를 절대 좌표로 변환 후 스크린샷 촬영
             try:
@@ -3174,12 +4345,14 @@ class TestTextCommand(CommandBase):
                 QMessageBox.warning(None, "테스트 오류", "스크린샷 촬영에 실패했습니다.")
                 return
             
-            # OCR 실행 (expected_text를 전달하여 시도 정보를 _last_ocr_attempts에 저장)
+            # OCR 실행 (expected_text를 전달하여 시도 정보를 현재 스레드에 저장)
             if ocr_type == 'i2s':
-                extracted_text = image_to_text(screenshot_path, lang='eng', expected_text=expected_text, exact_match=exact_match)
+                extracted_text = image_to_text(screenshot_path, lang='eng', expected_text=expected_text, exact_match=exact_match,
+                                               fuzzy=fuzzy)
                 ocr_lang = "영어"
             else:
-                extracted_text = image_to_text(screenshot_path, lang='kor', expected_text=expected_text, exact_match=exact_match)
+                extracted_text = image_to_text(screenshot_path, lang='kor', expected_text=expected_text, exact_match=exact_match,
+                                               fuzzy=fuzzy)
                 ocr_lang = "한국어"
             
             if not extracted_text:
@@ -3195,8 +4368,9 @@ class TestTextCommand(CommandBase):
                 extracted_text=extracted_text,  # 실제 추출된 텍스트 전달
                 expected_text=expected_text,
                 exact_match=exact_match,
-                ocr_attempts=None,  # _last_ocr_attempts 사용
-                total_time=total_time
+                ocr_attempts=None,  # get_last_ocr_attempts() 사용
+                total_time=total_time,
+                fuzzy=fuzzy
             )
             
         except Exception as e:
@@ -3206,6 +4380,8 @@ class TestTextCommand(CommandBase):
 class ShowTestResultsCommand(CommandBase):
     """저장된 테스트 결과를 표시하는 명령어"""
     
+    accepts_params = False
+    
     @property
     def name(self): 
         return "ShowResults"
@@ -3242,6 +4418,9 @@ class ShowTestResultsCommand(CommandBase):
         print("테스트 결과 요약")
         print("="*50)
         
+        # 백그라운드에서 진행 중인 지연 검사 결과를 먼저 합침
+        get_deferred_checks().wait()
+        
         if processor_state is None or 'test_results' not in processor_state:
             print("저장된 테스트 결과가 없습니다.")
             return
@@ -3693,6 +4872,9 @@ class ExportResultCommand(CommandBase):
         print("📋 테스트 결과 내보내기 (exportresult)")
         print("-"*50)
         
+        # 백그라운드에서 진행 중인 지연 검사 결과를 먼저 합침
+        get_deferred_checks().wait()
+        
         if processor_state is None or 'test_results' not in processor_state:
             print("저장된 테스트 결과가 없습니다.")
             return
@@ -3751,6 +4933,10 @@ class ExportResultCommand(CommandBase):
         # 파일명 생성
         timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
         title = params.get('title', '') if params else ''
+        # 다중 클라이언트 실행: 클라이언트마다 같은 시각에 내보내도 파일이 겹치지 않도록 번호 추가
+        client = processor_state.get('client') if processor_state else None
+        if client:
+            timestamp = f"{timestamp}_c{client}"
         
         # 엑셀 파일명 처리
         if excel_filename:
@@ -3758,6 +4944,8 @@ class ExportResultCommand(CommandBase):
             # .xlsx 확장자가 없으면 추가
             if not excel_filename.endswith('.xlsx'):
                 excel_filename = f"{excel_filename}.xlsx"
+            if client:
+                excel_filename = excel_filename.replace('.xlsx', f'_c{client}.xlsx')
             excel_path = os.path.join(test_results_dir, excel_filename)
             
             # 기본 파일명은 엑셀 파일명 기반으로 생성
@@ -3804,6 +4992,11 @@ class ExportResultCommand(CommandBase):
         print(f"📋 실행할 작업: {', '.join(tasks)}")
         print("-" * 50)
         
+        # 메모리에만 있던 통과 프레임은 엑셀에 이미지/경로를 넣을 때만 저장 (이미지 삽입 전에 기록 완료 대기)
+        if export_excel and (include_images or include_screenshot_path):
+            ensure_result_screenshots(test_results)
+            get_artifact_writer().flush()
+        
         # 1. 엑셀 파일 생성
         excel_success = False
         if export_excel:
@@ -3923,7 +5116,6 @@ class ExportResultCommand(CommandBase):
         """
         from openpyxl.drawing.image import Image as OpenpyxlImage
         import os
-        import pyautogui
         from datetime import datetime
         
         # 이미지 삽입 여부 확인 (PIL 불필요 - openpyxl 직접 사용)
@@ -4038,14 +5230,14 @@ class ExportResultCommand(CommandBase):
                                 window = windows[0]
                                 # 앱 윈도우 영역만 캡처
                                 region = (window.left, window.top, window.width, window.height)
-                                app_screenshot = pyautogui.screenshot(region=region)
+                                app_screenshot = capture_region(*region)
                                 app_screenshot.save(full_screenshot_path)
                                 app_captured = True
                                 print(f"  📸 Fail 항목 앱 전체 스크린샷 저장: {full_screenshot_filename} (앱: {target_app})")
                     
                     # 앱 정보가 없거나 윈도우를 찾지 못한 경우 전체 화면 캡처
                     if not app_captured:
-                        full_screenshot = pyautogui.screenshot()
+                        full_screenshot = capture_screen()
                         full_screenshot.save(full_screenshot_path)
                         print(f"  📸 Fail 항목 전체 화면 스크린샷 저장: {full_screenshot_filename} (앱 찾지 못함)")
                     
@@ -4591,6 +5783,9 @@ class ExportResultCommand(CommandBase):
 class RunAppCommand(CommandBase):
     """특정 폴더에서 최신 파일을 찾아 실행하고 윈도우 자동 설정하는 명령어"""
     
+    uses_input = True
+    requires_params = True
+    
     @property
     def name(self): 
         return "RunApp"
@@ -5438,6 +6633,13 @@ class RunAppCommand(CommandBase):
     
     def _auto_select_window(self, window_title, processor_state=None):
         """윈도우 자동 선택 및 메인 앱 새로고침"""
+        if HEADLESS:
+            # 헤드리스 실행: 메인 앱 드롭다운 대신 윈도우 좌표 캐시의 대상만 변경
+            get_window_geometry().set_target(window_title)
+            if processor_state and 'window_info' in processor_state:
+                processor_state['window_info']['target_app'] = window_title
+            print(f"📱 대상 윈도우 변경 (헤드리스): {window_title}")
+            return True
         try:
             import pygetwindow as gw
             from PyQt5.QtWidgets import QApplication
@@ -5779,6 +6981,10 @@ COMMAND_REGISTRY = {
     'I2SKR': I2skrCommand(),
     'OCR': OCRCommand(),  # ← 개선된 OCR (자동 언어 감지, 다중 줄 지원)
     'WaitUntil': WaitUntilCommand(),
+    'WaitUntilImage': WaitUntilImageCommand(),  # ← 템플릿 이미지가 나타날 때까지 대기
+    'ClickImage': ClickImageCommand(),  # ← 템플릿 이미지를 찾아 클릭
+    'FindText': FindTextCommand(),  # ← 화면 텍스트 인덱스에서 텍스트 대기 (좌표 불필요)
+    'ClickText': ClickTextCommand(),  # ← 화면 텍스트를 찾아 클릭
     'TestText': TestTextCommand(),  # ← 텍스트 추출 기반 Pass/Fail 판별 명령어
     'ShowResults': ShowTestResultsCommand(),  # ← 테스트 결과 표시 명령어
     'ExportResult': ExportResultCommand(),  # ← 테스트 결과 다양한 형태로 내보내기 명령어 (엑셀, 텍스트, 슬랙)
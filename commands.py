@@ -7,7 +7,11 @@
 import logger_setup
 
 import os
-from command_registry import get_command
+from ocr_batch import prefetch_regions
+from execution_plan import compile_step
+from window_geometry import get_window_geometry
+from input_arbiter import input_burst
+from profiler import profile_span
 
 
 class CommandProcessor:
@@ -16,9 +20,14 @@ class CommandProcessor:
     def __init__(self):
         self.stop_flag = False
         self.main_app = None  # 메인 앱 참조 추가
+        # 다중 클라이언트 실행 (multi_client.py): 클라이언트별 윈도우 좌표 캐시 / 공용 입력 중재자
+        self.geometry = None  # None이면 전역 윈도우 좌표 캐시 (드롭다운 선택)
+        self.arbiter = None   # None이면 입력 잠금 없이 실행
         # 프로세서 상태 (명령어 간 데이터 공유용)
         self.state = {
             'screenshot_path': None,
+            'screenshot_image': None,  # 메모리 캡처 프레임 (필요할 때만 디스크 저장)
+            'ocr_prefetch': {},  # 연속 TestText 일괄 OCR 결과 {영역 키: 결과}
             'extracted_text': '',
             'expected_text': '',
             'last_result': 'N/A',
@@ -35,20 +44,17 @@ class CommandProcessor:
     
     def get_current_window_coords(self):
         """현재 선택된 윈도우의 좌표를 동적으로 가져오기"""
-        if not self.main_app:
-            return None
-            
         try:
-            import pygetwindow as gw
-            
-            selected_window = self.main_app.window_dropdown.currentText()
-            if not selected_window:
+            # 대상 윈도우 핸들/좌표는 캐시에서 조회 (드롭다운 변경/창 이동 시에만 다시 찾음)
+            geometry = self.geometry or get_window_geometry()
+            selected_window = geometry.target
+            if selected_window is None and self.main_app:
+                selected_window = self.main_app.window_dropdown.currentText()
+            if not selected_window and geometry.fixed is None:
                 return None
                 
-            windows = gw.getWindowsWithTitle(selected_window)
-            if windows:
-                window = windows[0]
-                coords = (window.left, window.top, window.width, window.height)
+            coords = geometry.coords(selected_window)
+            if coords:
                 print(f"현재 윈도우 좌표: {selected_window} → {coords}")
                 return coords
         except Exception as e:
@@ -63,42 +69,80 @@ class CommandProcessor:
             print("⚠️ 실행 중지됨 - 명령어 처리 중단")
             return
             
-        parts = command_string.split()
-        if not parts:
+        step = compile_step(0, command_string)
+        if step is None:
+            return
+        self.run_step(step, window_coords)
+    
+    def run_step(self, step, window_coords=None):
+        """컴파일된 실행 계획 단계 실행 (execution_plan.py, 파싱 없이 바로 실행)"""
+        if self.stop_flag:
+            print("⚠️ 실행 중지됨 - 명령어 처리 중단")
             return
-            
-        action = parts[0].strip()
-        print(f'Executing action: {action}')
         
-        # 레지스트리에서 명령어 찾기
-        command = get_command(action)
-        if command:
-            # 중지 플래그 한 번 더 체크
-            if self.stop_flag:
-                print("⚠️ 실행 중지됨 - 명령어 실행 중단")
-                return
-                
-            # 파라미터 파싱
-            params = command.parse_params(parts[1:])
-            
-            # CommandProcessor 인스턴스를 명령어에 전달 (실시간 stop_flag 체크를 위해)
-            params['processor'] = self
-            
-            # 동적 윈도우 좌표 가져오기 (기존 window_coords보다 우선)
-            current_coords = self.get_current_window_coords()
-            if current_coords:
-                # 현재 선택된 윈도우 좌표 사용 (state 딕셔너리를 전달)
-                command.execute(params, current_coords, self.state)
-                print(f"✓ 동적 윈도우 좌표 사용: {current_coords}")
+        print(f'Executing action: {step.action}')
+        if step.command is None:
+            print(step.error)
+            return
+        command = step.command
+        
+        # 중지 플래그 한 번 더 체크
+        if self.stop_flag:
+            print("⚠️ 실행 중지됨 - 명령어 실행 중단")
+            return
+        
+        # 계획의 파라미터는 여러 번 재사용하므로 실행마다 복사
+        params = dict(step.params)
+        
+        # CommandProcessor 인스턴스를 명령어에 전달 (실시간 stop_flag 체크를 위해)
+        params['processor'] = self
+        
+        # 단계 구간 기록 (프로파일러가 켜져 있을 때만, 하위에 캡처/OCR 구간이 중첩됨)
+        with profile_span(command.name, 'step', index=step.index, command=step.text):
+            # 입력 명령어는 다중 클라이언트 실행 시 입력 중재 잠금 안에서 실행 (단독 실행이면 잠금 없음)
+            if command.uses_input:
+                with input_burst(self):
+                    self._execute(command, params, window_coords)
             else:
-                # 기존 좌표 또는 None 사용 (state 딕셔너리를 전달)
-                command.execute(params, window_coords, self.state)
-                if window_coords:
-                    print(f"✓ 기존 윈도우 좌표 사용: {window_coords}")
-                else:
-                    print("⚠️ 윈도우 좌표 없음")
+                self._execute(command, params, window_coords)
+    
+    def _execute(self, command, params, window_coords=None):
+        """명령어 실행 (현재 윈도우 좌표 우선)"""
+        # 동적 윈도우 좌표 가져오기 (기존 window_coords보다 우선)
+        current_coords = self.get_current_window_coords()
+        if current_coords:
+            # 현재 선택된 윈도우 좌표 사용 (state 딕셔너리를 전달)
+            command.execute(params, current_coords, self.state)
+            print(f"✓ 동적 윈도우 좌표 사용: {current_coords}")
         else:
-            print(f"Unknown command: {action}")
+            # 기존 좌표 또는 None 사용 (state 딕셔너리를 전달)
+            command.execute(params, window_coords, self.state)
+            if window_coords:
+                print(f"✓ 기존 윈도우 좌표 사용: {window_coords}")
+            else:
+                print("⚠️ 윈도우 좌표 없음")
+    
+    def prefetch_text_checks(self, steps):
+        """연속된 TestText 영역을 한 번에 캡처·OCR하여 결과를 미리 저장
+
+        각 TestText는 실행 시점에 화면이 그대로이고 통과 조건을 만족할 때만 이 결과를 사용합니다.
+
+        Args:
+            steps: 일괄 OCR 대상 실행 계획 단계 목록 (ExecutionPlan.batch_run)
+        """
+        window_coords = self.get_current_window_coords()
+        jobs = []
+        for step in steps:
+            job = step.command.batch_job(dict(step.params), window_coords)
+            if job:
+                jobs.append(job)
+        if len(jobs) < 2:
+            return
+        try:
+            self.state['ocr_prefetch'] = prefetch_regions(jobs)
+        except Exception as e:
+            print(f"일괄 OCR 실패 (영역별 OCR로 진행): {e}")
+            self.state['ocr_prefetch'] = {}
     
     # 기존의 수십 개 _handle_xxx 메서드들이 모두 사라졌습니다! 🎉
     # 새로운 명령어를 추가할 때 더 이상 이 파일을 수정할 필요가 없습니다!
\ No newline at end of file
@@ -41,7 +41,9 @@ SUPPORTED_ACTIONS = [
     'press', 'write', 'wait', 'screenshot', 'click', 
     'drag',  # ← 새 명령어! 이제 수동으로 추가해야 함
     'cheat', 'i2s', 'i2skr', 'validate', 'export', 'waituntil',
-    'testtext', 'showresults', 'exportexcel', 'runapp'  # ← 새로운 테스트 관련 명령어들
+    'testtext', 'showresults', 'exportexcel', 'runapp',  # ← 새로운 테스트 관련 명령어들
+    'waituntilimage', 'clickimage',  # ← 템플릿 이미지 매칭 명령어
+    'findtext', 'clicktext'  # ← 화면 텍스트 인덱스 명령어
 ]
 # Note: 새 명령어를 추가할 때 여기도 업데이트해야 합니다
 
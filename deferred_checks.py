@@ -0,0 +1,117 @@
+"""
+지연 검사 - TestText가 영역만 즉시 캡처하고 OCR/비교는 백그라운드에서 실행
+
+단일 TestText(반복 모드 아님)는 결과가 이후 명령어 흐름에 영향을 주지 않으므로
+OCR 캐스케이드가 끝날 때까지 실행 스레드를 붙잡아 둘 필요가 없습니다.
+
+1. TestText 실행 시 영역을 캡처하고 'Pending' 자리표시 결과를 test_results에 바로 추가 (명령어 순서 유지)
+2. OCR + 기대 텍스트 비교는 작업 스레드 풀에서 실행 (Tesseract는 외부 프로세스라 스레드로 병렬 처리됨)
+3. 완료되면 자리표시 결과를 같은 딕셔너리에서 갱신
+4. ShowResults/ExportResult와 실행 종료 시 wait()로 남은 검사를 모두 기다린 뒤 결과를 사용
+
+긴 체크리스트는 입력 시간 + OCR 시간이 아니라 입력 시간에 가깝게 끝납니다.
+"""
+
+# 로그 설정을 가장 먼저 import
+import logger_setup
+
+import os
+import time
+import threading
+from concurrent.futures import ThreadPoolExecutor, wait as wait_futures
+
+PENDING = 'Pending'
+
+
+class DeferredChecks:
+    """백그라운드 검사 큐 (결과는 자리표시 딕셔너리를 제자리에서 갱신)
+
+    Args:
+        max_workers: 동시에 실행할 검사 수 (기본: CPU 코어 수, 최대 4)
+    """
+
+    def __init__(self, max_workers=None):
+        self.enabled = False
+        self.max_workers = max_workers
+        self._executor = None
+        self._futures = []
+        self._lock = threading.Lock()
+        self.completed = 0
+
+    def _get_executor(self):
+        with self._lock:
+            if self._executor is None:
+                workers = self.max_workers or min(4, os.cpu_count() or 2)
+                self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='deferred-check')
+                print(f"지연 검사 작업자 {workers}개 생성")
+            return self._executor
+
+    def submit(self, results, placeholder, check):
+        """자리표시 결과를 results에 추가하고 check()를 백그라운드에서 실행
+
+        Args:
+            results: processor_state['test_results'] (명령어 순서대로 자리표시 추가)
+            placeholder: 'result'가 PENDING인 결과 딕셔너리
+            check: 최종 결과 딕셔너리를 반환하는 함수 (자리표시에 병합)
+        """
+        placeholder['result'] = PENDING
+        results.append(placeholder)
+
+        def run():
+            try:
+                final = check()
+            except Exception as e:
+                print(f"지연 검사 오류 ({placeholder.get('title')}): {e}")
+                final = {'extracted_text': f"오류: {str(e)}", 'result': 'Fail'}
+            placeholder.update(final)
+            with self._lock:
+                self.completed += 1
+
+        future = self._get_executor().submit(run)
+        with self._lock:
+            self._futures.append(future)
+        return future
+
+    @property
+    def pending(self):
+        with self._lock:
+            return sum(1 for f in self._futures if not f.done())
+
+    def wait(self, timeout=None):
+        """남은 검사를 모두 기다림 (ShowResults/ExportResult 전)
+
+        Returns:
+            시간 안에 끝나지 않은 검사 수
+        """
+        with self._lock:
+            futures = list(self._futures)
+        if not futures:
+            return 0
+        remaining = sum(1 for f in futures if not f.done())
+        if remaining:
+            print(f"⏳ 지연 검사 {remaining}개 완료 대기...")
+        start_time = time.time()
+        _, not_done = wait_futures(futures, timeout=timeout)
+        with self._lock:
+            self._futures = [f for f in self._futures if not f.done()]
+        if remaining:
+            print(f"✓ 지연 검사 대기 완료 ({time.time() - start_time:.2f}s)")
+        return len(not_done)
+
+    def cancel(self):
+        """아직 시작하지 않은 검사 취소 (실행 중지 시)"""
+        with self._lock:
+            cancelled = sum(1 for f in self._futures if f.cancel())
+            self._futures = [f for f in self._futures if not f.done()]
+        if cancelled:
+            print(f"지연 검사 {cancelled}개 취소")
+        return cancelled
+
+
+# 전역 지연 검사 큐
+_deferred_checks = DeferredChecks()
+
+
+def get_deferred_checks():
+    """전역 지연 검사 큐 반환"""
+    return _deferred_checks
@@ -0,0 +1,200 @@
+"""
+실행 계획 - 번들 명령어 목록을 한 번만 파싱해 (명령어 객체, 파라미터) 단계 목록으로 컴파일
+
+실행 횟수 × 윈도우마다 번들을 다시 펼치고, 명령어마다 문자열 분리 → 레지스트리 조회 →
+parse_params를 반복하면 수백 단계 번들을 수백 번 돌릴 때 같은 파싱을 계속 반복합니다.
+
+- compile(commands): 명령어 문자열 목록 → 변경 불가능한 ExecutionPlan (단계별 명령어 객체/파라미터 미리 확정)
+- 같은 내용의 명령어 목록은 내용 해시로 캐시된 계획을 재사용 (다시 실행해도 파싱 없음)
+- 알 수 없는 명령어/파라미터 오류(parse_params 예외 또는 빈 파싱 결과)는 실행 시작 전에 한꺼번에 보고
+  (실행 중에는 해당 단계만 건너뜀)
+- 연속 TestText 일괄 OCR 대상 여부도 컴파일할 때 미리 계산
+"""
+
+# 로그 설정을 가장 먼저 import
+import logger_setup
+
+import hashlib
+import threading
+from collections import OrderedDict, namedtuple
+from types import MappingProxyType
+from command_registry import get_command
+
+# 캐시할 계획 최대 개수
+_MAX_PLANS = 32
+
+
+class PlanStep(namedtuple('PlanStep', ['index', 'text', 'action', 'command', 'params', 'error', 'batchable'])):
+    """컴파일된 단계 하나
+
+    index: 명령어 목록에서의 위치 (0-based), text: 원본 명령어 문자열, action: 명령어 이름
+    command: 명령어 객체 (오류면 None), params: 파싱된 파라미터 (읽기 전용, 실행할 때 복사)
+    error: 컴파일 오류 메시지 (정상이면 None), batchable: 연속 TestText 일괄 OCR 대상 여부
+    """
+    __slots__ = ()
+
+
+class ExecutionPlan:
+    """컴파일된 실행 계획 (단계 튜플, 변경 불가)"""
+
+    __slots__ = ('key', 'steps', 'total')
+
+    def __init__(self, key, steps, total):
+        self.key = key
+        self.steps = tuple(steps)
+        self.total = total  # 원본 명령어 개수 (진행 표시 [n/total]용)
+
+    @property
+    def errors(self):
+        return [step for step in self.steps if step.error]
+
+    def batch_run(self, position):
+        """position번째 단계부터 이어지는 일괄 OCR 대상 단계 목록"""
+        run = []
+        for step in self.steps[position:]:
+            if not step.batchable:
+                break
+            run.append(step)
+        return run
+
+    def __len__(self):
+        return len(self.steps)
+
+    def __iter__(self):
+        return iter(self.steps)
+
+
+def plan_key(commands):
+    """명령어 목록 내용 해시"""
+    h = hashlib.blake2b(digest_size=16)
+    for command in commands:
+        h.update(command.encode('utf-8'))
+        h.update(b'\n')
+    return h.hexdigest()
+
+
+def compile_step(index, text):
+    """명령어 문자열 하나 → PlanStep (빈 명령어면 None)"""
+    parts = text.split()
+    if not parts:
+        return None
+    action = parts[0].strip()
+    command = get_command(action)
+    if command is None:
+        return PlanStep(index, text, action, None, None, f"Unknown command: {action}", False)
+    try:
+        params = command.parse_params(parts[1:])
+    except Exception as e:
+        return PlanStep(index, text, action, None, None, f"파라미터 오류: {e}", False)
+    # parse_params는 잘못된 입력을 빈 딕셔너리로 알림 (실행하면 '필요한 파라미터가 없습니다'로 건너뜀)
+    if not params and (command.requires_params or (len(parts) > 1 and command.accepts_params)):
+        return PlanStep(index, text, action, None, None,
+                        f"파라미터 오류: {command.name} 명령어의 파라미터가 없거나 형식이 잘못되었습니다", False)
+    batchable = False
+    if hasattr(command, 'batch_job'):
+        try:
+            batchable = command.batch_job(params) is not None
+        except Exception:
+            batchable = False
+    return PlanStep(index, text, action, command, MappingProxyType(params), None, batchable)
+
+
+def expand_saved_commands(load_data, bundle_names=None, bundle_labels=None):
+    """저장된 번들 파일 내용 → 실행할 명령어 문자열 목록 (GUI의 체크된 항목 펼치기와 같은 규칙)
+
+    Args:
+        load_data: 번들 파일 JSON ({"bundles": {이름: [struct]}, "command_list": [...]})
+        bundle_names: 지정하면 command_list 대신 이 번들들을 순서대로 실행
+        bundle_labels: 지정하면 명령어마다 소속 번들 이름(개별 명령어는 '')을 순서대로 추가
+    """
+    bundles = load_data.get("bundles", {})
+    if bundle_names:
+        items = [{"type": "bundle", "name": name, "checked": True} for name in bundle_names]
+    else:
+        # command_list가 없는 파일은 모든 번들을 저장 순서대로 실행
+        items = load_data.get("command_list") or [{"type": "bundle", "name": name, "checked": True}
+                                                   for name in bundles]
+    commands = []
+    for item in items:
+        if not item.get("checked", True):
+            continue
+        if item.get("type") == "bundle":
+            if item.get("name") not in bundles:
+                raise KeyError(f"번들을 찾을 수 없습니다: {item.get('name')}")
+            for struct in bundles[item["name"]]:
+                # 번들 내 개별 명령어의 체크 상태 확인 (기본값 True)
+                if struct.get('checked', True):
+                    cmd = struct.get('raw', '').split('#')[0].strip()
+                    if cmd:
+                        commands.append(cmd)
+                        if bundle_labels is not None:
+                            bundle_labels.append(item["name"])
+        else:
+            cmd = item.get("text", "").split('#')[0].strip()
+            if cmd:
+                commands.append(cmd)
+                if bundle_labels is not None:
+                    bundle_labels.append('')
+    return commands
+
+
+class PlanCompiler:
+    """내용 해시로 캐시하는 실행 계획 컴파일러"""
+
+    def __init__(self, max_plans=_MAX_PLANS):
+        self.max_plans = max_plans
+        self._plans = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def compile(self, commands):
+        """명령어 문자열 목록 → ExecutionPlan (같은 내용이면 캐시 재사용)"""
+        commands = list(commands)
+        key = plan_key(commands)
+        with self._lock:
+            plan = self._plans.get(key)
+            if plan is not None:
+                self._plans.move_to_end(key)
+                self.hits += 1
+                return plan
+        steps = [step for step in (compile_step(i, text) for i, text in enumerate(commands)) if step]
+        plan = ExecutionPlan(key, steps, len(commands))
+        with self._lock:
+            self.misses += 1
+            self._plans[key] = plan
+            while len(self._plans) > self.max_plans:
+                self._plans.popitem(last=False)
+        return plan
+
+    def clear(self):
+        with self._lock:
+            self._plans.clear()
+
+    def stats(self):
+        with self._lock:
+            return {'plans': len(self._plans), 'hits': self.hits, 'misses': self.misses}
+
+
+# 전역 계획 컴파일러
+_plan_compiler = PlanCompiler()
+
+
+def get_plan_compiler():
+    """전역 실행 계획 컴파일러 반환"""
+    return _plan_compiler
+
+
+def compile_plan(commands):
+    """명령어 문자열 목록을 실행 계획으로 컴파일 (전역 캐시 사용)"""
+    return _plan_compiler.compile(commands)
+
+
+def report_plan_errors(plan):
+    """컴파일 오류를 실행 전에 출력 → 오류 개수"""
+    errors = plan.errors
+    if errors:
+        print(f"⚠️ 실행 계획 오류 {len(errors)}개 (해당 단계는 건너뜀):")
+        for step in errors:
+            print(f"  [{step.index + 1}/{plan.total}] {step.text} → {step.error}")
+    return len(errors)
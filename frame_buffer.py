@@ -0,0 +1,193 @@
+"""
+프레임 링 버퍼 - 영역별 최근 캡처를 메모리에만 보관하고 필요할 때만 디스크에 저장
+
+장시간(soak) 실행에서 캡처마다 JPEG를 쓰면 screenshot 폴더가 수천 장으로 늘어나고
+디스크 I/O가 낭비됩니다. 캡처한 프레임은 영역별 고정 크기 배열(슬롯 N개)에 덮어쓰며
+보관하고, 다음 경우에만 파일로 저장합니다.
+
+- 단계 실패: 실패 직전 그 영역의 최근 프레임들을 증거로 저장 (dump)
+- 리포트/엑셀 출력에 필요한 프레임
+- 디버그 모드: 모든 캡처를 저장 (persist_all)
+
+메모리 사용량은 max_bytes로 제한되며, 넘으면 가장 오래 사용하지 않은 영역부터 해제합니다.
+통과한 검사의 리포트용 프레임(테스트 결과의 screenshot_image)도 evidence_max_bytes 안에서만 보관하고,
+넘으면 가장 오래된 결과의 프레임부터 해제합니다 (수백 회 반복 실행에서도 메모리가 일정).
+"""
+
+# 로그 설정을 가장 먼저 import
+import logger_setup
+
+import time
+import threading
+from collections import OrderedDict
+import numpy as np
+from PIL import Image
+
+# 영역별 보관 프레임 수 / 전체 메모리 한도
+DEFAULT_SLOTS = 8
+DEFAULT_MAX_BYTES = 128 * 1024 * 1024
+# 한 영역이 전체 한도에서 차지할 수 있는 최대 비율 (전체 화면 캡처가 한도를 독차지하지 않도록)
+_REGION_SHARE = 4
+# 통과 결과 프레임(리포트 이미지용) 전체 한도
+DEFAULT_EVIDENCE_BYTES = 64 * 1024 * 1024
+
+
+class RegionRing:
+    """한 영역의 고정 크기 프레임 배열 (slots × 높이 × 너비 × 3, uint8)"""
+
+    def __init__(self, shape, slots):
+        self.frames = np.empty((slots,) + shape, dtype=np.uint8)
+        self.timestamps = np.zeros(slots, dtype=np.float64)
+        self.count = 0  # 지금까지 기록한 프레임 수 (다음 슬롯 = count % slots)
+
+    @property
+    def nbytes(self):
+        return self.frames.nbytes
+
+    @property
+    def shape(self):
+        return self.frames.shape[1:]
+
+    def push(self, array, timestamp):
+        slot = self.count % len(self.frames)
+        self.frames[slot] = array
+        self.timestamps[slot] = timestamp
+        self.count += 1
+
+    def ordered(self):
+        """오래된 것부터 [(timestamp, PIL 이미지)]"""
+        slots = len(self.frames)
+        start = max(0, self.count - slots)
+        return [(float(self.timestamps[i % slots]), Image.fromarray(self.frames[i % slots]))
+                for i in range(start, self.count)]
+
+
+class FrameRingBuffer:
+    """영역별 최근 프레임 링 버퍼
+
+    Args:
+        slots: 영역별 보관 프레임 수
+        max_bytes: 전체 프레임 배열 메모리 한도
+    """
+
+    def __init__(self, slots=DEFAULT_SLOTS, max_bytes=DEFAULT_MAX_BYTES):
+        self.slots = slots
+        self.max_bytes = max_bytes
+        self.persist_all = False  # 디버그 모드: 모든 캡처 저장
+        self.evidence_max_bytes = DEFAULT_EVIDENCE_BYTES
+        self._rings = OrderedDict()  # 영역 키 → RegionRing (최근 사용 순)
+        self._evidence = OrderedDict()  # id(테스트 결과) → (결과, 프레임 바이트 수) (보관 순)
+        self._evidence_bytes = 0
+        self._lock = threading.Lock()
+        self.recorded = 0
+        self.dumped = 0
+        self.evidence_dropped = 0
+
+    def _allocated(self):
+        return sum(ring.nbytes for ring in self._rings.values())
+
+    def _ring(self, key, shape):
+        ring = self._rings.get(key)
+        if ring is not None and ring.shape == shape:
+            self._rings.move_to_end(key)
+            return ring
+        self._rings.pop(key, None)
+        frame_bytes = int(np.prod(shape))
+        slots = max(1, min(self.slots, self.max_bytes // _REGION_SHARE // max(1, frame_bytes)))
+        # 한도를 넘으면 오래 사용하지 않은 영역부터 해제
+        while self._rings and self._allocated() + frame_bytes * slots > self.max_bytes:
+            self._rings.popitem(last=False)
+        ring = RegionRing(shape, slots)
+        self._rings[key] = ring
+        return ring
+
+    def record(self, key, image):
+        """캡처 프레임 기록 (persist_all이면 디스크에도 저장하고 경로 반환)"""
+        array = np.asarray(image.convert('RGB') if image.mode != 'RGB' else image, dtype=np.uint8)
+        with self._lock:
+            self._ring(key, array.shape).push(array, time.time())
+            self.recorded += 1
+        if self.persist_all:
+            from utils import save_screenshot
+            return save_screenshot(image)
+        return None
+
+    def latest(self, key):
+        """영역의 마지막 프레임 (없으면 None)"""
+        with self._lock:
+            ring = self._rings.get(key)
+            frames = ring.ordered()[-1:] if ring is not None else []
+        return frames[0][1] if frames else None
+
+    def history(self, key):
+        """영역의 최근 프레임 [(timestamp, PIL 이미지)] (오래된 것부터)"""
+        with self._lock:
+            ring = self._rings.get(key)
+            return ring.ordered() if ring is not None else []
+
+    def dump(self, key, label='fail'):
+        """영역의 최근 프레임을 모두 저장 (실패 증거) → 저장 경로 목록
+
+        디버그 모드에서는 이미 캡처마다 저장했으므로 다시 쓰지 않습니다.
+        """
+        if self.persist_all:
+            return []
+        from utils import save_screenshot
+        paths = []
+        for timestamp, image in self.history(key):
+            paths.append(save_screenshot(image, prefix=f"{label}_", timestamp=timestamp))
+        with self._lock:
+            self.dumped += len(paths)
+        if paths:
+            print(f"📸 최근 프레임 {len(paths)}장 저장 ({label}): {paths[0]} ...")
+        return paths
+
+    def hold_evidence(self, result):
+        """테스트 결과의 메모리 프레임(screenshot_image)을 한도 안에서만 보관
+
+        한도를 넘으면 가장 오래된 결과의 프레임부터 해제합니다 (해당 결과는 리포트에 이미지 없음).
+        """
+        image = result.get('screenshot_image')
+        if image is None:
+            return
+        size = image.width * image.height * len(image.getbands())
+        with self._lock:
+            self._evidence[id(result)] = (result, size)
+            self._evidence_bytes += size
+            while self._evidence_bytes > self.evidence_max_bytes and len(self._evidence) > 1:
+                _, (old, old_size) = self._evidence.popitem(last=False)
+                self._evidence_bytes -= old_size
+                if old.pop('screenshot_image', None) is not None:
+                    self.evidence_dropped += 1
+
+    def release_evidence(self, result):
+        """결과 프레임 보관 해제 (디스크에 저장했거나 더 이상 필요 없을 때)"""
+        with self._lock:
+            entry = self._evidence.pop(id(result), None)
+            if entry is not None:
+                self._evidence_bytes -= entry[1]
+
+    def clear(self):
+        """모든 영역 프레임 해제 및 통계 초기화 (실행 종료 시)"""
+        with self._lock:
+            self._rings.clear()
+            self._evidence.clear()
+            self._evidence_bytes = 0
+            self.recorded = 0
+            self.dumped = 0
+            self.evidence_dropped = 0
+
+    def stats(self):
+        with self._lock:
+            return {'regions': len(self._rings), 'bytes': self._allocated(),
+                    'recorded': self.recorded, 'dumped': self.dumped,
+                    'evidence_bytes': self._evidence_bytes, 'evidence_dropped': self.evidence_dropped}
+
+
+# 전역 프레임 버퍼
+_frame_buffer = FrameRingBuffer()
+
+
+def get_frame_buffer():
+    """전역 프레임 링 버퍼 반환"""
+    return _frame_buffer
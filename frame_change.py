@@ -0,0 +1,84 @@
+"""
+프레임 변화 감지 - 폴링 명령어에서 화면이 그대로면 OCR 생략
+
+WaitUntil, TestText 반복 모드처럼 같은 영역을 주기적으로 검사하는 명령어가 공유합니다.
+영역별로 이전 캡처를 축소된 그레이스케일 배열로 보관하고, 새 캡처와의 차이를
+벡터 연산으로 계산해 임계값 이상 바뀐 경우에만 OCR을 실행하도록 합니다.
+"""
+
+import threading
+import numpy as np
+from PIL import Image
+
+# 비교용 축소 이미지의 최대 가로/세로 (작은 글자 변화도 감지할 수 있는 수준)
+_MAX_SIDE = 128
+
+
+def downsample(image, max_side=_MAX_SIDE):
+    """그레이스케일 축소 배열 생성 (BOX 필터로 평균내어 노이즈 완화)"""
+    gray = image.convert('L')
+    scale = min(1.0, max_side / max(gray.width, gray.height, 1))
+    if scale < 1.0:
+        size = (max(1, round(gray.width * scale)), max(1, round(gray.height * scale)))
+        gray = gray.resize(size, Image.BOX)
+    return np.asarray(gray, dtype=np.int16)
+
+
+class FrameChangeDetector:
+    """영역 키별 직전 프레임과 비교하여 변화 여부 판단
+
+    Args:
+        pixel_threshold: 셀 하나가 '바뀜'으로 판단되는 밝기 차이 (0~255)
+        change_ratio: 바뀐 셀 비율이 이 값을 넘으면 프레임 변화로 판단
+    """
+
+    def __init__(self, pixel_threshold=16, change_ratio=0.001):
+        self.pixel_threshold = pixel_threshold
+        self.change_ratio = change_ratio
+        self._frames = {}
+        self._lock = threading.Lock()
+
+    def _difference(self, previous, current):
+        """기준 프레임 대비 바뀐 셀 비율 (기준이 없거나 크기가 다르면 1.0)"""
+        if previous is None or previous.shape != current.shape:
+            return 1.0
+        changed = np.count_nonzero(np.abs(current - previous) > self.pixel_threshold)
+        return changed / current.size
+
+    def has_changed(self, key, image):
+        """기준 프레임 대비 임계값 이상 바뀌었는지
+
+        바뀐 경우에만 현재 프레임을 새 기준으로 저장합니다.
+        (직전 폴링이 아닌 마지막 OCR 시점과 비교하므로 서서히 바뀌는 화면도 놓치지 않음)
+        """
+        current = downsample(image)
+        with self._lock:
+            changed = self._difference(self._frames.get(key), current) > self.change_ratio
+            if changed:
+                self._frames[key] = current
+        return changed
+
+    def differs(self, previous, current, max_side=_MAX_SIDE):
+        """두 이미지가 임계값 이상 다른지 (기준 프레임을 저장하지 않는 단순 비교)
+
+        Args:
+            max_side: 비교 해상도 - 창 전체처럼 큰 영역은 값을 키워야 작은 글자 변화도 감지
+        """
+        return self._difference(downsample(previous, max_side), downsample(current, max_side)) > self.change_ratio
+
+    def reset(self, key=None):
+        """저장된 기준 프레임 제거 (key가 없으면 전체)"""
+        with self._lock:
+            if key is None:
+                self._frames.clear()
+            else:
+                self._frames.pop(key, None)
+
+
+# 폴링 명령어가 공유하는 전역 감지기
+_change_detector = FrameChangeDetector()
+
+
+def get_change_detector():
+    """전역 프레임 변화 감지기 반환"""
+    return _change_detector
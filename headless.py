@@ -0,0 +1,169 @@
+"""
+헤드리스 실행 지원 - PyQt5 없이 명령어 엔진 실행 (pbbauto.py CLI)
+
+환경변수 PBBAUTO_HEADLESS=1이면 command_registry가 PyQt5를 불러오지 않고 이 모듈의
+UI 자리표시를 사용합니다. 헤드리스 실행에서는 명령어의 create_ui/테스트 버튼이 호출되지 않으며,
+실행 중 팝업(QMessageBox 등)은 아무 동작 없이 무시됩니다.
+
+입력 백엔드 (PBBAUTO_INPUT):
+    real - pydirectinput/pyperclip/pyautogui (Windows 기본)
+    null - 실제 입력 없이 호출만 기록 (Linux/CI 기본, 리플레이 캡처 백엔드와 함께 결정적 테스트용)
+"""
+
+# 로그 설정을 가장 먼저 import
+import logger_setup
+
+import os
+import sys
+import time
+import threading
+from collections import namedtuple
+
+HEADLESS = os.environ.get('PBBAUTO_HEADLESS', '') not in ('', '0')
+
+INPUT_BACKENDS = ('real', 'null')
+
+Point = namedtuple('Point', ['x', 'y'])
+Size = namedtuple('Size', ['width', 'height'])
+
+
+class _InertMeta(type):
+    """클래스 속성 접근(Qt.AlignCenter, QMessageBox.Yes 등)도 자리표시로 처리"""
+
+    def __getattr__(cls, name):
+        if name.startswith('__'):
+            raise AttributeError(name)
+        return Inert()
+
+    def __or__(cls, other):
+        return Inert()
+
+
+class Inert(metaclass=_InertMeta):
+    """아무 동작도 하지 않는 UI 자리표시 (생성/호출/속성 접근 결과도 모두 자리표시)"""
+
+    def __init__(self, *args, **kwargs):
+        pass
+
+    def __call__(self, *args, **kwargs):
+        return Inert()
+
+    def __getattr__(self, name):
+        if name.startswith('__'):
+            raise AttributeError(name)
+        return Inert()
+
+    def __or__(self, other):
+        return self
+
+    __ror__ = __or__
+
+    def __bool__(self):
+        return False
+
+    def __iter__(self):
+        return iter(())
+
+
+_placeholders = {}
+
+
+def __getattr__(name):
+    """from headless import QWidget, Qt, ... → 이름별 자리표시 클래스"""
+    if name.startswith('Q') or name == 'pyqtSignal':
+        if name not in _placeholders:
+            _placeholders[name] = _InertMeta(name, (Inert,), {})
+        return _placeholders[name]
+    raise AttributeError(f"module 'headless' has no attribute '{name}'")
+
+
+class NullInput:
+    """실제 입력 없이 호출만 기록하는 입력 백엔드 (pydirectinput/pyautogui/pyperclip 호환)
+
+    Args:
+        screen_size: size()가 반환할 화면 크기
+    """
+
+    def __init__(self, screen_size=(1920, 1080)):
+        self.screen_size = Size(*screen_size)
+        self.actions = []  # [(시각, 함수 이름, args, kwargs)]
+        self._position = Point(0, 0)
+        self._clipboard = ''
+        self._lock = threading.Lock()
+
+    def _record(self, name, args, kwargs):
+        with self._lock:
+            self.actions.append((time.time(), name, args, kwargs))
+
+    def __getattr__(self, name):
+        # click/press/keyDown/keyUp/mouseDown/mouseUp/hotkey/write/scroll 등은 기록만
+        if name.startswith('_'):
+            raise AttributeError(name)
+
+        def record(*args, **kwargs):
+            self._record(name, args, kwargs)
+        return record
+
+    def moveTo(self, x=None, y=None, *args, **kwargs):
+        self._record('moveTo', (x, y) + args, kwargs)
+        if x is not None and y is not None:
+            self._position = Point(int(x), int(y))
+
+    def moveRel(self, dx=0, dy=0, *args, **kwargs):
+        self._record('moveRel', (dx, dy) + args, kwargs)
+        self._position = Point(self._position.x + int(dx), self._position.y + int(dy))
+
+    def position(self):
+        return self._position
+
+    def size(self):
+        return self.screen_size
+
+    def copy(self, text):
+        self._record('copy', (text,), {})
+        self._clipboard = text
+
+    def paste(self):
+        return self._clipboard
+
+
+_null_input = None
+
+
+def get_null_input():
+    """전역 기록용 입력 백엔드"""
+    global _null_input
+    if _null_input is None:
+        _null_input = NullInput()
+    return _null_input
+
+
+def input_backend_name():
+    """PBBAUTO_INPUT 값 (지정하지 않으면 Windows는 real, 그 외는 null)"""
+    name = os.environ.get('PBBAUTO_INPUT', '').lower()
+    if name in INPUT_BACKENDS:
+        return name
+    return 'real' if sys.platform == 'win32' else 'null'
+
+
+def input_modules(*names):
+    """헤드리스 실행용 입력 모듈 ('pyd', 'pyperclip', 'pag' 순서대로 반환)
+
+    real 백엔드에서 불러올 수 없는 모듈은 기록용 입력으로 대신합니다.
+    """
+    modules = []
+    for name in names:
+        module = None
+        if input_backend_name() == 'real':
+            try:
+                if name == 'pyd':
+                    import pydirectinput as module
+                elif name == 'pyperclip':
+                    import pyperclip as module
+                elif name == 'pag':
+                    import pyautogui as module
+            except Exception as e:
+                print(f"입력 모듈 {name} 사용 불가 (입력 기록으로 대체): {e}")
+                module = None
+        modules.append(module if module is not None else get_null_input())
+    return modules[0] if len(modules) == 1 else tuple(modules)
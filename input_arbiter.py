@@ -0,0 +1,90 @@
+"""
+입력 중재 - 여러 클라이언트 윈도우를 동시에 실행할 때 포커스/키보드/마우스 입력을 직렬화
+
+키보드/마우스 입력과 포커스는 OS 전체에서 하나뿐이라, 여러 실행 스레드가 동시에 클릭/입력하면
+서로의 창에 입력이 섞입니다. 입력 구간(burst)만 잠그고 대기/캡처/OCR은 잠그지 않아
+한 클라이언트가 입력하는 동안 다른 클라이언트의 검사/대기가 겹쳐 진행됩니다.
+
+- burst(geometry): 잠금을 얻고 대상 윈도우가 현재 포커스가 아니면 활성화한 뒤 입력 실행
+- input_burst(processor): 명령어에서 사용 (다중 실행 중이 아니면 아무것도 하지 않음)
+"""
+
+# 로그 설정을 가장 먼저 import
+import logger_setup
+
+import time
+import threading
+from contextlib import contextmanager, nullcontext
+
+# 포커스 전환 후 입력 전 대기 시간 (기존 실행 루프의 활성화 후 대기와 동일)
+DEFAULT_FOCUS_DELAY = 0.2
+
+
+class InputArbiter:
+    """입력 구간 잠금 + 포커스 전환
+
+    Args:
+        focus_delay: 다른 윈도우로 포커스를 옮긴 뒤 대기 시간 (초)
+    """
+
+    def __init__(self, focus_delay=DEFAULT_FOCUS_DELAY):
+        self.focus_delay = focus_delay
+        self.focused = None  # 마지막으로 활성화한 윈도우 제목
+        self._lock = threading.RLock()  # 같은 스레드의 중첩 입력 구간 허용
+        self.bursts = 0
+        self.switches = 0
+        self.wait_seconds = 0.0  # 다른 클라이언트의 입력을 기다린 시간 합계
+
+    def _focus(self, geometry):
+        """대상 윈도우가 현재 포커스가 아니면 활성화 (잠금 안에서 호출)"""
+        title = geometry.target
+        if not title or title == self.focused:
+            return
+        window = geometry.window()
+        if window is not None:
+            try:
+                window.activate()
+            except Exception as e:
+                print(f"윈도우 '{title}' 활성화 중 오류 발생: {e}")
+            time.sleep(self.focus_delay)
+        self.focused = title
+        self.switches += 1
+
+    @contextmanager
+    def burst(self, geometry=None):
+        """입력 구간 (geometry: 입력할 클라이언트의 윈도우 좌표 캐시)"""
+        start = time.perf_counter()
+        with self._lock:
+            self.wait_seconds += time.perf_counter() - start
+            self.bursts += 1
+            if geometry is not None:
+                self._focus(geometry)
+            yield
+
+    def reset(self):
+        """포커스 기록/통계 초기화 (실행 시작 시)"""
+        with self._lock:
+            self.focused = None
+            self.bursts = 0
+            self.switches = 0
+            self.wait_seconds = 0.0
+
+    def stats(self):
+        return {'bursts': self.bursts, 'switches': self.switches, 'wait_s': round(self.wait_seconds, 2)}
+
+
+def input_burst(processor=None):
+    """명령어 입력 구간 (다중 클라이언트 실행 중인 프로세서만 잠금/포커스 전환)"""
+    arbiter = getattr(processor, 'arbiter', None)
+    if arbiter is None:
+        return nullcontext()
+    return arbiter.burst(getattr(processor, 'geometry', None))
+
+
+# 전역 입력 중재자
+_input_arbiter = InputArbiter()
+
+
+def get_input_arbiter():
+    """전역 입력 중재자 반환"""
+    return _input_arbiter
@@ -33,12 +33,25 @@ from PyQt5.QtWidgets import (QApplication, QWidget, QVBoxLayout, QHBoxLayout, QL
 from PyQt5.QtCore import QTimer, Qt, QDate, QTime, pyqtSignal
 from PyQt5.QtGui import QIcon, QFont, QTextCursor, QIntValidator
         # 분리된 모듈들 import (print 오버라이드 후)
-from constants import current_dir, bundles_dir
+from constants import current_dir, bundles_dir, test_results_dir
+from ocr_strategy import get_strategy_store
+from screen_text_index import get_screen_text_index
+from deferred_checks import get_deferred_checks
+from frame_buffer import get_frame_buffer
+from artifact_writer import get_artifact_writer, format_artifact_writer_stats
+from capture_index import get_capture_index
+from artifact_store import get_artifact_store
+from execution_plan import compile_plan, report_plan_errors
+from profiler import get_profiler
+from window_geometry import get_window_geometry
+from text_match import DEFAULT_THRESHOLD, DEFAULT_NORMALIZE
 from utils import (load_config, save_config, auto_detect_tesseract, take_screenshot, 
                    image_to_text, align_windows, set_pytesseract_cmd, start_keep_alive, 
                    stop_keep_alive, is_keep_alive_running, dim_screen, restore_screen_brightness,
-                   is_screen_dimmed)
+                   is_screen_dimmed, format_ocr_cache_stats, format_ocr_strategy_stats,
+                   apply_engine_settings)
 from commands import CommandProcessor
+from multi_client import MultiClientExecutor
 from dialogs import CommandPopup, TriggerEditor
 from scheduler import ScheduleManager, SchedulerEngine, Schedule, ScheduleType, ScheduleStatus
 from updater import AutoUpdater
@@ -104,6 +117,12 @@ class PbbAutoApp(QWidget):
             from utils import auto_detect_tesseract
             auto_detect_tesseract()
         
+        # OCR 성능 설정 적용
+        self.apply_ocr_settings()
+        
+        # 지난 실행에서 쌓인 스크린샷/리포트 정리 (백그라운드)
+        get_artifact_store().maintain_async()
+        
         # 마우스 위치 실시간 추적 설정
         self.init_mouse_tracker()
         
@@ -204,10 +223,13 @@ class PbbAutoApp(QWidget):
         self.refresh_button.setFixedWidth(25)
         self.refresh_button.clicked.connect(self.refresh_window_list)
         self.window_dropdown = QComboBox(self)
+        # 실행 스레드가 드롭다운을 읽지 않도록 선택이 바뀔 때만 좌표 캐시 대상 갱신
+        self.window_dropdown.currentTextChanged.connect(get_window_geometry().set_target)
         #self.window_dropdown.setFixedWidth(200)
-        #self.multi_checkbox = QCheckBox('Multi', self)
-        #self.multi_align_button = QPushButton('Align', self)
-        #self.multi_align_button.clicked.connect(self.align_windows)
+        # 드롭다운의 윈도우(최대 4개)에 동시에 실행 (multi_client.py)
+        self.multi_checkbox = QCheckBox('Multi', self)
+        self.multi_align_button = QPushButton('Align', self)
+        self.multi_align_button.clicked.connect(self.align_windows)
         #self.mouse_track_button = QPushButton('Mouse OFF', self)
         #self.mouse_track_button.clicked.connect(self.toggle_mouse_tracking_button)
         self.coord_label = QLabel('Coordinates: (x, y, w, h)', self)
@@ -218,8 +240,8 @@ class PbbAutoApp(QWidget):
         refresh_layout.addWidget(self.prefix_input)
         refresh_layout.addWidget(self.refresh_button)
         refresh_layout.addWidget(self.window_dropdown)
-        #refresh_layout.addWidget(self.multi_checkbox)
-        #refresh_layout.addWidget(self.multi_align_button)
+        refresh_layout.addWidget(self.multi_checkbox)
+        refresh_layout.addWidget(self.multi_align_button)
         #refresh_layout.addWidget(self.mouse_track_button)
 
         main_layout.addLayout(refresh_layout)
@@ -466,6 +488,71 @@ class PbbAutoApp(QWidget):
         self.execution_thread.daemon = True  # 메인 프로그램 종료 시 자동 종료
         self.execution_thread.start()
 
+    def _expand_checked_commands(self, bundle_labels=None):
+        """체크된 항목을 실행할 명령어 문자열 목록으로 펼침 (번들은 체크된 개별 명령어로, 주석 제거)
+
+        Args:
+            bundle_labels: 지정하면 명령어마다 소속 번들 이름(개별 명령어는 '')을 순서대로 추가
+        """
+        commands = []
+        for j in range(self.command_list.count()):
+            item = self.command_list.item(j)
+            # 체크된 아이템만 처리
+            if item.checkState() == Qt.Checked:
+                item_text = item.text()
+                bundle_name = self._parse_bundle_display(item_text)
+                if bundle_name and bundle_name in self.bundles:
+                    print(f"Executing bundle: {bundle_name}")
+                    bundle_structs = self.bundles[bundle_name]
+                    for struct in bundle_structs:
+                        # 번들 내 개별 명령어의 체크 상태 확인
+                        is_checked = struct.get('checked', True)  # 기본값 True (기존 호환성)
+                        if is_checked:
+                            cmd = struct.get('raw', '').split('#')[0].strip()
+                            if cmd:
+                                commands.append(cmd)
+                                if bundle_labels is not None:
+                                    bundle_labels.append(bundle_name)
+                        else:
+                            print(f"Skipping unchecked command in bundle: {struct.get('raw', '')}")
+                else:
+                    cmd = item_text.split('#')[0].strip()
+                    if cmd:
+                        commands.append(cmd)
+                        if bundle_labels is not None:
+                            bundle_labels.append('')
+            else:
+                print(f"Skipping unchecked item: {item.text()}")
+        return commands
+
+    def _multi_client_titles(self):
+        """다중 실행 대상 윈도우 제목 (드롭다운 앞쪽 최대 4개, Align과 같은 기준)"""
+        titles = [self.window_dropdown.itemText(i) for i in range(min(self.window_dropdown.count(), 4))]
+        return [title for title in titles if title]
+
+    def _run_multi_client(self, plan, titles, execute_count, window_info, test_title):
+        """여러 윈도우에 같은 실행 계획을 동시에 실행 (클라이언트별 상태/테스트 결과 분리)"""
+        executor = MultiClientExecutor(titles, window_info=window_info, main_app=self)
+        # 진행 표시/대기 타이머는 첫 번째 클라이언트 기준
+        executor.sessions[0].processor.state['popup'] = getattr(self, 'popup', None)
+
+        def on_step(session, step):
+            if session.index == 1 and hasattr(self, 'popup') and self.popup:
+                try:
+                    self.popup.mark_executed(step.index)
+                except Exception:
+                    pass
+
+        self.multi_executor = executor
+        try:
+            executor.run(plan, execute_count, self.settings.get("ocr_batch", True), test_title, on_step)
+        finally:
+            self.multi_executor = None
+        for session in executor.sessions:
+            passed = sum(1 for r in session.results if r.get('result') == 'Pass')
+            print(f"[{session.title}] 단계 {session.steps_run}개 실행, 테스트 {len(session.results)}개 "
+                  f"(Pass {passed}), {session.elapsed:.1f}s")
+
     def _execute_commands_worker(self):
         """명령어 실행 워커 (별도 스레드)"""
         from datetime import datetime
@@ -473,6 +560,8 @@ class PbbAutoApp(QWidget):
         # 테스트 세션 시작 시간 및 제목 설정
         start_time = datetime.now()
         self.command_processor.state['test_session_start'] = start_time
+        # 이번 실행에서 저장하는 스크린샷을 세션/단계별로 조회할 수 있도록 캡처 인덱스에 기록
+        get_capture_index().begin_session(start_time.strftime('%y%m%d_%H%M%S'))
         
         # 현재 선택된 번들명에서 테스트 제목 추출
         test_title = self._extract_test_title_from_bundles()
@@ -511,94 +600,82 @@ class PbbAutoApp(QWidget):
         else:
             execute_count = int(execute_count)
 
-        for i in range(execute_count):
-            if self.stop_flag:
-                print("Stopped before window selection.")
-                return
-
-            # 현재 반복 횟수를 state에 저장 (1-based)
-            self.command_processor.state['iteration_count'] = i + 1
-
-            # 윈도우 선택
-            selected_windows = []  # 매 루프마다 초기화
-            # if self.multi_checkbox.isChecked():
-            #     for window in all_windows:
-            #         if window.title in [self.window_dropdown.itemText(i) for i in range(self.window_dropdown.count())]:
-            #             selected_windows.append(window)
-            # else:
-            selected_window = self.window_dropdown.currentText()
-            print(f"찾으려는 윈도우: '{selected_window}'")
-            for window in all_windows:
-                if window.title == selected_window:
-                    selected_windows.append(window)
-                    print(f"✓ 윈도우 찾음: '{window.title}'")
-                    break
-            
-            # 디버깅: 윈도우 선택 결과 확인
-            if not selected_windows:
-                print(f"⚠️ 경고: 선택된 윈도우가 없습니다. (드롭다운 선택: '{self.window_dropdown.currentText()}')")
-                print("현재 사용 가능한 윈도우 목록:")
-                for idx, window in enumerate(all_windows[:10], 1):  # 처음 10개만 표시
-                    print(f"  {idx}. '{window.title}'")
-                if len(all_windows) > 10:
-                    print(f"  ... 외 {len(all_windows) - 10}개 더")
-                print("⚠️ 윈도우를 찾을 수 없지만 전체 화면 좌표로 명령어 실행을 계속합니다.")
-                print("   (runapp 명령어 등으로 앱 위치를 지정할 수 있습니다)")
-
-            # 윈도우가 있으면 해당 윈도우들에 대해, 없으면 한 번만 실행
-            windows_to_process = selected_windows if selected_windows else [None]
-            
-            for window in windows_to_process:
+        # 체크된 번들/명령어를 한 번만 펼쳐 실행 계획으로 컴파일 (반복 횟수/윈도우마다 다시 파싱하지 않음)
+        bundle_labels = []
+        plan = compile_plan(self._expand_checked_commands(bundle_labels))
+        report_plan_errors(plan)
+        # 단계별 시간 프로파일 (설정에서 켠 경우, 요약 표는 번들별로 구분)
+        get_profiler().begin_run(test_title, bundle_labels)
+
+        # 다중 클라이언트: 드롭다운의 여러 윈도우에 동시에 실행 (입력만 직렬화)
+        multi_titles = self._multi_client_titles() if self.multi_checkbox.isChecked() else []
+        if len(multi_titles) >= 2:
+            self._run_multi_client(plan, multi_titles, execute_count, window_info, test_title)
+        else:
+            for i in range(execute_count):
                 if self.stop_flag:
-                    print("Stopped before window activation.")
+                    print("Stopped before window selection.")
                     return
-                
-                # 윈도우가 있으면 활성화
-                if window:
-                    try:
-                        window.activate()
-                        print(f"현재 윈도우: {window.title}")
-                    except Exception as e:
-                        print(f"윈도우 '{window.title}' 활성화 중 오류 발생: {e}")
-                else:
-                    print("현재 윈도우: 없음 (전체 화면 좌표 사용)")
-
-                # Expand bundles into flat command list (only from checked items)
-                commands = []
-                for j in range(self.command_list.count()):
-                    item = self.command_list.item(j)
-                    # 체크된 아이템만 처리
-                    if item.checkState() == Qt.Checked:
-                        item_text = item.text()
-                        bundle_name = self._parse_bundle_display(item_text)
-                        if bundle_name and bundle_name in self.bundles:
-                            print(f"Executing bundle: {bundle_name}")
-                            bundle_structs = self.bundles[bundle_name]
-                            for struct in bundle_structs:
-                                # 번들 내 개별 명령어의 체크 상태 확인
-                                is_checked = struct.get('checked', True)  # 기본값 True (기존 호환성)
-                                if is_checked:
-                                    cmd = struct.get('raw', '').split('#')[0].strip()
-                                    if cmd:
-                                        commands.append(cmd)
-                                else:
-                                    print(f"Skipping unchecked command in bundle: {struct.get('raw', '')}")
-                        else:
-                            cmd = item_text.split('#')[0].strip()
-                            if cmd:
-                                commands.append(cmd)
-                    else:
-                        print(f"Skipping unchecked item: {item.text()}")
-                
-                time.sleep(0.2)
-                for idx, command in enumerate(commands):
+
+                # 현재 반복 횟수를 state에 저장 (1-based)
+                self.command_processor.state['iteration_count'] = i + 1
+
+                # 윈도우 선택
+                selected_windows = []  # 매 루프마다 초기화
+                selected_window = self.window_dropdown.currentText()
+                print(f"찾으려는 윈도우: '{selected_window}'")
+                for window in all_windows:
+                    if window.title == selected_window:
+                        selected_windows.append(window)
+                        print(f"✓ 윈도우 찾음: '{window.title}'")
+                        break
+            
+                # 디버깅: 윈도우 선택 결과 확인
+                if not selected_windows:
+                    print(f"⚠️ 경고: 선택된 윈도우가 없습니다. (드롭다운 선택: '{self.window_dropdown.currentText()}')")
+                    print("현재 사용 가능한 윈도우 목록:")
+                    for idx, window in enumerate(all_windows[:10], 1):  # 처음 10개만 표시
+                        print(f"  {idx}. '{window.title}'")
+                    if len(all_windows) > 10:
+                        print(f"  ... 외 {len(all_windows) - 10}개 더")
+                    print("⚠️ 윈도우를 찾을 수 없지만 전체 화면 좌표로 명령어 실행을 계속합니다.")
+                    print("   (runapp 명령어 등으로 앱 위치를 지정할 수 있습니다)")
+
+                # 윈도우가 있으면 해당 윈도우들에 대해, 없으면 한 번만 실행
+                windows_to_process = selected_windows if selected_windows else [None]
+            
+                for window in windows_to_process:
                     if self.stop_flag:
-                        print("Stopped during command execution.")
+                        print("Stopped before window activation.")
                         return
-                    if command:
-                        print(f"[{idx+1}/{len(commands)}] {command}")
-                        # 명령어 처리기에 위임 (윈도우 좌표는 동적으로 가져옴)
-                        self.command_processor.process_command(command)
+                
+                    # 윈도우가 있으면 활성화
+                    if window:
+                        try:
+                            window.activate()
+                            print(f"현재 윈도우: {window.title}")
+                        except Exception as e:
+                            print(f"윈도우 '{window.title}' 활성화 중 오류 발생: {e}")
+                    else:
+                        print("현재 윈도우: 없음 (전체 화면 좌표 사용)")
+
+                    time.sleep(0.2)
+                    batch_until = 0  # 일괄 OCR을 이미 준비한 단계 범위
+                    for position, step in enumerate(plan.steps):
+                        if self.stop_flag:
+                            print("Stopped during command execution.")
+                            return
+                        idx = step.index
+                        # 연속된 TestText는 한 번에 캡처·OCR하여 결과를 미리 준비
+                        if position >= batch_until and self.settings.get("ocr_batch", True):
+                            batch_run = plan.batch_run(position)
+                            if len(batch_run) >= 2:
+                                self.command_processor.prefetch_text_checks(batch_run)
+                            batch_until = position + max(len(batch_run), 1)
+                        print(f"[{idx+1}/{plan.total}] {step.text}")
+                        get_capture_index().step = idx + 1
+                        # 컴파일된 단계를 명령어 처리기에서 바로 실행 (윈도우 좌표는 동적으로 가져옴)
+                        self.command_processor.run_step(step)
                         if hasattr(self, 'popup') and self.popup:
                             try:
                                 self.popup.mark_executed(idx)
@@ -627,6 +704,35 @@ class PbbAutoApp(QWidget):
         except Exception as e:
             print('리포트 파일 열기 오류 :', e)
         
+        # 남은 지연 검사 완료 대기 (다음 실행으로 백그라운드 OCR이 넘어가지 않도록)
+        get_deferred_checks().wait()
+        
+        # OCR 결과 캐시 통계 (반복 OCR이 얼마나 생략되었는지)
+        print(f"OCR 캐시 통계: {format_ocr_cache_stats()}")
+        print(f"OCR 전략 학습: {format_ocr_strategy_stats()}")
+        get_strategy_store().flush()
+        # 실행 간에는 화면이 바뀌므로 화면 텍스트 인덱스/최근 프레임 해제
+        get_screen_text_index().clear()
+        frame_stats = get_frame_buffer().stats()
+        print(f"프레임 버퍼: 캡처 {frame_stats['recorded']}장, 디스크 저장 {frame_stats['dumped']}장")
+        get_frame_buffer().clear()
+        # 백그라운드 저장 중인 스크린샷을 모두 기록 (세션 종료 시 누락 방지)
+        get_artifact_writer().flush()
+        print(f"스크린샷 저장: {format_artifact_writer_stats()}")
+        get_artifact_writer().reset_stats()
+        get_capture_index().end_session()
+        # 단계별 시간 프로파일 저장 (Chrome trace + 명령어별 요약 표)
+        profiler = get_profiler()
+        if profiler.enabled:
+            try:
+                trace_path, summary_path = profiler.export(test_results_dir)
+                print(f"⏱️ 실행 프로파일 (합계 상위 20개):\n{profiler.format_summary(limit=20)}")
+                print(f"⏱️ 프로파일 저장: {trace_path} (chrome://tracing / Perfetto), {summary_path}")
+            except Exception as e:
+                print(f"프로파일 저장 실패: {e}")
+        # 보관 정책을 넘는 스크린샷/리포트 정리와 오래된 스크린샷 압축 (백그라운드)
+        get_artifact_store().maintain_async()
+        
         # Execute 루틴 완료 후 test_results 및 세션 정보 초기화 (중복 누적 방지)
         if hasattr(self.command_processor, 'state'):
             end_time = datetime.now()
@@ -650,6 +756,10 @@ class PbbAutoApp(QWidget):
             self.command_processor.state['last_report_txt_path'] = None
             self.command_processor.state['last_report_excel_path'] = None
             
+            # 메모리 캡처 프레임 해제
+            self.command_processor.state['screenshot_image'] = None
+            self.command_processor.state['ocr_prefetch'] = {}
+            
             # popup 참조 제거
             if 'popup' in self.command_processor.state:
                 self.command_processor.state['popup'] = None
@@ -669,11 +779,16 @@ class PbbAutoApp(QWidget):
         # 중지 플래그 설정 (더 강력하게)
         self.stop_flag = True
         self.command_processor.stop_flag = True
+        if getattr(self, 'multi_executor', None):
+            self.multi_executor.stop()
         
         # 모든 관련 중지 플래그 설정
         if hasattr(self.command_processor, 'state'):
             self.command_processor.state['stop_requested'] = True
         
+        # 아직 시작하지 않은 지연 검사 취소
+        get_deferred_checks().cancel()
+        
         # 테스트 결과 초기화 (중지 시)
         if hasattr(self.command_processor, 'state'):
             if 'test_results' in self.command_processor.state:
@@ -793,8 +908,22 @@ class PbbAutoApp(QWidget):
         default_settings = {
             "tesseract_path": "",
             "debug_mode": False,
+            "profile_enabled": False,
             "auto_save_enabled": False,
-            "auto_save_interval": 5
+            "auto_save_interval": 5,
+            "ocr_parallel": False,
+            "ocr_batch": True,
+            "ocr_script_detect": True,
+            "ocr_deferred": False,
+            "capture_backend": "auto",
+            "screenshot_dedup": True,
+            "artifact_retention_days": 0,
+            "artifact_retention_mb": 0,
+            "artifact_retention_sessions": 0,
+            "artifact_compact_days": 0,
+            "report_retention_days": 0,
+            "fuzzy_threshold": DEFAULT_THRESHOLD,
+            "fuzzy_normalize": ",".join(DEFAULT_NORMALIZE)
         }
         
         try:
@@ -834,8 +963,15 @@ class PbbAutoApp(QWidget):
             from utils import set_pytesseract_cmd
             set_pytesseract_cmd(tesseract_path)
         
+        # OCR 성능 설정 적용
+        self.apply_ocr_settings()
+        
         # 자동 저장 타이머 재시작
         self.restart_auto_save_timer()
+    
+    def apply_ocr_settings(self):
+        """OCR/화면 캡처 성능 관련 설정을 각 모듈에 반영 (헤드리스 실행과 같은 함수 사용)"""
+        apply_engine_settings(self.settings)
 
     def test_ocr(self):
         """OCR 테스트"""
@@ -1700,6 +1836,8 @@ class PbbAutoApp(QWidget):
         self.mouse_timer = QTimer(self)
         self.mouse_timer.timeout.connect(self.update_mouse_position)
         self.mouse_timer.start(100)  # 100ms마다 업데이트 (10FPS)
+        # 창 이동/크기 변경 시 좌표 캐시 무효화 (Windows, GUI 스레드 메시지 루프에서 이벤트 수신)
+        get_window_geometry().install_move_hook()
     
     def init_auto_save_timer(self):
         """자동 저장 타이머 초기화"""
@@ -1790,11 +1928,10 @@ class PbbAutoApp(QWidget):
             
             if selected_window:
                 try:
-                    # 윈도우 좌표 정보 가져오기
-                    windows = gw.getWindowsWithTitle(selected_window)
-                    if windows:
-                        window = windows[0]
-                        win_x, win_y, win_w, win_h = window.left, window.top, window.width, window.height
+                    # 윈도우 좌표 정보 가져오기 (좌표 캐시, 100ms마다 윈도우 목록을 훑지 않음)
+                    coords = get_window_geometry().coords(selected_window)
+                    if coords:
+                        win_x, win_y, win_w, win_h = coords
                         
                         # 윈도우 내 상대 좌표 계산
                         rel_x = x - win_x
@@ -2420,6 +2557,10 @@ class PbbAutoApp(QWidget):
             if hasattr(self, 'schedule_manager'):
                 self.schedule_manager.save_schedules()
             
+            # 병렬 OCR 프로세스 풀 정리
+            import tes
+            tes.shutdown_process_pool()
+            
             event.accept()
         except Exception as e:
             print(f"종료 중 오류: {e}")
@@ -2915,6 +3056,10 @@ def handle_exception(exc_type, exc_value, exc_traceback):
         pass
 
 if __name__ == '__main__':
+    # 병렬 OCR 프로세스 풀 지원 (PyInstaller exe에서 자식 프로세스가 앱을 다시 띄우지 않도록)
+    import multiprocessing
+    multiprocessing.freeze_support()
+    
     # 전역 예외 처리기 설정
     sys.excepthook = handle_exception
     
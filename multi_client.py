@@ -0,0 +1,147 @@
+"""
+다중 클라이언트 실행 - 하나의 실행 계획을 여러 게임 윈도우에 동시에 실행
+
+윈도우마다 순서대로 실행하면 N개 클라이언트는 1개의 N배 시간이 걸립니다.
+대부분의 시간은 대기(wait/waituntil)와 화면 검사(캡처/OCR)이므로 클라이언트별 스레드에서 동시에 실행하고,
+OS 전체에서 하나뿐인 포커스/키보드/마우스 입력만 입력 중재자(input_arbiter.py)로 직렬화합니다.
+
+- ClientSession: 윈도우 하나의 실행 컨텍스트 (전용 CommandProcessor/상태/테스트 결과/윈도우 좌표 캐시)
+- MultiClientExecutor: 클라이언트별 스레드로 같은 ExecutionPlan 실행
+- OCR 엔진/캡처 백엔드/지연 검사 작업자는 모든 클라이언트가 공유 (OCR 인스턴스는 클라이언트 수만큼 확보)
+
+화면 검사는 포커스 없이 윈도우 영역을 캡처하므로 클라이언트 창은 겹치지 않게 배치해야 합니다 (Align).
+"""
+
+# 로그 설정을 가장 먼저 import
+import logger_setup
+
+import time
+from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor, wait as wait_futures
+
+import ocr_engine
+from commands import CommandProcessor
+from input_arbiter import get_input_arbiter
+from window_geometry import WindowGeometry
+
+
+class ClientSession:
+    """클라이언트 윈도우 하나의 실행 컨텍스트
+
+    Args:
+        index: 클라이언트 번호 (1-based, 리포트 파일명 구분용)
+        title: 대상 윈도우 제목
+        arbiter: 공용 입력 중재자
+        window_info: 실행 정보 (실행 파일 등, target_app은 클라이언트 윈도우로 설정)
+        main_app: 메인 앱 (중지 플래그 확인용, 없으면 None)
+    """
+
+    def __init__(self, index, title, arbiter, window_info=None, main_app=None):
+        self.index = index
+        self.title = title
+        self.geometry = WindowGeometry()
+        self.geometry.set_target(title)
+        self.processor = CommandProcessor()
+        self.processor.main_app = main_app
+        self.processor.geometry = self.geometry
+        self.processor.arbiter = arbiter
+        info = dict(window_info or {})
+        info['target_app'] = title
+        self.processor.state['window_info'] = info
+        self.processor.state['client'] = index
+        self.elapsed = 0.0
+        self.steps_run = 0
+        self.error = None
+
+    @property
+    def results(self):
+        return self.processor.state['test_results']
+
+    def stop(self):
+        self.processor.stop_flag = True
+
+    def run(self, plan, iterations=1, ocr_batch=True, session_start=None, title=None, on_step=None):
+        """실행 계획을 이 클라이언트에서 iterations회 실행 (클라이언트 스레드에서 호출)
+
+        Args:
+            on_step: 단계 실행 후 호출할 함수 (session, step)
+        """
+        processor = self.processor
+        state = processor.state
+        state['test_session_start'] = session_start or datetime.now()
+        state['test_session_title'] = title
+        start = time.perf_counter()
+        try:
+            for i in range(iterations):
+                if processor.stop_flag:
+                    break
+                state['iteration_count'] = i + 1
+                batch_until = 0
+                for position, step in enumerate(plan.steps):
+                    if processor.stop_flag:
+                        print(f"[{self.title}] Stopped during command execution.")
+                        break
+                    if position >= batch_until and ocr_batch:
+                        batch_run = plan.batch_run(position)
+                        if len(batch_run) >= 2:
+                            processor.prefetch_text_checks(batch_run)
+                        batch_until = position + max(len(batch_run), 1)
+                    print(f"[{self.title}] [{step.index + 1}/{plan.total}] {step.text}")
+                    processor.run_step(step)
+                    self.steps_run += 1
+                    if on_step:
+                        on_step(self, step)
+        except Exception as e:
+            self.error = e
+            print(f"❌ [{self.title}] 실행 오류: {e}")
+        finally:
+            self.elapsed = time.perf_counter() - start
+        return self
+
+
+class MultiClientExecutor:
+    """같은 실행 계획을 여러 윈도우에 동시에 실행
+
+    Args:
+        titles: 대상 윈도우 제목 목록
+        arbiter: 입력 중재자 (기본: 전역)
+        window_info: 클라이언트 공통 실행 정보
+        main_app: 메인 앱 (중지 플래그 확인용)
+    """
+
+    def __init__(self, titles, arbiter=None, window_info=None, main_app=None):
+        self.arbiter = arbiter or get_input_arbiter()
+        self.sessions = [ClientSession(i + 1, title, self.arbiter, window_info, main_app)
+                         for i, title in enumerate(titles)]
+        self.elapsed = 0.0
+
+    def run(self, plan, iterations=1, ocr_batch=True, title=None, on_step=None):
+        """모든 클라이언트 실행이 끝날 때까지 대기 → 세션 목록"""
+        if not self.sessions:
+            return []
+        self.arbiter.reset()
+        # 클라이언트마다 동시에 OCR할 수 있도록 상주 인스턴스 확보
+        ocr_engine.reserve_instances(len(self.sessions))
+        session_start = datetime.now()
+        print(f"다중 클라이언트 실행: {', '.join(s.title for s in self.sessions)}")
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=len(self.sessions), thread_name_prefix='client') as pool:
+            futures = [pool.submit(session.run, plan, iterations, ocr_batch, session_start, title, on_step)
+                       for session in self.sessions]
+            wait_futures(futures)
+        self.elapsed = time.perf_counter() - start
+        print(f"다중 클라이언트 실행 완료: {self.summary()}")
+        return self.sessions
+
+    def stop(self):
+        for session in self.sessions:
+            session.stop()
+
+    def summary(self):
+        """전체 시간 / 클라이언트 합계 시간 / 입력 잠금 통계"""
+        total = sum(session.elapsed for session in self.sessions)
+        speedup = total / self.elapsed if self.elapsed > 0 else 0.0
+        arbiter = self.arbiter.stats()
+        return (f"클라이언트 {len(self.sessions)}개, 전체 {self.elapsed:.1f}s "
+                f"(클라이언트 합계 {total:.1f}s, {speedup:.1f}배) | "
+                f"입력 {arbiter['bursts']}회, 포커스 전환 {arbiter['switches']}회, 입력 대기 {arbiter['wait_s']}s")
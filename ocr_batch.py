@@ -0,0 +1,122 @@
+"""
+일괄 OCR - 같은 화면의 여러 영역을 몽타주 1장으로 합쳐 Tesseract 1회로 인식
+
+체크리스트는 정적인 한 화면의 서로 다른 영역을 검사하는 TestText 10~30개가
+연속으로 이어지는 경우가 많습니다. 영역마다 캡처+OCR 캐스케이드를 돌리는 대신
+
+1. 모든 영역을 감싸는 범위를 한 번만 캡처하고
+2. 영역별로 잘라 밝은 배경/어두운 글자로 맞춘 뒤 구분 여백을 두고 세로로 이어 붙여
+3. Tesseract를 한 번 실행하고
+4. 단어 박스의 세로 위치로 각 영역의 결과를 되찾습니다.
+
+결과는 미리 받아 둔 값(prefetch)으로만 사용되며, TestText는 실행 시점에 화면이
+그대로인지 확인한 뒤 통과한 경우에만 사용합니다. (실패 시 기존 영역별 OCR로 재확인)
+"""
+
+# 로그 설정을 가장 먼저 import
+import logger_setup
+
+import time
+from PIL import Image
+
+import ocr_engine
+from tes import data_to_text, data_to_confidence
+from preprocess import get_pipeline
+
+# 영역 사이 구분 여백 / 몽타주 테두리 여백 (픽셀)
+_SEPARATOR = 24
+_PADDING = 12
+
+# 영역별 밝기 방향 통일 (어두운 배경의 밝은 글자는 반전)
+_NORMALIZE = 'gray,invert'
+
+# TestText OCR 타입 → Tesseract 언어 (tes의 순차 캐스케이드와 같은 조합)
+OCR_TYPE_LANGS = {'i2s': 'eng', 'i2skr': 'kor+eng'}
+
+
+def build_montage(crops, separator=_SEPARATOR, padding=_PADDING):
+    """영역 이미지들을 세로로 이어 붙인 몽타주 생성
+
+    Returns:
+        (montage, slots) - slots: 영역별 몽타주 세로 범위 [(top, bottom), ...]
+        (구분 여백의 절반씩을 포함하여 경계에 걸친 단어 박스도 가까운 영역에 배정)
+    """
+    normalize = get_pipeline(_NORMALIZE)
+    normalized = [normalize.run(crop) for crop in crops]
+    width = max(img.width for img in normalized) + padding * 2
+    height = sum(img.height for img in normalized) + separator * (len(normalized) - 1) + padding * 2
+
+    montage = Image.new('L', (width, height), 255)
+    slots = []
+    top = padding
+    for img in normalized:
+        montage.paste(img, (padding, top))
+        slots.append((top - separator // 2, top + img.height + separator // 2))
+        top += img.height + separator
+    return montage, slots
+
+
+def split_by_slot(data, slots):
+    """image_to_data 결과를 단어 박스 중심 위치로 영역별로 나눔
+
+    Returns:
+        [(text, confidence), ...] - slots와 같은 순서
+    """
+    indices = [[] for _ in slots]
+    for i, word in enumerate(data.get('text', [])):
+        if not (word or '').strip():
+            continue
+        center = data['top'][i] + data['height'][i] / 2
+        for slot_idx, (top, bottom) in enumerate(slots):
+            if top <= center < bottom:
+                indices[slot_idx].append(i)
+                break
+
+    results = []
+    for slot_indices in indices:
+        subset = {key: [values[i] for i in slot_indices] for key, values in data.items()}
+        results.append((data_to_text(subset), data_to_confidence(subset)))
+    return results
+
+
+def ocr_regions(crops, lang_code, psm=6):
+    """여러 영역 이미지를 Tesseract 1회로 인식 → [(text, confidence), ...]"""
+    montage, slots = build_montage(crops)
+    data = ocr_engine.image_to_data(montage, lang_code, psm)
+    return split_by_slot(data, slots)
+
+
+def prefetch_regions(jobs):
+    """화면 좌표의 여러 영역을 한 번 캡처하여 언어별로 일괄 OCR
+
+    Args:
+        jobs: [(key, (x, y, width, height), lang_code), ...]
+
+    Returns:
+        {key: {'image': 영역 이미지, 'text': 텍스트, 'confidence': 신뢰도}}
+    """
+    if not jobs:
+        return {}
+    # 화면 캡처가 필요한 경우에만 import (벤치마크 등 헤드리스 환경에서 ocr_regions만 사용 가능)
+    from utils import capture_region
+    start_time = time.time()
+
+    left = min(region[0] for _, region, _ in jobs)
+    top = min(region[1] for _, region, _ in jobs)
+    right = max(region[0] + region[2] for _, region, _ in jobs)
+    bottom = max(region[1] + region[3] for _, region, _ in jobs)
+    frame = capture_region(left, top, right - left, bottom - top)
+
+    groups = {}
+    for key, (x, y, width, height), lang_code in jobs:
+        crop = frame.crop((x - left, y - top, x - left + width, y - top + height))
+        groups.setdefault(lang_code, []).append((key, crop))
+
+    results = {}
+    for lang_code, entries in groups.items():
+        crops = [crop for _, crop in entries]
+        for (key, crop), (text, conf) in zip(entries, ocr_regions(crops, lang_code)):
+            results[key] = {'image': crop, 'text': text, 'confidence': conf}
+
+    print(f"⚡ 일괄 OCR: {len(jobs)}개 영역, Tesseract {len(groups)}회 ({time.time() - start_time:.2f}s)")
+    return results
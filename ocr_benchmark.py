@@ -0,0 +1,393 @@
+"""
+OCR 벤치마크 / 정확도 회귀 검사 - 라벨이 있는 스크린샷 코퍼스로 속도와 정확도 측정
+
+사용법:
+    python ocr_benchmark.py <코퍼스 폴더> [--modes fallback legacy expected batch pp:sauvola]
+                            [--lang kor] [--repeat 3] [--engine auto] [--tesseract 경로]
+                            [--output results.json] [--baseline baseline.json]
+    python ocr_benchmark.py <코퍼스 폴더> --preprocess sauvola otsu [--no-ocr]
+
+코퍼스 라벨 (둘 중 하나, 라벨이 없는 이미지는 속도만 측정):
+    labels.json         {"파일명": {"text": "정답 텍스트", "lang": "kor"}, ...}
+                        (값이 문자열이면 정답 텍스트로 보고 언어는 --lang 사용)
+    <이미지>.gt.txt     이미지와 같은 이름의 정답 텍스트 파일 (Tesseract 학습 데이터와 같은 형식)
+
+측정 모드:
+    fallback     image_to_text_with_fallback (단일 호출, 현재 기본 동작)
+    legacy       기존 2회 호출 방식 (image_to_string + image_to_data)
+    expected     정답 텍스트를 expected_text로 전달 (TestText의 조기 종료 경로)
+    fuzzy        expected + 유사 일치 조기 종료 (text_match.py)
+    combined     expected에서 문자 체계 판별을 끄고 항상 조합 모델(kor+eng) 사용
+                 (expected와 비교하면 단일 언어 모델 우선의 속도/정확도 차이를 확인, script_detect.py)
+    parallel     병렬 OCR 모드
+    batch        ocr_batch 몽타주 일괄 OCR (언어별 최대 --batch-size개씩)
+    pp:<명세>    전처리 파이프라인 지정 (예: pp:sauvola, pp:gray,invert,otsu,scale2)
+
+결과는 모드별 p50/p95/p99 지연시간, 단계별 평균 시간, Tesseract 호출 수,
+언어별 완전일치/유사일치 정확도이며 --output JSON으로 저장합니다.
+유사일치는 text_match 정규화/편집 거리 기준(--fuzzy-threshold)으로 판정합니다.
+--baseline을 지정하면 이전 결과와 비교하여 회귀가 있으면 종료 코드 1을 반환합니다.
+Linux에서 기본 설치된 tesseract(PATH)로 GUI 없이 실행할 수 있습니다.
+"""
+
+# 로그 설정을 가장 먼저 import
+import logger_setup
+
+import os
+import sys
+import json
+import time
+import argparse
+import difflib
+from datetime import datetime
+import pytesseract
+from PIL import Image
+
+import tes
+import ocr_engine
+from preprocess import get_pipeline
+from text_match import get_text_matcher
+from script_detect import get_script_detector
+from profiler import percentile
+
+IMAGE_EXTENSIONS = ('.jpg', '.jpeg', '.png', '.bmp')
+
+# image_to_text_with_fallback 언어 설정 → 일괄 OCR에 사용할 Tesseract 언어 조합
+_BATCH_LANG_CODES = {'auto': 'eng+kor', 'kor': 'kor+eng'}
+
+DEFAULT_MODES = ('fallback', 'expected')
+
+
+def collect_images(corpus_dir):
+    """코퍼스 폴더의 이미지 파일 목록 (정렬된 순서로 고정)"""
+    return sorted(
+        os.path.join(corpus_dir, f) for f in os.listdir(corpus_dir)
+        if f.lower().endswith(IMAGE_EXTENSIONS)
+    )
+
+
+def load_corpus(corpus_dir, default_lang):
+    """이미지와 정답 라벨 로드
+
+    Returns:
+        [{'name', 'path', 'image', 'text'(없으면 None), 'lang'}, ...]
+    """
+    labels = {}
+    labels_path = os.path.join(corpus_dir, 'labels.json')
+    if os.path.exists(labels_path):
+        with open(labels_path, 'r', encoding='utf-8') as f:
+            labels = json.load(f)
+
+    samples = []
+    for img_path in collect_images(corpus_dir):
+        name = os.path.basename(img_path)
+        label = labels.get(name)
+        if isinstance(label, str):
+            label = {'text': label}
+        label = dict(label or {})
+        gt_path = os.path.splitext(img_path)[0] + '.gt.txt'
+        if 'text' not in label and os.path.exists(gt_path):
+            with open(gt_path, 'r', encoding='utf-8') as f:
+                label['text'] = f.read().strip()
+        with Image.open(img_path) as img:
+            image = img.convert('RGB')
+        samples.append({
+            'name': name,
+            'path': img_path,
+            'image': image,
+            'text': label.get('text'),
+            'lang': label.get('lang', default_lang),
+        })
+    return samples
+
+
+def normalize_text(text):
+    """비교용 정규화 (연속 공백/줄바꿈을 공백 하나로)"""
+    return ' '.join((text or '').split())
+
+
+def similarity(expected, actual):
+    """정규화된 두 문자열의 유사도 (0~1)"""
+    return difflib.SequenceMatcher(None, normalize_text(expected), normalize_text(actual)).ratio()
+
+
+def _run_fallback(sample, mode):
+    """image_to_text_with_fallback 1회 실행 → (text, seconds, stats)"""
+    kwargs = {}
+    if mode in ('expected', 'fuzzy', 'combined') and sample['text']:
+        kwargs['expected_text'] = sample['text']
+        if mode == 'fuzzy':
+            kwargs['fuzzy'] = True
+    elif mode.startswith('pp:'):
+        kwargs['preprocess'] = mode[3:]
+    start = time.perf_counter()
+    text = tes.image_to_text_with_fallback(sample['image'], lang=sample['lang'], **kwargs)
+    return text or '', time.perf_counter() - start, dict(tes.get_last_ocr_stats())
+
+
+def _run_batch(samples, batch_size):
+    """언어별로 묶어 몽타주 일괄 OCR → {name: (text, seconds, stats)} (시간/호출 수는 영역 수로 나눔)"""
+    import ocr_batch
+
+    groups = {}
+    for sample in samples:
+        groups.setdefault(sample['lang'], []).append(sample)
+
+    outputs = {}
+    for lang, group in groups.items():
+        lang_code = _BATCH_LANG_CODES.get(lang, lang)
+        for start_idx in range(0, len(group), batch_size):
+            chunk = group[start_idx:start_idx + batch_size]
+            start = time.perf_counter()
+            results = ocr_batch.ocr_regions([s['image'] for s in chunk], lang_code)
+            share = (time.perf_counter() - start) / len(chunk)
+            for sample, (text, _conf) in zip(chunk, results):
+                outputs[sample['name']] = (text, share, {'stages': {}, 'tesseract_calls': 1 / len(chunk)})
+    return outputs
+
+
+def benchmark_mode(mode, samples, repeat, fuzzy_threshold, batch_size=20):
+    """한 가지 모드로 코퍼스 전체 실행 후 통계 반환"""
+    tes.OCR_SINGLE_PASS = mode != 'legacy'
+    tes.set_parallel_mode(mode == 'parallel')
+    get_script_detector().enabled = mode != 'combined'
+    if mode.startswith('pp:'):
+        get_pipeline(mode[3:])  # 잘못된 명세는 측정 전에 ValueError
+
+    latencies = []
+    stage_totals = {}
+    stage_counts = {}
+    calls = 0
+    runs = 0
+    last_texts = {}
+
+    try:
+        for _ in range(repeat):
+            if mode == 'batch':
+                outputs = _run_batch(samples, batch_size)
+            else:
+                outputs = {s['name']: _run_fallback(s, mode) for s in samples}
+            for name, (text, seconds, stats) in outputs.items():
+                latencies.append(seconds)
+                for stage, stage_seconds in stats.get('stages', {}).items():
+                    stage_totals[stage] = stage_totals.get(stage, 0) + stage_seconds
+                    stage_counts[stage] = stage_counts.get(stage, 0) + 1
+                calls += stats.get('tesseract_calls', 0)
+                runs += 1
+                last_texts[name] = text
+    finally:
+        tes.OCR_SINGLE_PASS = True
+        get_script_detector().enabled = True
+        if mode == 'parallel':
+            tes.set_parallel_mode(False)
+            tes.shutdown_process_pool()
+
+    accuracy = {}
+    failures = []
+    for sample in samples:
+        if sample['text'] is None:
+            continue
+        text = last_texts.get(sample['name'], '')
+        score = similarity(sample['text'], text)
+        exact = normalize_text(sample['text']) == normalize_text(text)
+        row = accuracy.setdefault(sample['lang'], {'samples': 0, 'exact': 0, 'fuzzy': 0, 'similarity': 0})
+        row['samples'] += 1
+        row['exact'] += 1 if exact else 0
+        row['fuzzy'] += 1 if exact or get_text_matcher().matches(text, sample['text'], True, fuzzy_threshold) else 0
+        row['similarity'] += score
+        if not exact:
+            failures.append({'name': sample['name'], 'expected': sample['text'], 'actual': text,
+                             'similarity': round(score, 3)})
+    for row in accuracy.values():
+        n = row['samples']
+        row['exact'] = row['exact'] / n
+        row['fuzzy'] = row['fuzzy'] / n
+        row['similarity'] = row['similarity'] / n
+
+    return {
+        'latency': {
+            'p50': percentile(latencies, 50),
+            'p95': percentile(latencies, 95),
+            'p99': percentile(latencies, 99),
+            'mean': sum(latencies) / len(latencies) if latencies else 0,
+        },
+        'stages': {s: stage_totals[s] / stage_counts[s] for s in stage_totals},
+        'tesseract_calls': calls / runs if runs else 0,
+        'accuracy': accuracy,
+        'failures': failures,
+    }
+
+
+def print_summary(results):
+    """모드별 결과표 출력"""
+    print("\n" + "=" * 78)
+    print(f"{'모드':<22}{'p50':>9}{'p95':>9}{'p99':>9}{'호출/회':>9}  정확도 (완전/유사)")
+    print("-" * 78)
+    for mode, row in results['modes'].items():
+        lat = row['latency']
+        acc = ', '.join(f"{lang} {a['exact'] * 100:.0f}%/{a['fuzzy'] * 100:.0f}%"
+                        for lang, a in row['accuracy'].items()) or '-'
+        print(f"{mode:<22}{lat['p50']:>8.3f}s{lat['p95']:>8.3f}s{lat['p99']:>8.3f}s"
+              f"{row['tesseract_calls']:>9.1f}  {acc}")
+    print("-" * 78)
+    for mode, row in results['modes'].items():
+        if row['stages']:
+            stages = ', '.join(f"{s} {t:.3f}s" for s, t in sorted(row['stages'].items()))
+            print(f"{mode:<22}단계 평균: {stages}")
+    print("=" * 78)
+
+
+def compare_with_baseline(results, baseline, max_latency_regression, max_accuracy_drop):
+    """기준 결과와 비교하여 차이 출력 → 회귀 항목 목록"""
+    regressions = []
+    print("\n기준 결과 비교: " + baseline.get('created', '?'))
+    for mode, row in results['modes'].items():
+        base = baseline.get('modes', {}).get(mode)
+        if base is None:
+            print(f"  {mode}: 기준 없음")
+            continue
+        for key in ('p50', 'p95'):
+            before, after = base['latency'][key], row['latency'][key]
+            change = (after / before - 1) if before else 0
+            print(f"  {mode} {key}: {before:.3f}s → {after:.3f}s ({change * 100:+.1f}%)")
+            if key == 'p95' and change > max_latency_regression:
+                regressions.append(f"{mode} p95 지연 {change * 100:+.1f}%")
+        for lang, acc in row['accuracy'].items():
+            base_acc = base.get('accuracy', {}).get(lang)
+            if base_acc is None:
+                continue
+            drop = base_acc['exact'] - acc['exact']
+            print(f"  {mode} {lang} 완전일치: {base_acc['exact'] * 100:.1f}% → {acc['exact'] * 100:.1f}%")
+            if drop > max_accuracy_drop:
+                regressions.append(f"{mode} {lang} 완전일치 -{drop * 100:.1f}%p")
+    return regressions
+
+
+def run_preprocess_benchmark(images, specs, lang, repeat, run_ocr=True):
+    """전처리 방식별 평균 소요시간과 OCR 신뢰도 비교
+
+    Returns:
+        {이름: {'ms': 평균 전처리 시간, 'confidence': 평균 신뢰도, 'found': 텍스트 인식 비율}}
+    """
+    lang_code = {'auto': 'eng+kor', 'kor': 'kor+eng'}.get(lang, lang)
+    methods = [(f"PIL:{mode}", lambda img, mode=mode: tes.preprocess_image(img, mode=mode))
+               for mode in ('standard', 'enhanced', 'light')]
+    for spec in specs:
+        pipeline = get_pipeline(spec)
+        methods.append((f"NumPy:{spec}", pipeline.run))
+
+    loaded = []
+    for img_path in images:
+        with Image.open(img_path) as img:
+            loaded.append(img.convert('RGB'))
+
+    results = {}
+    for name, method in methods:
+        elapsed = 0
+        confidences = []
+        found = 0
+        for img in loaded:
+            for _ in range(repeat):
+                start = time.perf_counter()
+                processed = method(img)
+                elapsed += time.perf_counter() - start
+            if run_ocr:
+                text, conf = tes.try_ocr_with_confidence(processed, lang_code, 6)
+                confidences.append(conf)
+                found += 1 if text else 0
+        results[name] = {
+            'ms': elapsed / (len(loaded) * repeat) * 1000,
+            'confidence': sum(confidences) / len(confidences) if confidences else None,
+            'found': found / len(loaded) if run_ocr else None,
+        }
+    return results
+
+
+def print_preprocess_report(results):
+    """전처리 방식별 비교표 출력"""
+    print("\n" + "=" * 64)
+    print(f"{'전처리':<36}{'시간':>10}{'신뢰도':>10}{'인식률':>8}")
+    print("-" * 64)
+    for name, row in results.items():
+        conf = f"{row['confidence']:.1f}" if row['confidence'] is not None else "-"
+        found = f"{row['found'] * 100:.0f}%" if row['found'] is not None else "-"
+        print(f"{name:<36}{row['ms']:>8.2f}ms{conf:>10}{found:>8}")
+    print("=" * 64)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="OCR 속도/정확도 벤치마크")
+    parser.add_argument('corpus', help="스크린샷 이미지 폴더 (labels.json 또는 *.gt.txt 라벨)")
+    parser.add_argument('--modes', nargs='+', default=list(DEFAULT_MODES),
+                        help="측정 모드 (fallback legacy expected fuzzy combined parallel batch pp:<명세>)")
+    parser.add_argument('--lang', default='kor', help="라벨에 언어가 없을 때 사용할 OCR 언어 (auto/kor/eng)")
+    parser.add_argument('--repeat', type=int, default=1, help="코퍼스 반복 횟수")
+    parser.add_argument('--engine', choices=['auto', 'subprocess', 'tesserocr'], help="OCR 엔진 강제 지정")
+    parser.add_argument('--tesseract', help="tesseract 실행 파일 경로 (기본: PATH)")
+    parser.add_argument('--batch-size', type=int, default=20, help="batch 모드 몽타주당 영역 수")
+    parser.add_argument('--fuzzy-threshold', type=float, default=0.85, help="유사일치 판정 유사도 기준 (text_match)")
+    parser.add_argument('--output', help="결과 JSON 저장 경로")
+    parser.add_argument('--baseline', help="비교할 기준 결과 JSON")
+    parser.add_argument('--max-latency-regression', type=float, default=0.2,
+                        help="허용 p95 지연 증가율 (기본 0.2 = 20%%)")
+    parser.add_argument('--max-accuracy-drop', type=float, default=0.0,
+                        help="허용 완전일치 정확도 감소폭 (기본 0)")
+    parser.add_argument('--preprocess', nargs='+', metavar='SPEC',
+                        help="전처리 비교만 실행 (예: sauvola otsu gray,invert,otsu,scale3)")
+    parser.add_argument('--no-ocr', action='store_true', help="전처리 비교 시 OCR 없이 시간만 측정")
+    args = parser.parse_args(argv)
+
+    if args.tesseract:
+        pytesseract.pytesseract.tesseract_cmd = args.tesseract
+    if args.engine:
+        ocr_engine.set_engine(args.engine)
+
+    images = collect_images(args.corpus)
+    if not images:
+        print(f"이미지가 없습니다: {args.corpus}")
+        return 1
+
+    print(f"코퍼스: {args.corpus} ({len(images)}개 이미지, {args.repeat}회 반복)")
+    if args.preprocess:
+        results = run_preprocess_benchmark(images, args.preprocess, args.lang, args.repeat,
+                                           run_ocr=not args.no_ocr)
+        print_preprocess_report(results)
+        return 0
+
+    samples = load_corpus(args.corpus, args.lang)
+    labeled = sum(1 for s in samples if s['text'] is not None)
+    print(f"라벨: {labeled}/{len(samples)}개, 엔진: {ocr_engine.get_engine().name}")
+
+    results = {
+        'created': datetime.now().isoformat(timespec='seconds'),
+        'corpus': os.path.abspath(args.corpus),
+        'engine': ocr_engine.get_engine().name,
+        'samples': len(samples),
+        'repeat': args.repeat,
+        'modes': {},
+    }
+    for mode in args.modes:
+        print(f"\n▶ 모드: {mode}")
+        results['modes'][mode] = benchmark_mode(mode, samples, args.repeat, args.fuzzy_threshold,
+                                                batch_size=args.batch_size)
+    print_summary(results)
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(results, f, ensure_ascii=False, indent=2)
+        print(f"결과 저장: {args.output}")
+
+    if args.baseline:
+        with open(args.baseline, 'r', encoding='utf-8') as f:
+            baseline = json.load(f)
+        regressions = compare_with_baseline(results, baseline, args.max_latency_regression,
+                                            args.max_accuracy_drop)
+        if regressions:
+            print("❌ 회귀 발견: " + ', '.join(regressions))
+            return 1
+        print("✅ 기준 대비 회귀 없음")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,113 @@
+"""
+OCR 결과 캐시 - 동일한 화면 영역에 대한 반복 OCR 방지
+
+WaitUntil / TestText 반복 모드는 1초마다 같은 영역을 다시 OCR합니다.
+게임 화면이 그대로인 경우가 많으므로, 영역 픽셀의 해시와 OCR 설정
+(언어, 기대 텍스트, 매칭 모드 등)을 키로 결과를 저장해 두고 같은 프레임이면
+Tesseract를 실행하지 않고 즉시 반환합니다.
+
+- 픽셀 내용이 정확히 같은 경우에만 적중 (유사 프레임은 다른 텍스트일 수 있으므로 제외)
+- 항목 수와 바이트 수 양쪽으로 제한되는 LRU
+- 적중/미스/제거 횟수 통계 제공
+"""
+
+import hashlib
+import threading
+from collections import OrderedDict
+
+# 항목 1개당 고정 오버헤드 추정치 (키, 튜플, 딕셔너리 슬롯 등)
+_ENTRY_OVERHEAD = 128
+
+
+def image_digest(image):
+    """이미지 픽셀 내용의 빠른 해시 (모드/크기 포함)"""
+    h = hashlib.blake2b(digest_size=16)
+    h.update(f"{image.mode}|{image.size[0]}x{image.size[1]}|".encode())
+    h.update(image.tobytes())
+    return h.hexdigest()
+
+
+class OCRResultCache:
+    """항목 수/바이트 수 제한 LRU OCR 결과 캐시"""
+
+    def __init__(self, max_entries=256, max_bytes=4 * 1024 * 1024):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.enabled = True
+        self._entries = OrderedDict()  # {key: (text, attempts, size)}
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @staticmethod
+    def make_key(image, *options):
+        """이미지 해시 + OCR 옵션(언어, PSM/전처리 모드, 기대 텍스트 등)으로 키 생성"""
+        return (image_digest(image),) + tuple(options)
+
+    @staticmethod
+    def _entry_size(text, attempts):
+        size = _ENTRY_OVERHEAD + len(text.encode('utf-8'))
+        for attempt_text, _conf, info in attempts:
+            size += _ENTRY_OVERHEAD + len(attempt_text.encode('utf-8')) + len(info.encode('utf-8'))
+        return size
+
+    def get(self, key):
+        """캐시 조회 - 적중 시 (text, attempts), 없으면 None"""
+        if not self.enabled:
+            return None
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0], list(entry[1])
+
+    def put(self, key, text, attempts=()):
+        """결과 저장 (제한 초과 시 가장 오래 사용하지 않은 항목부터 제거)"""
+        if not self.enabled or text is None:
+            return
+        attempts = tuple(attempts)
+        size = self._entry_size(text, attempts)
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._bytes -= old[2]
+            self._entries[key] = (text, attempts, size)
+            self._bytes += size
+            while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self._bytes -= evicted[2]
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self):
+        """캐시 통계 딕셔너리"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'entries': len(self._entries),
+                'bytes': self._bytes,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'hit_rate': self.hits / lookups if lookups else 0,
+            }
+
+
+# 전역 캐시 인스턴스
+_ocr_cache = OCRResultCache()
+
+
+def get_ocr_cache():
+    """전역 OCR 결과 캐시 반환"""
+    return _ocr_cache
@@ -0,0 +1,256 @@
+"""
+OCR 엔진 계층 - Tesseract 인스턴스 상주(warm) 풀
+
+pytesseract는 호출마다 임시 이미지 파일을 쓰고 tesseract.exe를 새로 띄워
+kor/eng traineddata를 다시 로드합니다. 이 모듈은 그 비용을 없애기 위해
+(언어, PSM) 조합별로 초기화된 Tesseract API 인스턴스를 재사용합니다.
+
+- TesserocrEngine: tesserocr(Tesseract C API 바인딩)로 인스턴스를 상주시키는 풀
+- SubprocessEngine: tesserocr가 없을 때 사용하는 기존 pytesseract(프로세스 실행) 방식
+
+풀은 전체 인스턴스 수가 제한되며 실행 스레드와 GUI의 'OCR 테스트' 버튼에서
+동시에 호출해도 안전합니다 (인스턴스 하나는 한 번에 한 스레드만 사용).
+"""
+
+# 로그 설정을 가장 먼저 import
+import logger_setup
+
+import os
+import atexit
+import threading
+import pytesseract
+from profiler import profile_span
+
+try:
+    import tesserocr
+except ImportError:
+    tesserocr = None
+
+# TSV 컬럼 중 정수로 변환할 항목 (pytesseract Output.DICT와 동일한 형태 유지)
+_TSV_INT_COLUMNS = ('level', 'page_num', 'block_num', 'par_num', 'line_num',
+                    'word_num', 'left', 'top', 'width', 'height')
+_TSV_COLUMNS = _TSV_INT_COLUMNS + ('conf', 'text')
+
+
+def parse_tsv(tsv_text):
+    """Tesseract TSV 출력을 pytesseract Output.DICT 형식의 딕셔너리로 변환"""
+    data = {col: [] for col in _TSV_COLUMNS}
+    for line in tsv_text.splitlines():
+        fields = line.split('\t')
+        if len(fields) < 11 or fields[0] == 'level':
+            continue  # 헤더 또는 잘린 줄
+        if len(fields) == 11:
+            fields.append('')  # 텍스트가 비어 있는 행
+        for col, value in zip(_TSV_INT_COLUMNS, fields[:10]):
+            data[col].append(int(value))
+        try:
+            data['conf'].append(float(fields[10]))
+        except ValueError:
+            data['conf'].append(-1)
+        data['text'].append(fields[11])
+    return data
+
+
+class SubprocessEngine:
+    """pytesseract 기반 엔진 (호출마다 tesseract 프로세스 실행)"""
+
+    name = 'subprocess'
+
+    def image_to_data(self, image, lang, psm):
+        config = f'--psm {psm} --oem 3'
+        return pytesseract.image_to_data(image, lang=lang, config=config,
+                                         output_type=pytesseract.Output.DICT)
+
+    def close(self):
+        pass
+
+
+class TesserocrEngine:
+    """tesserocr 기반 상주 인스턴스 풀
+
+    (lang, psm)별로 유휴 인스턴스를 보관하고, 전체 인스턴스 수가 max_instances를
+    넘으면 다른 조합의 유휴 인스턴스를 정리하거나 반납될 때까지 대기합니다.
+    """
+
+    name = 'tesserocr'
+
+    def __init__(self, max_instances=4, tessdata_path=None):
+        self.max_instances = max(1, int(max_instances))
+        self.tessdata_path = tessdata_path
+        self._idle = {}  # {(lang, psm): [api, ...]}
+        self._total = 0
+        self._cond = threading.Condition()
+        self._closed = False
+
+    def _create(self, key):
+        lang, psm = key
+        kwargs = {'lang': lang, 'psm': psm, 'oem': tesserocr.OEM.DEFAULT}
+        if self.tessdata_path:
+            kwargs['path'] = self.tessdata_path
+        print(f"🔥 Tesseract 인스턴스 생성: {lang}|PSM{psm}")
+        return tesserocr.PyTessBaseAPI(**kwargs)
+
+    def _pop_any_idle(self):
+        """다른 조합의 유휴 인스턴스 하나를 꺼냄 (교체용)"""
+        for idle in self._idle.values():
+            if idle:
+                return idle.pop()
+        return None
+
+    def _acquire(self, key):
+        victim = None
+        with self._cond:
+            while True:
+                if self._closed:
+                    raise RuntimeError("OCR 엔진이 종료되었습니다.")
+                idle = self._idle.get(key)
+                if idle:
+                    return idle.pop()
+                if self._total < self.max_instances:
+                    self._total += 1
+                    break
+                victim = self._pop_any_idle()
+                if victim is not None:
+                    break
+                self._cond.wait()
+
+        if victim is not None:
+            victim.End()
+        try:
+            return self._create(key)
+        except Exception:
+            with self._cond:
+                self._total -= 1
+                self._cond.notify()
+            raise
+
+    def _release(self, key, api):
+        with self._cond:
+            if self._closed:
+                api.End()
+                return
+            self._idle.setdefault(key, []).append(api)
+            self._cond.notify()
+
+    def _discard(self, api):
+        """오류가 난 인스턴스는 재사용하지 않고 폐기"""
+        try:
+            api.End()
+        except Exception:
+            pass
+        with self._cond:
+            self._total -= 1
+            self._cond.notify()
+
+    def reserve(self, count):
+        """동시에 사용할 수 있는 인스턴스 수를 최소 count개로 늘림 (다중 클라이언트 동시 OCR)"""
+        with self._cond:
+            if count > self.max_instances:
+                self.max_instances = count
+                self._cond.notify_all()
+
+    def warm_up(self, langs, psms=(7, 6)):
+        """자주 쓰는 조합을 미리 초기화"""
+        for lang in langs:
+            for psm in psms:
+                key = (lang, psm)
+                self._release(key, self._acquire(key))
+
+    def image_to_data(self, image, lang, psm):
+        key = (lang, psm)
+        api = self._acquire(key)
+        try:
+            api.SetImage(image)
+            tsv_text = api.GetTSVText(0)
+            api.Clear()
+        except Exception:
+            self._discard(api)
+            raise
+        self._release(key, api)
+        return parse_tsv(tsv_text)
+
+    def close(self):
+        with self._cond:
+            self._closed = True
+            apis = [api for idle in self._idle.values() for api in idle]
+            self._idle.clear()
+            self._total -= len(apis)
+            self._cond.notify_all()
+        for api in apis:
+            api.End()
+
+
+def _default_tessdata_path():
+    """tesseract.exe 옆의 tessdata 폴더 (없으면 TESSDATA_PREFIX 또는 tesserocr 기본값)"""
+    tess_cmd = pytesseract.pytesseract.tesseract_cmd
+    if tess_cmd and os.path.isabs(tess_cmd):
+        candidate = os.path.join(os.path.dirname(tess_cmd), 'tessdata')
+        if os.path.isdir(candidate):
+            return candidate
+    return os.environ.get('TESSDATA_PREFIX')
+
+
+_engine = None
+_engine_lock = threading.Lock()
+
+
+def create_engine(name='auto', max_instances=4):
+    """엔진 생성 ('auto': tesserocr 사용 가능하면 상주 풀, 아니면 프로세스 방식)"""
+    if name in ('auto', 'tesserocr') and tesserocr is not None:
+        try:
+            engine = TesserocrEngine(max_instances=max_instances, tessdata_path=_default_tessdata_path())
+            print(f"✅ OCR 엔진: tesserocr 상주 풀 (최대 {engine.max_instances}개 인스턴스)")
+            return engine
+        except Exception as e:
+            print(f"⚠️ tesserocr 엔진 초기화 실패, 프로세스 방식 사용: {e}")
+    elif name == 'tesserocr':
+        print("⚠️ tesserocr가 설치되어 있지 않아 프로세스 방식 사용")
+    return SubprocessEngine()
+
+
+def get_engine():
+    """전역 OCR 엔진 반환 (최초 호출 시 생성, 환경변수 PBBAUTO_OCR_ENGINE로 강제 가능)"""
+    global _engine
+    if _engine is None:
+        with _engine_lock:
+            if _engine is None:
+                _engine = create_engine(os.environ.get('PBBAUTO_OCR_ENGINE', 'auto'))
+    return _engine
+
+
+def set_engine(name, max_instances=4):
+    """전역 OCR 엔진 교체 (기존 엔진의 인스턴스는 정리)"""
+    global _engine
+    with _engine_lock:
+        if _engine is not None:
+            _engine.close()
+        _engine = create_engine(name, max_instances=max_instances)
+    return _engine
+
+
+def reset_engine():
+    """전역 OCR 엔진 정리 (다음 호출 시 현재 Tesseract 경로 기준으로 다시 생성)"""
+    global _engine
+    with _engine_lock:
+        if _engine is not None:
+            _engine.close()
+        _engine = None
+
+
+def reserve_instances(count):
+    """전역 엔진이 count개 OCR을 동시에 처리할 수 있도록 준비 (프로세스 방식은 호출마다 별도 프로세스)"""
+    engine = get_engine()
+    if hasattr(engine, 'reserve'):
+        engine.reserve(count)
+
+
+def image_to_data(image, lang, psm):
+    """전역 엔진으로 OCR 실행 (pytesseract Output.DICT 형식 반환)"""
+    with profile_span('tesseract', 'stage', lang=lang, psm=psm):
+        return get_engine().image_to_data(image, lang, psm)
+
+
+@atexit.register
+def _shutdown_engine():
+    if _engine is not None:
+        _engine.close()
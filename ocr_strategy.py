@@ -0,0 +1,185 @@
+"""
+OCR 전략 학습 - 영역별로 성공한 OCR 변형을 기억하여 다음 실행에서 먼저 시도
+
+같은 번들 단계의 TestText 영역은 거의 항상 같은 변형(예: 흰 글씨 HUD는 "반전|PSM6")에서
+인식됩니다. 매번 1단계부터 캐스케이드를 다시 도는 대신, 단계/영역/언어별로 마지막에
+이긴 변형(전처리 종류, 언어, PSM)을 JSON 파일에 저장해 두고 다음 호출에서 그 변형
+하나만 먼저 실행합니다.
+
+- 학습된 변형이 실패해도 같은 호출 안에서 전체 캐스케이드로 이어서 진행 (정확도 손실 없음)
+- 다른 변형이 연속으로 이기면(max_failures회) 학습된 변형을 교체 (일시적 화면 변화에 흔들리지 않음)
+- 기대 텍스트가 아직 화면에 없어 모든 변형이 실패한 경우는 실패로 세지 않음
+"""
+
+# 로그 설정을 가장 먼저 import
+import logger_setup
+
+import os
+import json
+import time
+import atexit
+import threading
+from constants import current_dir
+
+# 학습 테이블 저장 파일
+DEFAULT_STRATEGY_PATH = os.path.join(current_dir, 'ocr_strategy.json')
+
+
+def variant_name(label, lang_code, psm):
+    """변형 식별 문자열 (예: '반전|kor+eng|PSM6')"""
+    return f"{label}|{lang_code}|PSM{psm}"
+
+
+class OCRStrategyStore:
+    """영역 키별 우선 OCR 변형 테이블 (JSON 파일에 영속화)
+
+    Args:
+        path: 저장 파일 경로
+        max_failures: 다른 변형이 연속으로 이긴 횟수가 이 값에 도달하면 교체
+        save_interval: 변경 사항을 파일에 반영하는 최소 간격(초) - 폴링마다 디스크 쓰기 방지
+    """
+
+    def __init__(self, path=DEFAULT_STRATEGY_PATH, max_failures=3, save_interval=10.0):
+        self.path = path
+        self.max_failures = max_failures
+        self.save_interval = save_interval
+        self.enabled = True
+        self._entries = None  # {key: {'label', 'lang', 'psm', 'wins', 'fails', 'updated'}}
+        self._dirty = False
+        self._last_save = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def _load(self):
+        """최초 사용 시 파일에서 테이블 로드 (잠금 안에서 호출)"""
+        if self._entries is not None:
+            return
+        self._entries = {}
+        if not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                self._entries = json.load(f)
+            print(f"OCR 전략 테이블 로드: {len(self._entries)}개 영역")
+        except Exception as e:
+            print(f"OCR 전략 테이블 로드 실패 (새로 시작): {e}")
+            self._entries = {}
+
+    def preferred(self, key):
+        """학습된 우선 변형 (label, lang_code, psm) - 없으면 None"""
+        if not self.enabled or not key:
+            return None
+        with self._lock:
+            self._load()
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            return entry['label'], entry['lang'], entry['psm']
+
+    def record_hit(self, key):
+        """학습된 변형이 그대로 성공"""
+        if not self.enabled or not key:
+            return
+        with self._lock:
+            self._load()
+            entry = self._entries.get(key)
+            if entry is None:
+                return
+            self.hits += 1
+            entry['wins'] += 1
+            if entry['fails']:
+                entry['fails'] = 0
+                self._mark_dirty()
+
+    def record_winner(self, key, label, lang_code, psm):
+        """캐스케이드에서 이긴 변형 기록
+
+        학습된 변형이 없으면 바로 등록하고, 다른 변형이 이긴 경우는
+        연속 max_failures회가 되었을 때만 교체합니다.
+        """
+        if not self.enabled or not key:
+            return
+        with self._lock:
+            self._load()
+            entry = self._entries.get(key)
+            if entry is not None:
+                self.misses += 1
+                if (entry['label'], entry['lang'], entry['psm']) == (label, lang_code, psm):
+                    entry['wins'] += 1
+                    entry['fails'] = 0
+                    self._mark_dirty()
+                    return
+                entry['fails'] += 1
+                if entry['fails'] < self.max_failures:
+                    self._mark_dirty()
+                    return
+                print(f"🔁 OCR 전략 교체 ({key}): "
+                      f"{variant_name(entry['label'], entry['lang'], entry['psm'])} → {variant_name(label, lang_code, psm)}")
+            self._entries[key] = {
+                'label': label,
+                'lang': lang_code,
+                'psm': psm,
+                'wins': 1,
+                'fails': 0,
+                'updated': time.strftime('%Y-%m-%d %H:%M:%S'),
+            }
+            self._mark_dirty()
+
+    def forget(self, key=None):
+        """학습 내용 제거 (key가 없으면 전체)"""
+        with self._lock:
+            self._load()
+            if key is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(key, None)
+            self._mark_dirty()
+
+    def _mark_dirty(self):
+        """변경 표시 후 저장 간격이 지났으면 파일에 반영 (잠금 안에서 호출)"""
+        self._dirty = True
+        if time.time() - self._last_save >= self.save_interval:
+            self._save_locked()
+
+    def _save_locked(self):
+        try:
+            tmp_path = self.path + '.tmp'
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(self._entries, f, ensure_ascii=False, indent=2)
+            os.replace(tmp_path, self.path)
+            self._dirty = False
+        except Exception as e:
+            print(f"OCR 전략 테이블 저장 실패: {e}")
+        self._last_save = time.time()
+
+    def flush(self):
+        """저장되지 않은 변경 사항을 파일에 반영"""
+        with self._lock:
+            if self._dirty and self._entries is not None:
+                self._save_locked()
+
+    def stats(self):
+        """학습 테이블 통계 딕셔너리"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'entries': len(self._entries or {}),
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': self.hits / lookups if lookups else 0,
+            }
+
+
+# 전역 학습 테이블
+_strategy_store = OCRStrategyStore()
+
+
+def get_strategy_store():
+    """전역 OCR 전략 학습 테이블 반환"""
+    return _strategy_store
+
+
+@atexit.register
+def _flush_strategy_store():
+    _strategy_store.flush()
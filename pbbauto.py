@@ -0,0 +1,283 @@
+"""
+헤드리스 실행기 - PyQt5 없이 번들 파일을 실행하고 단계별 결과/시간을 JSONL로 출력
+
+사용법:
+    python -m pbbauto run bundles/x.json [--bundle 이름 ...] [--window 창 제목 | --region x,y,w,h]
+                          [--iterations N] [--output results.jsonl]
+                          [--capture auto|gdi|x11|pyautogui] [--replay 프레임 폴더] [--input real|null]
+                          [--profile 폴더]
+    python -m pbbauto list bundles/x.json
+
+작업 스케줄러/CI/원격 셸에서 GUI 없이 실행할 수 있고, Linux에서도 리플레이 캡처(--replay)와
+입력 기록(--input null)으로 명령어 엔진을 결정적으로 실행할 수 있습니다.
+번들 파일의 command_list(체크된 항목)를 GUI와 같은 규칙으로 펼쳐 실행하며, --bundle을 지정하면
+해당 번들만 순서대로 실행합니다. 설정은 config.json(OCR/캡처/보관 설정)을 그대로 사용합니다.
+
+JSONL 이벤트 (--output을 생략하면 표준 출력, 이때 일반 로그는 표준 에러로 출력):
+    {"event": "start", ...}        실행 정보
+    {"event": "plan_error", ...}   실행 전 발견한 명령어 오류
+    {"event": "step", ...}         단계별 상태(ok/error/skipped)/시간(ms)/새로 추가된 테스트 결과
+    {"event": "profile", ...}      --profile 지정 시 명령어/처리 구간별 합계/평균/p95와 trace 파일 경로
+    {"event": "end", ...}          합계 (Pass/Fail/Pending 수, 전체 시간)
+
+종료 코드: 0 전체 통과, 1 실패한 테스트/단계 오류 있음, 2 번들 파일 오류 (파일/명령어/파라미터 오류)
+          또는 화면 캡처 초기화 실패 (X 서버가 없으면 --replay 사용)
+"""
+
+# 로그 설정을 가장 먼저 import
+import logger_setup
+
+import os
+import sys
+import json
+import time
+import argparse
+import threading
+from datetime import datetime
+
+# 결과 딕셔너리에서 JSONL로 내보낼 항목 (메모리 이미지 등은 제외)
+RESULT_FIELDS = ('title', 'result', 'extracted_text', 'expected_text', 'screenshot_path')
+
+
+class JsonlWriter:
+    """이벤트를 한 줄씩 기록하고 즉시 flush (원격 셸/CI에서 실시간 확인)"""
+
+    def __init__(self, stream):
+        self.stream = stream
+        self._lock = threading.Lock()
+
+    def write(self, event, **fields):
+        record = {'event': event, 'time': round(time.time(), 3)}
+        record.update(fields)
+        line = json.dumps(record, ensure_ascii=False, default=str)
+        with self._lock:
+            self.stream.write(line + '\n')
+            self.stream.flush()
+
+
+def parse_region(text):
+    """'x,y,w,h' → (x, y, w, h)"""
+    values = [int(v) for v in text.replace(' ', '').split(',')]
+    if len(values) != 4:
+        raise argparse.ArgumentTypeError("영역은 x,y,w,h 형식이어야 합니다")
+    return tuple(values)
+
+
+def load_bundle_file(path):
+    with open(path, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+    if not isinstance(data, dict) or 'bundles' not in data:
+        raise ValueError("올바른 번들 파일이 아닙니다 ('bundles' 항목 없음)")
+    return data
+
+
+def load_settings():
+    """config.json 설정 (없으면 빈 설정 → 각 모듈 기본값)"""
+    from constants import current_dir
+    config_path = os.path.join(current_dir, 'config.json')
+    try:
+        with open(config_path, 'r', encoding='utf-8') as f:
+            config = json.load(f)
+        return config if isinstance(config, dict) else {}
+    except FileNotFoundError:
+        return {}
+    except Exception as e:
+        print(f"설정 로드 중 오류: {e}")
+        return {}
+
+
+def summarize_results(results):
+    return [{key: result.get(key) for key in RESULT_FIELDS if key in result} for result in results]
+
+
+def run(args, writer):
+    """번들 실행 → 종료 코드"""
+    # 엔진 모듈은 환경변수(헤드리스/입력/리플레이)를 정한 뒤에 불러옴
+    from utils import apply_engine_settings, set_pytesseract_cmd, auto_detect_tesseract
+    from commands import CommandProcessor
+    from execution_plan import compile_plan, expand_saved_commands
+    from window_geometry import get_window_geometry
+    from deferred_checks import get_deferred_checks, PENDING
+    from artifact_writer import get_artifact_writer
+    from capture_index import get_capture_index
+    from frame_buffer import get_frame_buffer
+    from ocr_strategy import get_strategy_store
+    from capture import set_capture_backend
+    from profiler import get_profiler
+
+    bundle_labels = []
+    try:
+        commands = expand_saved_commands(load_bundle_file(args.bundle_file), args.bundle, bundle_labels)
+    except Exception as e:
+        print(f"번들 파일 오류: {e}")
+        writer.write('error', message=str(e))
+        return 2
+
+    settings = load_settings()
+    if not (settings.get('tesseract_path') and set_pytesseract_cmd(settings['tesseract_path'])):
+        auto_detect_tesseract()
+    try:
+        apply_engine_settings(settings)
+        if args.capture and not args.replay:
+            set_capture_backend(args.capture)
+    except Exception as e:
+        print(f"캡처 설정 오류: {e}")
+        writer.write('error', message=str(e))
+        return 2
+    profiler = get_profiler()
+    if args.profile:
+        profiler.enabled = True
+
+    geometry = get_window_geometry()
+    if args.region:
+        geometry.set_fixed(args.region)
+    elif args.window:
+        geometry.set_target(args.window)
+
+    processor = CommandProcessor()
+    plan = compile_plan(commands)
+    start_time = datetime.now()
+    processor.state['test_session_start'] = start_time
+    processor.state['test_session_title'] = os.path.splitext(os.path.basename(args.bundle_file))[0]
+    processor.state['window_info'] = {'target_app': args.window or '',
+                                      'execution_file': os.path.basename(args.bundle_file),
+                                      'execution_file_path': os.path.abspath(args.bundle_file)}
+    get_capture_index().begin_session(start_time.strftime('%y%m%d_%H%M%S'))
+    profiler.begin_run(processor.state['test_session_title'], bundle_labels)
+
+    writer.write('start', bundle_file=args.bundle_file, bundles=args.bundle, commands=plan.total,
+                 steps=len(plan), iterations=args.iterations, window=args.window, region=args.region)
+    for step in plan.errors:
+        writer.write('plan_error', index=step.index + 1, command=step.text, error=step.error)
+
+    run_start = time.perf_counter()
+    step_errors = 0
+    try:
+        for iteration in range(1, args.iterations + 1):
+            processor.state['iteration_count'] = iteration
+            batch_until = 0
+            for position, step in enumerate(plan.steps):
+                if processor.stop_flag:
+                    break
+                if position >= batch_until and settings.get("ocr_batch", True):
+                    batch_run = plan.batch_run(position)
+                    if len(batch_run) >= 2:
+                        processor.prefetch_text_checks(batch_run)
+                    batch_until = position + max(len(batch_run), 1)
+                print(f"[{step.index + 1}/{plan.total}] {step.text}")
+                get_capture_index().step = step.index + 1
+                results = processor.state['test_results']
+                before = len(results)
+                status, error = 'ok', None
+                step_start = time.perf_counter()
+                if step.error:
+                    status, error = 'skipped', step.error
+                else:
+                    try:
+                        processor.run_step(step)
+                    except Exception as e:
+                        status, error = 'error', f"{type(e).__name__}: {e}"
+                        step_errors += 1
+                        print(f"❌ 단계 실행 오류: {error}")
+                record = {'iteration': iteration, 'index': step.index + 1, 'command': step.text,
+                          'action': step.action, 'status': status,
+                          'ms': round((time.perf_counter() - step_start) * 1000, 1)}
+                if error:
+                    record['error'] = error
+                if len(results) > before:
+                    record['results'] = summarize_results(results[before:])
+                writer.write('step', **record)
+    except KeyboardInterrupt:
+        processor.stop_flag = True
+        get_deferred_checks().cancel()
+        print("🛑 실행 중지 (Ctrl+C)")
+
+    # 남은 지연 검사/스크린샷 저장을 마친 뒤 합계 기록
+    get_deferred_checks().wait()
+    get_artifact_writer().flush()
+    get_strategy_store().flush()
+    get_frame_buffer().clear()
+    get_capture_index().end_session()
+
+    if profiler.enabled and args.profile:
+        os.makedirs(args.profile, exist_ok=True)
+        trace_path, summary_path = profiler.export(args.profile)
+        print(profiler.format_summary())
+        writer.write('profile', trace=trace_path, summary=summary_path, **profiler.summary())
+
+    results = processor.state['test_results']
+    counts = {label: sum(1 for r in results if r.get('result') == label) for label in ('Pass', 'Fail', PENDING)}
+    writer.write('end', passed=counts['Pass'], failed=counts['Fail'], pending=counts[PENDING],
+                 step_errors=step_errors, plan_errors=len(plan.errors), stopped=processor.stop_flag,
+                 results=summarize_results(results),
+                 ms=round((time.perf_counter() - run_start) * 1000, 1))
+    if plan.errors:
+        return 2
+    return 1 if counts['Fail'] or step_errors else 0
+
+
+def list_bundles(args, writer):
+    """번들 파일의 번들 이름/명령어 수 출력"""
+    try:
+        data = load_bundle_file(args.bundle_file)
+    except Exception as e:
+        writer.write('error', message=str(e))
+        return 2
+    checked = {item.get('name') for item in data.get('command_list', [])
+               if item.get('type') == 'bundle' and item.get('checked', True)}
+    for name, structs in data['bundles'].items():
+        writer.write('bundle', name=name, commands=len(structs), checked=name in checked)
+    return 0
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog='pbbauto', description="PbbAuto 헤드리스 실행기 (PyQt5 없이 번들 실행)")
+    subparsers = parser.add_subparsers(dest='action', required=True)
+
+    run_parser = subparsers.add_parser('run', help="번들 파일 실행")
+    run_parser.add_argument('bundle_file', help="번들 JSON 파일")
+    run_parser.add_argument('--bundle', action='append', help="실행할 번들 이름 (여러 번 지정 가능, 기본: 체크된 항목)")
+    target = run_parser.add_mutually_exclusive_group()
+    target.add_argument('--window', help="대상 윈도우 제목")
+    target.add_argument('--region', type=parse_region, help="윈도우 대신 고정 영역 x,y,w,h (리플레이 실행 등)")
+    run_parser.add_argument('--iterations', type=int, default=1, help="반복 실행 횟수")
+    run_parser.add_argument('--output', help="JSONL 결과 파일 (기본: 표준 출력)")
+    run_parser.add_argument('--capture', choices=['auto', 'gdi', 'x11', 'pyautogui'], help="화면 캡처 백엔드 (기본: 설정값)")
+    run_parser.add_argument('--replay', help="화면 대신 사용할 프레임 폴더/이미지/동영상 (리플레이 캡처)")
+    run_parser.add_argument('--input', choices=['real', 'null'], help="입력 백엔드 (null: 실제 입력 없이 기록만)")
+    run_parser.add_argument('--profile', help="단계별 시간 프로파일(Chrome trace JSON + 요약 표)을 저장할 폴더")
+
+    list_parser = subparsers.add_parser('list', help="번들 목록 출력")
+    list_parser.add_argument('bundle_file', help="번들 JSON 파일")
+    list_parser.add_argument('--output', help="JSONL 결과 파일 (기본: 표준 출력)")
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+
+    # 엔진 모듈을 불러오기 전에 헤드리스/입력/캡처 모드 지정 (command_registry가 PyQt5를 불러오지 않음)
+    os.environ['PBBAUTO_HEADLESS'] = '1'
+    if getattr(args, 'input', None):
+        os.environ['PBBAUTO_INPUT'] = args.input
+    if getattr(args, 'replay', None):
+        os.environ['PBBAUTO_REPLAY'] = args.replay
+
+    if args.output:
+        stream = open(args.output, 'a', encoding='utf-8')
+    else:
+        # 표준 출력은 JSONL 전용, 일반 로그(print)는 표준 에러로
+        stream = sys.stdout
+        sys.stdout = sys.stderr
+    try:
+        writer = JsonlWriter(stream)
+        if args.action == 'list':
+            return list_bundles(args, writer)
+        return run(args, writer)
+    finally:
+        if args.output:
+            stream.close()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
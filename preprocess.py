@@ -0,0 +1,227 @@
+"""
+OCR 전처리 파이프라인 - NumPy 배열 단계 조합
+
+tes.preprocess_image의 고정 모드(임계값 160/140/180) 대신, 명령어별로
+단계를 조합해 사용할 수 있는 전처리 파이프라인입니다.
+
+    gray,invert,sauvola,crop,scale2
+
+단계 (쉼표로 구분, 숫자는 선택 인자):
+    gray          그레이스케일 (항상 첫 단계로 적용, 생략 가능)
+    scaleN        정수배 확대 (기본 2배, 최근접 보간)
+    otsu          Otsu 전역 이진화 (히스토그램 기반 자동 임계값)
+    sauvolaN      Sauvola 적응형 이진화 (창 크기 N, 기본 25) - 배경 밝기가 고르지 않은 HUD용
+    thresholdN    고정 임계값 이진화 (기본 160, 기존 standard 모드와 동일)
+    invert        어두운 배경 자동 감지 후 반전 (Tesseract와 Sauvola 모두 밝은 배경의 어두운 글자 기준,
+                  이진화 앞에 두는 것을 권장)
+    cropN         글자가 없는 테두리 제거 (여백 N픽셀 유지, 기본 8)
+
+중간 배열은 스레드별 버퍼를 재사용하므로 폴링 중 반복 호출해도 매번 전체 크기
+사본을 새로 만들지 않습니다. 프리셋 이름(standard/otsu/sauvola)도 사용할 수 있습니다.
+"""
+
+import re
+import threading
+import numpy as np
+from PIL import Image
+
+# 자주 쓰는 조합 (명령어의 pp= 옵션에 이름으로 지정 가능)
+PRESETS = {
+    'standard': 'gray,scale2,threshold160',
+    'otsu': 'gray,invert,otsu,crop,scale2',
+    'sauvola': 'gray,invert,sauvola,crop,scale2',
+}
+
+_TOKEN_PATTERN = re.compile(r'^([a-z]+)(\d*)$')
+
+
+class _BufferPool:
+    """단계별 작업 버퍼 (크기가 같으면 재사용)"""
+
+    def __init__(self):
+        self._buffers = {}
+
+    def get(self, slot, shape, dtype=np.uint8):
+        key = (slot, np.dtype(dtype))
+        buf = self._buffers.get(key)
+        if buf is None or buf.shape != shape:
+            buf = np.empty(shape, dtype)
+            self._buffers[key] = buf
+        return buf
+
+
+def otsu_level(arr):
+    """Otsu 임계값 (클래스 간 분산이 최대인 밝기)"""
+    hist = np.bincount(arr.ravel(), minlength=256).astype(np.float64)
+    total = arr.size
+    omega = np.cumsum(hist)
+    mu = np.cumsum(hist * np.arange(256))
+    denom = omega * (total - omega)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        sigma_b = (mu[-1] * omega - mu * total) ** 2 / denom
+    sigma_b[~np.isfinite(sigma_b)] = 0
+    return int(np.argmax(sigma_b))
+
+
+def _binarize(arr, level, out):
+    """level보다 밝으면 255, 아니면 0 (level은 스칼라 또는 픽셀별 배열)"""
+    np.greater(arr, level, out=out.view(np.bool_))
+    np.multiply(out, 255, out=out)
+    return out
+
+
+def _stage_scale(arr, pool, slot, factor):
+    factor = factor or 2
+    if factor <= 1:
+        return arr
+    h, w = arr.shape
+    out = pool.get(slot, (h * factor, w * factor))
+    # (h, f, w, f) 뷰에 브로드캐스트하여 복사 1회로 정수배 확대
+    out.reshape(h, factor, w, factor)[...] = arr[:, None, :, None]
+    return out
+
+
+def _stage_otsu(arr, pool, slot, _arg):
+    return _binarize(arr, otsu_level(arr), pool.get(slot, arr.shape))
+
+
+def _stage_threshold(arr, pool, slot, level):
+    return _binarize(arr, 160 if level is None else level, pool.get(slot, arr.shape))
+
+
+def _stage_sauvola(arr, pool, slot, window, k=0.2, r=128.0):
+    window = window or 25
+    h, w = arr.shape
+    half = window // 2
+
+    # 적분 영상(합, 제곱합)으로 창 평균/표준편차를 픽셀 수와 무관한 비용으로 계산
+    ii = pool.get((slot, 'sum'), (h + 1, w + 1), np.float64)
+    ii2 = pool.get((slot, 'sq'), (h + 1, w + 1), np.float64)
+    ii[0, :] = 0
+    ii[:, 0] = 0
+    ii2[0, :] = 0
+    ii2[:, 0] = 0
+    values = pool.get((slot, 'val'), (h, w), np.float64)
+    np.copyto(values, arr)
+    np.cumsum(np.cumsum(values, axis=0), axis=1, out=ii[1:, 1:])
+    np.multiply(values, values, out=values)
+    np.cumsum(np.cumsum(values, axis=0), axis=1, out=ii2[1:, 1:])
+
+    y0 = np.clip(np.arange(h) - half, 0, h)
+    y1 = np.clip(np.arange(h) + half + 1, 0, h)
+    x0 = np.clip(np.arange(w) - half, 0, w)
+    x1 = np.clip(np.arange(w) + half + 1, 0, w)
+    count = np.outer(y1 - y0, x1 - x0).astype(np.float64)
+
+    def window_sum(table):
+        return (table[np.ix_(y1, x1)] - table[np.ix_(y0, x1)]
+                - table[np.ix_(y1, x0)] + table[np.ix_(y0, x0)])
+
+    mean = window_sum(ii) / count
+    var = window_sum(ii2) / count - mean * mean
+    np.maximum(var, 0, out=var)
+    threshold = mean * (1 + k * (np.sqrt(var) / r - 1))
+    return _binarize(arr, threshold, pool.get(slot, arr.shape))
+
+
+def _stage_invert(arr, pool, slot, _arg):
+    # 평균이 어두우면 배경이 어두운 것으로 보고 반전 (밝은 글자 → 어두운 글자)
+    if arr.mean() >= 128:
+        return arr
+    out = pool.get(slot, arr.shape)
+    np.subtract(255, arr, out=out)
+    return out
+
+
+def _stage_crop(arr, pool, slot, margin):
+    margin = 8 if margin is None else margin
+    ink = arr < 128
+    rows = np.flatnonzero(ink.any(axis=1))
+    cols = np.flatnonzero(ink.any(axis=0))
+    if rows.size == 0 or cols.size == 0:
+        return arr
+    h, w = arr.shape
+    top = max(0, rows[0] - margin)
+    bottom = min(h, rows[-1] + margin + 1)
+    left = max(0, cols[0] - margin)
+    right = min(w, cols[-1] + margin + 1)
+    return arr[top:bottom, left:right]  # 뷰 (복사 없음)
+
+
+_STAGES = {
+    'scale': _stage_scale,
+    'otsu': _stage_otsu,
+    'sauvola': _stage_sauvola,
+    'threshold': _stage_threshold,
+    'invert': _stage_invert,
+    'crop': _stage_crop,
+}
+
+
+class PreprocessPipeline:
+    """전처리 단계 목록을 순서대로 적용
+
+    Args:
+        stages: [(이름, 인자), ...] - 인자가 없으면 None
+        spec: 원본 명세 문자열 (로그/캐시 키용)
+    """
+
+    def __init__(self, stages, spec=''):
+        self.stages = list(stages)
+        self.spec = spec
+        self._local = threading.local()
+
+    def _pool(self):
+        pool = getattr(self._local, 'pool', None)
+        if pool is None:
+            pool = self._local.pool = _BufferPool()
+        return pool
+
+    def run_array(self, image):
+        """PIL 이미지 → 전처리된 uint8 배열 (스레드 버퍼를 가리킬 수 있으므로 바로 사용할 것)"""
+        arr = np.asarray(image.convert('L'))
+        pool = self._pool()
+        for slot, (name, arg) in enumerate(self.stages):
+            arr = _STAGES[name](arr, pool, slot, arg)
+        return arr
+
+    def run(self, image):
+        """PIL 이미지 → 전처리된 PIL 이미지 (버퍼와 분리된 사본)"""
+        arr = self.run_array(image)
+        return Image.frombytes('L', (arr.shape[1], arr.shape[0]), np.ascontiguousarray(arr).tobytes())
+
+    def __repr__(self):
+        return f"PreprocessPipeline({self.spec!r})"
+
+
+def parse_pipeline(spec):
+    """명세 문자열(또는 프리셋 이름)로 파이프라인 생성 (잘못된 단계는 ValueError)"""
+    text = PRESETS.get(spec.strip(), spec)
+    stages = []
+    for token in text.split(','):
+        token = token.strip().lower()
+        if not token:
+            continue
+        match = _TOKEN_PATTERN.match(token)
+        if not match:
+            raise ValueError(f"잘못된 전처리 단계: '{token}'")
+        name, number = match.groups()
+        if name == 'gray':
+            continue  # 입력 변환 시 항상 그레이스케일 적용
+        if name not in _STAGES:
+            raise ValueError(f"알 수 없는 전처리 단계: '{name}' (사용 가능: gray, {', '.join(_STAGES)})")
+        stages.append((name, int(number) if number else None))
+    return PreprocessPipeline(stages, spec=spec.strip())
+
+
+_pipelines = {}
+_pipelines_lock = threading.Lock()
+
+
+def get_pipeline(spec):
+    """명세별 파이프라인 반환 (파싱 결과와 작업 버퍼 재사용)"""
+    with _pipelines_lock:
+        pipeline = _pipelines.get(spec)
+        if pipeline is None:
+            pipeline = _pipelines[spec] = parse_pipeline(spec)
+        return pipeline
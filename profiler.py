@@ -0,0 +1,242 @@
+"""
+실행 프로파일러 - 단계/OCR 구간 시간을 중첩 구간(span)으로 기록하고 Chrome trace로 내보내기
+
+로그의 `[eng|PSM7] 0.83s` 같은 출력만으로는 긴 회귀 테스트에서 어떤 단계가 시간을 차지하는지 알기 어렵습니다.
+
+- span(name, cat): 단조 시계(perf_counter_ns) 기준 시작/길이를 스레드별 중첩 구간으로 기록
+  단계(cat 'step') → 캡처(capture) → 전처리(preprocess) → Tesseract(tesseract) → 비교(match) (cat 'stage')
+- export_chrome_trace(path): chrome://tracing / Perfetto에서 열 수 있는 JSON
+- summary()/format_summary(): 번들 × 명령어 종류별 횟수/합계/평균/p95, 처리 구간별 합계
+- 꺼져 있으면 span()은 아무것도 기록하지 않는 공용 객체를 반환 (실행 경로 부담 없음)
+
+설정 "profile_enabled" 또는 환경변수 PBBAUTO_PROFILE=1로 켭니다.
+"""
+
+# 로그 설정을 가장 먼저 import
+import logger_setup
+
+import os
+import json
+import time
+import threading
+from collections import namedtuple, defaultdict
+from datetime import datetime
+
+# 긴 실행에서 메모리가 계속 늘지 않도록 기록할 최대 구간 수 (넘으면 이후 구간은 개수만 셈)
+DEFAULT_MAX_SPANS = 500000
+
+SpanRecord = namedtuple('SpanRecord', ['name', 'cat', 'start_ns', 'dur_ns', 'tid', 'depth', 'args'])
+
+
+def percentile(values, pct):
+    """최근접 순위 백분위수 (요약 표와 벤치마크 도구 공용)"""
+    if not values:
+        return 0
+    ordered = sorted(values)
+    rank = max(1, -(-len(ordered) * pct // 100))  # ceil
+    return ordered[int(rank) - 1]
+
+
+class _NullSpan:
+    """프로파일러가 꺼져 있을 때 사용하는 빈 구간"""
+
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+
+_NULL_SPAN = _NullSpan()
+
+
+class _Span:
+    """기록 중인 구간 (with 블록)"""
+
+    __slots__ = ('profiler', 'name', 'cat', 'args', 'start_ns', 'depth')
+
+    def __init__(self, profiler, name, cat, args):
+        self.profiler = profiler
+        self.name = name
+        self.cat = cat
+        self.args = args
+
+    def __enter__(self):
+        stack = self.profiler._stack()
+        self.depth = len(stack)
+        stack.append(self)
+        self.start_ns = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        end_ns = time.perf_counter_ns()
+        stack = self.profiler._stack()
+        if stack and stack[-1] is self:
+            stack.pop()
+        if exc_type is not None:
+            self.args['error'] = exc_type.__name__
+        self.profiler._record(SpanRecord(self.name, self.cat, self.start_ns, end_ns - self.start_ns,
+                                         threading.get_ident(), self.depth, self.args))
+        return False
+
+
+class Profiler:
+    """중첩 구간 기록기
+
+    Args:
+        max_spans: 기록할 최대 구간 수
+    """
+
+    def __init__(self, max_spans=DEFAULT_MAX_SPANS):
+        self.enabled = os.environ.get('PBBAUTO_PROFILE', '') not in ('', '0')
+        self.max_spans = max_spans
+        self.title = None
+        self.labels = []  # 단계 index → 번들 이름 (실행 계획의 명령어 순서)
+        self.spans = []
+        self.dropped = 0
+        self._origin_ns = time.perf_counter_ns()
+        self._threads = {}  # tid → 스레드 이름
+        self._local = threading.local()
+        self._lock = threading.Lock()
+
+    def _stack(self):
+        stack = getattr(self._local, 'stack', None)
+        if stack is None:
+            stack = self._local.stack = []
+        return stack
+
+    def _record(self, record):
+        with self._lock:
+            if len(self.spans) >= self.max_spans:
+                self.dropped += 1
+                return
+            self.spans.append(record)
+            if record.tid not in self._threads:
+                self._threads[record.tid] = threading.current_thread().name
+
+    def span(self, name, cat='', **args):
+        """구간 기록 (with 블록, 꺼져 있으면 기록 안 함)"""
+        if not self.enabled:
+            return _NULL_SPAN
+        return _Span(self, name, cat, args)
+
+    def begin_run(self, title=None, labels=None):
+        """실행 시작 - 이전 기록 삭제
+
+        Args:
+            title: 실행 제목 (trace 프로세스 이름)
+            labels: 단계 index별 번들 이름 목록 (요약 표의 번들 구분)
+        """
+        with self._lock:
+            self.title = title
+            self.labels = list(labels or [])
+            self.spans = []
+            self.dropped = 0
+            self._threads = {}
+            self._origin_ns = time.perf_counter_ns()
+
+    def _bundle_of(self, record):
+        index = record.args.get('index')
+        if isinstance(index, int) and 0 <= index < len(self.labels):
+            return self.labels[index] or '-'
+        return '-'
+
+    def chrome_trace(self):
+        """Chrome trace 이벤트 형식 딕셔너리 (완료 이벤트 'X', 시간 단위 μs)"""
+        with self._lock:
+            spans = list(self.spans)
+            threads = dict(self._threads)
+        pid = os.getpid()
+        events = [{'name': 'process_name', 'ph': 'M', 'pid': pid, 'tid': 0,
+                   'args': {'name': self.title or 'PbbAuto'}}]
+        for tid, name in threads.items():
+            events.append({'name': 'thread_name', 'ph': 'M', 'pid': pid, 'tid': tid, 'args': {'name': name}})
+        for record in spans:
+            args = dict(record.args)
+            if record.cat == 'step':
+                args['bundle'] = self._bundle_of(record)
+            events.append({'name': record.name, 'cat': record.cat or 'run', 'ph': 'X', 'pid': pid,
+                           'tid': record.tid, 'ts': (record.start_ns - self._origin_ns) / 1000,
+                           'dur': record.dur_ns / 1000, 'args': args})
+        return {'traceEvents': events, 'displayTimeUnit': 'ms',
+                'otherData': {'title': self.title, 'dropped_spans': self.dropped}}
+
+    def export_chrome_trace(self, path):
+        """Chrome trace JSON 저장 → 경로"""
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(self.chrome_trace(), f, ensure_ascii=False, default=str)
+        return path
+
+    def summary(self):
+        """구간 통계
+
+        Returns:
+            {'steps': [{'bundle', 'command', 'count', 'total_ms', 'mean_ms', 'p95_ms'}, ...] (합계 내림차순),
+             'stages': [{'stage', 'count', 'total_ms', 'mean_ms', 'p95_ms'}, ...]}
+        """
+        with self._lock:
+            spans = list(self.spans)
+        steps = defaultdict(list)
+        stages = defaultdict(list)
+        for record in spans:
+            ms = record.dur_ns / 1e6
+            if record.cat == 'step':
+                steps[(self._bundle_of(record), record.name)].append(ms)
+            elif record.cat == 'stage':
+                stages[record.name].append(ms)
+
+        def stats(values):
+            total = sum(values)
+            return {'count': len(values), 'total_ms': round(total, 1),
+                    'mean_ms': round(total / len(values), 1), 'p95_ms': round(percentile(values, 95), 1)}
+
+        step_rows = [dict(bundle=bundle, command=command, **stats(values))
+                     for (bundle, command), values in steps.items()]
+        step_rows.sort(key=lambda row: row['total_ms'], reverse=True)
+        stage_rows = [dict(stage=stage, **stats(values)) for stage, values in stages.items()]
+        stage_rows.sort(key=lambda row: row['total_ms'], reverse=True)
+        return {'steps': step_rows, 'stages': stage_rows}
+
+    def format_summary(self, limit=None):
+        """요약 표 문자열 (번들 × 명령어 종류, 처리 구간)"""
+        summary = self.summary()
+        lines = [f"{'번들':<24} {'명령어':<16} {'횟수':>6} {'합계(s)':>10} {'평균(ms)':>10} {'p95(ms)':>10}"]
+        for row in summary['steps'][:limit]:
+            lines.append(f"{row['bundle'][:24]:<24} {row['command'][:16]:<16} {row['count']:>6} "
+                         f"{row['total_ms'] / 1000:>10.2f} {row['mean_ms']:>10.1f} {row['p95_ms']:>10.1f}")
+        if summary['stages']:
+            lines.append('')
+            lines.append(f"{'처리 구간':<41} {'횟수':>6} {'합계(s)':>10} {'평균(ms)':>10} {'p95(ms)':>10}")
+            for row in summary['stages']:
+                lines.append(f"{row['stage']:<41} {row['count']:>6} "
+                             f"{row['total_ms'] / 1000:>10.2f} {row['mean_ms']:>10.1f} {row['p95_ms']:>10.1f}")
+        if self.dropped:
+            lines.append(f"(최대 구간 수 초과로 {self.dropped}개 구간은 기록하지 않음)")
+        return '\n'.join(lines)
+
+    def export(self, directory, prefix='profile'):
+        """trace JSON + 요약 표 텍스트 저장 → (trace 경로, 요약 경로)"""
+        base = os.path.join(directory, f"{prefix}_{datetime.now().strftime('%Y%m%d_%H%M%S')}")
+        trace_path = self.export_chrome_trace(base + '.json')
+        summary_path = base + '.txt'
+        with open(summary_path, 'w', encoding='utf-8') as f:
+            if self.title:
+                f.write(f"{self.title}\n\n")
+            f.write(self.format_summary() + '\n')
+        return trace_path, summary_path
+
+
+# 전역 프로파일러
+_profiler = Profiler()
+
+
+def get_profiler():
+    """전역 프로파일러 반환"""
+    return _profiler
+
+
+def profile_span(name, cat='', **args):
+    """전역 프로파일러 구간 (with profile_span('tesseract', 'stage', lang=...):)"""
+    return _profiler.span(name, cat, **args)
@@ -0,0 +1,234 @@
+"""
+화면 텍스트 인덱스 - 창 전체를 한 번 OCR하여 여러 텍스트 질의에 응답
+
+FindText/ClickText는 좌표 없이 "화면 어딘가의 텍스트"를 찾습니다. 창 전체를
+image_to_data 한 번으로 인식하여 단어/줄 단위 텍스트와 위치(화면 좌표)를 인덱스로
+보관하고, 이후 질의는 다시 캡처+OCR하지 않고 인덱스에서 찾습니다.
+
+- 인덱스는 창 화면이 바뀌지 않은 동안만 유효 (축소 그레이스케일 픽셀 비교)
+- TestText/WaitUntil도 유효한 인덱스가 있으면 영역 안의 텍스트를 먼저 확인하고,
+  통과 조건을 만족할 때만 사용 (실패 시 기존 영역별 OCR로 재확인)
+- 좌표 대신 텍스트로 위치를 찾으므로 UI 배치가 바뀌어도 명령어를 고칠 필요가 없음
+"""
+
+# 로그 설정을 가장 먼저 import
+import logger_setup
+
+import time
+import threading
+from collections import namedtuple
+
+import ocr_engine
+from preprocess import get_pipeline
+from frame_change import get_change_detector
+from tes import is_expected_match
+
+# 창 전체 전처리 (창 평균 밝기로 반전을 판단하면 일부 영역이 뒤집히므로 반전 없이 확대만)
+_INDEX_PREPROCESS = 'gray,scale2'
+_INDEX_SCALE = 2
+# PSM 11: 희소 텍스트 (UI 곳곳에 흩어진 라벨/버튼)
+_INDEX_PSM = 11
+# 이보다 낮은 신뢰도의 단어는 인덱스에서 제외 (배경 무늬 오인식 방지)
+_MIN_WORD_CONFIDENCE = 30
+# 창 전체 유효성 비교 해상도 (작은 글자 변화도 감지)
+_VALIDITY_SIDE = 640
+
+
+class TextBox(namedtuple('TextBox', ['text', 'x', 'y', 'width', 'height', 'confidence'])):
+    """인식된 단어/구절과 화면 좌표 영역"""
+    __slots__ = ()
+
+    @property
+    def center(self):
+        return self.x + self.width // 2, self.y + self.height // 2
+
+    def inside(self, x, y, width, height):
+        """중심점이 (x, y, width, height) 영역 안에 있는지"""
+        cx, cy = self.center
+        return x <= cx < x + width and y <= cy < y + height
+
+
+def _union(words):
+    """단어 목록 → 하나의 구절 TextBox"""
+    left = min(w.x for w in words)
+    top = min(w.y for w in words)
+    right = max(w.x + w.width for w in words)
+    bottom = max(w.y + w.height for w in words)
+    confidence = sum(w.confidence for w in words) / len(words)
+    return TextBox(' '.join(w.text for w in words), left, top, right - left, bottom - top, confidence)
+
+
+def _lang_covers(index_lang, lang_code):
+    """인덱스 언어 조합이 질의 언어를 포함하는지 (예: 'kor+eng' ⊇ 'eng')"""
+    return set(lang_code.split('+')) <= set(index_lang.split('+'))
+
+
+class ScreenTextIndex:
+    """한 프레임의 단어/줄 인덱스
+
+    Args:
+        frame: 인덱스를 만든 화면 이미지 (PIL)
+        origin: frame 좌상단의 화면 좌표 (x, y)
+        lang_code: Tesseract 언어 조합
+        data: image_to_data 결과 (전처리 배율 적용 좌표)
+        scale: 전처리 배율 (좌표를 원본 크기로 되돌릴 때 사용)
+    """
+
+    def __init__(self, frame, origin, lang_code, data, scale=1):
+        self.frame = frame
+        self.origin = origin
+        self.lang_code = lang_code
+        self.created = time.time()
+        self.lines = []
+
+        line_map = {}
+        for i, text in enumerate(data.get('text', [])):
+            text = (text or '').strip()
+            try:
+                conf = float(data['conf'][i])
+            except (TypeError, ValueError):
+                continue
+            if not text or conf < _MIN_WORD_CONFIDENCE:
+                continue
+            word = TextBox(
+                text,
+                origin[0] + data['left'][i] // scale,
+                origin[1] + data['top'][i] // scale,
+                max(1, data['width'][i] // scale),
+                max(1, data['height'][i] // scale),
+                conf,
+            )
+            key = (data['block_num'][i], data['par_num'][i], data['line_num'][i])
+            if key not in line_map:
+                line_map[key] = []
+                self.lines.append(line_map[key])
+            line_map[key].append(word)
+        # 읽는 순서 (위→아래, 왼쪽→오른쪽)
+        for words in self.lines:
+            words.sort(key=lambda w: w.x)
+        self.lines.sort(key=lambda words: (words[0].y, words[0].x))
+
+    @property
+    def words(self):
+        return [word for words in self.lines for word in words]
+
+    @property
+    def region(self):
+        return self.origin[0], self.origin[1], self.frame.width, self.frame.height
+
+    def covers(self, x, y, width, height):
+        """화면 영역이 인덱스 프레임 안에 완전히 들어가는지"""
+        ox, oy, ow, oh = self.region
+        return ox <= x and oy <= y and x + width <= ox + ow and y + height <= oy + oh
+
+    def crop(self, x, y, width, height):
+        """인덱스 프레임에서 화면 좌표 영역 잘라내기"""
+        ox, oy = self.origin
+        return self.frame.crop((x - ox, y - oy, x - ox + width, y - oy + height))
+
+    def text_in_region(self, x, y, width, height):
+        """영역 안(단어 중심 기준) 텍스트 - 줄은 '\\n'으로 구분"""
+        lines = []
+        for words in self.lines:
+            inside = [w.text for w in words if w.inside(x, y, width, height)]
+            if inside:
+                lines.append(' '.join(inside))
+        return '\n'.join(lines)
+
+    def find(self, expected_text, exact_match=False, fuzzy=None, region=None):
+        """기대 텍스트와 일치하는 구절 목록 (읽는 순서)
+
+        한 줄 안에서 일치하는 가장 짧은 연속 단어 구간을 구절로 반환하므로
+        "확인 취소" 줄에서 "확인"을 찾으면 "확인" 단어 영역만 돌려줍니다.
+
+        Args:
+            region: (x, y, width, height) - 지정하면 이 영역 안의 단어만 검색
+        """
+        results = []
+        for words in self.lines:
+            if region is not None:
+                words = [w for w in words if w.inside(*region)]
+            if not words:
+                continue
+            line_text = ' '.join(w.text for w in words)
+            if not is_expected_match(line_text, expected_text, False, fuzzy):
+                continue
+            used = [False] * len(words)
+            for length in range(1, len(words) + 1):
+                for start in range(len(words) - length + 1):
+                    if any(used[start:start + length]):
+                        continue
+                    span = words[start:start + length]
+                    if is_expected_match(' '.join(w.text for w in span), expected_text, exact_match, fuzzy):
+                        results.append(_union(span))
+                        used[start:start + length] = [True] * length
+        results.sort(key=lambda box: (box.y, box.x))
+        return results
+
+
+class ScreenTextIndexCache:
+    """마지막으로 만든 화면 텍스트 인덱스 보관 및 유효성 판단"""
+
+    def __init__(self):
+        self._index = None
+        self._lock = threading.Lock()
+        self.builds = 0
+        self.hits = 0
+
+    def get(self, region, lang_code, frame):
+        """창 영역의 인덱스 반환 - 화면이 그대로면 재사용, 바뀌었으면 새로 OCR
+
+        Args:
+            region: 창 화면 좌표 (x, y, width, height)
+            frame: 방금 캡처한 창 이미지
+        """
+        with self._lock:
+            index = self._index
+        if (index is not None and index.region == tuple(region) and _lang_covers(index.lang_code, lang_code)
+                and not get_change_detector().differs(index.frame, frame, _VALIDITY_SIDE)):
+            self.hits += 1
+            print(f"⚡ 화면 텍스트 인덱스 재사용 ({len(index.words)}단어, {time.time() - index.created:.1f}초 전)")
+            return index
+
+        start_time = time.time()
+        processed = get_pipeline(_INDEX_PREPROCESS).run(frame)
+        data = ocr_engine.image_to_data(processed, lang_code, _INDEX_PSM)
+        index = ScreenTextIndex(frame, (region[0], region[1]), lang_code, data, _INDEX_SCALE)
+        with self._lock:
+            self._index = index
+        self.builds += 1
+        print(f"🗂 화면 텍스트 인덱스 생성: {len(index.lines)}줄 {len(index.words)}단어 "
+              f"({time.time() - start_time:.2f}s)")
+        return index
+
+    def lookup_region(self, x, y, width, height, crop, lang_code):
+        """이미 있는 인덱스에서 영역 텍스트 조회 (새로 OCR하지 않음)
+
+        Args:
+            crop: 방금 캡처한 영역 이미지 - 인덱스 이후 이 영역이 바뀌었으면 None 반환
+
+        Returns:
+            영역 텍스트, 인덱스가 없거나 영역을 포함하지 않거나 화면이 바뀌었으면 None
+        """
+        with self._lock:
+            index = self._index
+        if index is None or not index.covers(x, y, width, height) or not _lang_covers(index.lang_code, lang_code):
+            return None
+        if get_change_detector().differs(index.crop(x, y, width, height), crop):
+            return None
+        self.hits += 1
+        return index.text_in_region(x, y, width, height)
+
+    def clear(self):
+        """인덱스 제거 (실행 종료 시)"""
+        with self._lock:
+            self._index = None
+
+
+# 전역 인덱스 캐시
+_screen_text_index = ScreenTextIndexCache()
+
+
+def get_screen_text_index():
+    """전역 화면 텍스트 인덱스 캐시 반환"""
+    return _screen_text_index
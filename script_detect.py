@@ -0,0 +1,137 @@
+"""
+문자 체계(한글/영문) 판별 - 조합 언어 모델(eng+kor, kor+eng) 대신 단일 언어 모델 선택
+
+lang='auto'/'kor'는 항상 조합 모델로 인식하는데, 조합 모델은 두 언어의 글자 후보를
+모두 평가하므로 단일 언어 모델보다 느립니다. 영역의 글자가 한 가지 문자 체계뿐이라고
+확신할 수 있으면 1단계(원본 이미지)를 단일 언어 모델로 먼저 시도합니다.
+
+판별 근거 (확신할 때만 단일 언어, 아니면 기존 조합 모델만 사용):
+    1. 기대 텍스트 - TestText/WaitUntil의 기대 텍스트가 한글만/영문·숫자만이면 그 언어
+    2. 영역별 기록 - 같은 영역(strategy_key)에서 이전에 인식한 텍스트의 문자 체계
+       (혼합으로 읽힌 적이 있는 영역은 다시 단일 언어로 바꾸지 않음)
+
+단일 언어 시도가 실패하면 같은 1단계에서 조합 모델로 이어서 시도하고, 2·3단계(전처리/반전)는
+기존과 같이 조합 모델만 사용하므로 인식 가능 범위는 줄어들지 않습니다.
+"""
+
+# 로그 설정을 가장 먼저 import
+import logger_setup
+
+import threading
+
+# 결합 언어 설정 → 조합 모델 (tes.image_to_text_with_fallback의 언어 설정과 동일)
+COMBINED_LANGS = {'auto': 'eng+kor', 'kor': 'kor+eng'}
+
+SCRIPT_KOR = 'kor'
+SCRIPT_ENG = 'eng'
+SCRIPT_MIXED = 'mixed'
+
+# 영역별 기록 최대 개수 (넘으면 오래된 것부터 제거)
+_MAX_REGIONS = 512
+
+
+def _is_hangul(ch):
+    code = ord(ch)
+    return (0xAC00 <= code <= 0xD7A3      # 완성형 음절
+            or 0x1100 <= code <= 0x11FF   # 자모
+            or 0x3130 <= code <= 0x318F)  # 호환 자모
+
+
+def text_script(text):
+    """텍스트의 문자 체계
+
+    Returns:
+        'kor' (한글만), 'eng' (영문/숫자만), 'mixed' (한글+영문), 판단할 글자가 없으면 None
+        숫자/기호는 두 모델 모두 인식하므로 한글과 함께 있으면 한글로 봅니다.
+    """
+    has_hangul = has_latin = has_digit = False
+    for ch in text or '':
+        if _is_hangul(ch):
+            has_hangul = True
+        elif 'a' <= ch.lower() <= 'z':
+            has_latin = True
+        elif ch.isdigit():
+            has_digit = True
+    if has_hangul and has_latin:
+        return SCRIPT_MIXED
+    if has_hangul:
+        return SCRIPT_KOR
+    if has_latin or has_digit:
+        return SCRIPT_ENG
+    return None
+
+
+class ScriptDetector:
+    """기대 텍스트/영역별 기록으로 단일 언어 모델 선택"""
+
+    def __init__(self):
+        self.enabled = True
+        self._regions = {}
+        self._lock = threading.Lock()
+        self.single = 0
+        self.combined = 0
+
+    def detect(self, expected_text=None, strategy_key=None):
+        """확신할 수 있는 문자 체계 ('kor'/'eng'), 모르거나 혼합이면 None"""
+        if expected_text:
+            script = text_script(expected_text)
+        elif strategy_key is not None:
+            with self._lock:
+                script = self._regions.get(strategy_key)
+        else:
+            script = None
+        return script if script in (SCRIPT_KOR, SCRIPT_ENG) else None
+
+    def languages(self, lang, expected_text=None, strategy_key=None):
+        """1단계에서 시도할 언어 목록 - 단일 언어를 먼저, 조합 모델은 대체용으로 뒤에
+
+        Returns:
+            (stage1_languages, script) - 판별하지 못했으면 ([조합 모델], None)
+        """
+        combined = COMBINED_LANGS.get(lang)
+        if combined is None:
+            return [lang], None
+        script = self.detect(expected_text, strategy_key) if self.enabled else None
+        with self._lock:
+            if script:
+                self.single += 1
+            else:
+                self.combined += 1
+        if script is None:
+            return [combined], None
+        return [script, combined], script
+
+    def record(self, strategy_key, text):
+        """영역에서 인식한 텍스트의 문자 체계 기록 (한 번 혼합이면 계속 혼합)"""
+        if strategy_key is None:
+            return
+        script = text_script(text)
+        if script is None:
+            return
+        with self._lock:
+            previous = self._regions.get(strategy_key)
+            if previous is not None and previous != script:
+                script = SCRIPT_MIXED
+            self._regions.pop(strategy_key, None)
+            self._regions[strategy_key] = script
+            while len(self._regions) > _MAX_REGIONS:
+                self._regions.pop(next(iter(self._regions)))
+
+    def clear(self):
+        with self._lock:
+            self._regions.clear()
+            self.single = 0
+            self.combined = 0
+
+    def stats(self):
+        with self._lock:
+            return {'single': self.single, 'combined': self.combined, 'regions': len(self._regions)}
+
+
+# 전역 판별기
+_script_detector = ScriptDetector()
+
+
+def get_script_detector():
+    """전역 문자 체계 판별기 반환"""
+    return _script_detector
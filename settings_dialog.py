@@ -13,11 +13,13 @@ import json
 import webbrowser
 from PyQt5.QtWidgets import (QDialog, QVBoxLayout, QHBoxLayout, QLabel, QPushButton, 
                              QLineEdit, QCheckBox, QFileDialog, QMessageBox, QGroupBox,
-                             QDialogButtonBox, QFrame, QSpinBox)
+                             QDialogButtonBox, QFrame, QSpinBox, QDoubleSpinBox, QComboBox)
 from PyQt5.QtCore import Qt, pyqtSignal
 from PyQt5.QtGui import QIcon, QPixmap, QPalette
 import pytesseract
 from utils import set_pytesseract_cmd
+from text_match import DEFAULT_THRESHOLD, DEFAULT_NORMALIZE
+from capture import SCREEN_BACKENDS
 
 
 class SettingsDialog(QDialog):
@@ -55,6 +57,14 @@ class SettingsDialog(QDialog):
         auto_save_group = self.create_auto_save_group()
         layout.addWidget(auto_save_group)
         
+        # OCR 성능 설정 그룹
+        ocr_group = self.create_ocr_performance_group()
+        layout.addWidget(ocr_group)
+        
+        # 스크린샷 보관 설정 그룹
+        retention_group = self.create_retention_group()
+        layout.addWidget(retention_group)
+        
         # 구분선
         line = QFrame()
         line.setFrameShape(QFrame.HLine)
@@ -143,6 +153,15 @@ class SettingsDialog(QDialog):
         desc_label.setStyleSheet("color: #666; font-size: 11px; margin-left: 20px;")
         layout.addWidget(desc_label)
         
+        # 프로파일링 체크박스
+        self.profile_checkbox = QCheckBox("단계별 실행 시간 프로파일링")
+        self.profile_checkbox.setToolTip("단계와 캡처/전처리/Tesseract/비교 구간 시간을 기록합니다.")
+        layout.addWidget(self.profile_checkbox)
+        
+        profile_desc_label = QLabel("실행이 끝나면 test_results에 Chrome trace(JSON)와 명령어별 합계/평균/p95 표를 저장합니다.")
+        profile_desc_label.setStyleSheet("color: #666; font-size: 11px; margin-left: 20px;")
+        layout.addWidget(profile_desc_label)
+        
         group.setLayout(layout)
         return group
     
@@ -182,13 +201,135 @@ class SettingsDialog(QDialog):
         group.setLayout(layout)
         return group
     
+    def create_ocr_performance_group(self):
+        """OCR 성능 설정 그룹 생성"""
+        group = QGroupBox("⚡ OCR 성능 설정")
+        layout = QVBoxLayout()
+        
+        # 병렬 OCR 체크박스
+        self.ocr_parallel_checkbox = QCheckBox("OCR 병렬 실행")
+        self.ocr_parallel_checkbox.setToolTip("원본/전처리/반전 × PSM × 언어 조합을 여러 프로세스에서 동시에 실행합니다.")
+        layout.addWidget(self.ocr_parallel_checkbox)
+        
+        # 설명
+        desc_label = QLabel("멀티코어 PC에서 OCR 최악 지연시간을 줄입니다. (CPU 사용량 증가)")
+        desc_label.setStyleSheet("color: #666; font-size: 11px; margin-left: 20px;")
+        layout.addWidget(desc_label)
+        
+        # 일괄 OCR 체크박스
+        self.ocr_batch_checkbox = QCheckBox("연속 TestText 일괄 OCR")
+        self.ocr_batch_checkbox.setToolTip("연속된 TestText 영역을 한 번 캡처하여 Tesseract 1회로 인식합니다.")
+        layout.addWidget(self.ocr_batch_checkbox)
+        
+        batch_desc_label = QLabel("정적인 화면의 체크리스트를 빠르게 검사합니다. (실패한 항목은 영역별 OCR로 재확인)")
+        batch_desc_label.setStyleSheet("color: #666; font-size: 11px; margin-left: 20px;")
+        layout.addWidget(batch_desc_label)
+        
+        # 문자 체계 판별 체크박스
+        self.ocr_script_detect_checkbox = QCheckBox("한글/영문 단일 언어 모델 우선")
+        self.ocr_script_detect_checkbox.setToolTip("기대 텍스트나 이전 인식 결과가 한글만/영문만이면 조합 모델(kor+eng) 대신 단일 언어 모델을 먼저 시도합니다.")
+        layout.addWidget(self.ocr_script_detect_checkbox)
+        
+        script_desc_label = QLabel("단일 언어 모델로 찾지 못하면 조합 모델로 다시 인식합니다.")
+        script_desc_label.setStyleSheet("color: #666; font-size: 11px; margin-left: 20px;")
+        layout.addWidget(script_desc_label)
+        
+        # 지연 검사 체크박스
+        self.ocr_deferred_checkbox = QCheckBox("TestText 지연 검사")
+        self.ocr_deferred_checkbox.setToolTip("단일 TestText는 영역만 캡처하고 바로 다음 명령어로 진행하며, OCR/비교는 백그라운드에서 실행합니다. (명령어의 defer= 옵션이 우선)")
+        layout.addWidget(self.ocr_deferred_checkbox)
+        
+        deferred_desc_label = QLabel("결과는 ShowResults/ExportResult 실행 전에 순서대로 합쳐집니다. (반복 확인은 제외)")
+        deferred_desc_label.setStyleSheet("color: #666; font-size: 11px; margin-left: 20px;")
+        layout.addWidget(deferred_desc_label)
+        
+        # 화면 캡처 방식
+        capture_layout = QHBoxLayout()
+        capture_layout.addWidget(QLabel("화면 캡처 방식:"))
+        self.capture_backend_combo = QComboBox()
+        self.capture_backend_combo.addItems(list(SCREEN_BACKENDS))
+        self.capture_backend_combo.setToolTip("auto: Windows는 GDI(버퍼 재사용), Linux는 X11, 사용할 수 없으면 pyautogui")
+        capture_layout.addWidget(self.capture_backend_combo)
+        capture_layout.addStretch()
+        layout.addLayout(capture_layout)
+        
+        # 유사 일치 기준
+        fuzzy_layout = QHBoxLayout()
+        fuzzy_layout.addWidget(QLabel("유사 일치 기준:"))
+        self.fuzzy_threshold_spinbox = QDoubleSpinBox()
+        self.fuzzy_threshold_spinbox.setRange(0.5, 1.0)
+        self.fuzzy_threshold_spinbox.setSingleStep(0.05)
+        self.fuzzy_threshold_spinbox.setDecimals(2)
+        self.fuzzy_threshold_spinbox.setToolTip("매칭 모드가 '유사 일치'인 TestText/WaitUntil에서 일치로 판정할 최소 유사도입니다. (명령어의 fuzzy= 옵션이 우선)")
+        fuzzy_layout.addWidget(self.fuzzy_threshold_spinbox)
+        fuzzy_layout.addStretch()
+        layout.addLayout(fuzzy_layout)
+        
+        fuzzy_desc_label = QLabel("대소문자/전각/공백/0·O 같은 혼동 문자/한글 자모 차이를 정규화한 뒤 편집 거리로 비교합니다.")
+        fuzzy_desc_label.setStyleSheet("color: #666; font-size: 11px; margin-left: 20px;")
+        layout.addWidget(fuzzy_desc_label)
+        
+        group.setLayout(layout)
+        return group
+    
+    def create_retention_group(self):
+        """스크린샷/리포트 보관 설정 그룹 생성"""
+        group = QGroupBox("🗂️ 스크린샷 보관 설정")
+        layout = QVBoxLayout()
+        
+        # 중복 제거 체크박스
+        self.screenshot_dedup_checkbox = QCheckBox("같은 화면 스크린샷 중복 저장 안 함")
+        self.screenshot_dedup_checkbox.setToolTip("픽셀이 같은 이미지를 이미 저장했으면 새 파일을 만들지 않고 기존 파일을 사용합니다.")
+        layout.addWidget(self.screenshot_dedup_checkbox)
+        
+        # 보관 조건 (0 = 사용 안 함)
+        def add_spinbox(label_text, maximum, suffix, tooltip):
+            row = QHBoxLayout()
+            row.addWidget(QLabel(label_text))
+            spinbox = QSpinBox()
+            spinbox.setRange(0, maximum)
+            spinbox.setSuffix(suffix)
+            spinbox.setSpecialValueText("사용 안 함")
+            spinbox.setToolTip(tooltip)
+            row.addWidget(spinbox)
+            row.addStretch()
+            layout.addLayout(row)
+            return spinbox
+        
+        self.retention_days_spinbox = add_spinbox("스크린샷 보관 기간:", 3650, " 일", "이 기간보다 오래된 스크린샷(압축 보관 포함)을 삭제합니다.")
+        self.retention_mb_spinbox = add_spinbox("스크린샷 폴더 최대 용량:", 1024 * 1024, " MB", "폴더 용량이 한도를 넘으면 오래된 스크린샷부터 삭제합니다.")
+        self.retention_sessions_spinbox = add_spinbox("최근 실행 세션만 보관:", 10000, " 회", "최근 N번의 실행에서 저장한 스크린샷만 남깁니다.")
+        self.compact_days_spinbox = add_spinbox("압축 보관 시작:", 3650, " 일 후", "이 기간보다 오래된 스크린샷은 날짜별 ZIP(screenshot/archive)으로 압축합니다.")
+        self.report_retention_days_spinbox = add_spinbox("리포트 보관 기간:", 3650, " 일", "test_results 폴더에서 이 기간보다 오래된 리포트를 삭제합니다.")
+        
+        desc_label = QLabel("정리/압축은 실행이 끝날 때 백그라운드에서 진행됩니다. (0 = 사용 안 함)")
+        desc_label.setStyleSheet("color: #666; font-size: 11px; margin-left: 20px;")
+        layout.addWidget(desc_label)
+        
+        group.setLayout(layout)
+        return group
+    
     def load_settings(self):
         """설정 파일에서 설정 로드"""
         default_settings = {
             "tesseract_path": "",
             "debug_mode": False,
+            "profile_enabled": False,
             "auto_save_enabled": False,
-            "auto_save_interval": 5
+            "auto_save_interval": 5,
+            "ocr_parallel": False,
+            "ocr_batch": True,
+            "ocr_script_detect": True,
+            "ocr_deferred": False,
+            "capture_backend": "auto",
+            "screenshot_dedup": True,
+            "artifact_retention_days": 0,
+            "artifact_retention_mb": 0,
+            "artifact_retention_sessions": 0,
+            "artifact_compact_days": 0,
+            "report_retention_days": 0,
+            "fuzzy_threshold": DEFAULT_THRESHOLD,
+            "fuzzy_normalize": ",".join(DEFAULT_NORMALIZE)
         }
         
         try:
@@ -242,6 +383,7 @@ class SettingsDialog(QDialog):
         # Debug 모드
         debug_mode = self.settings.get("debug_mode", False)
         self.debug_mode_checkbox.setChecked(debug_mode)
+        self.profile_checkbox.setChecked(self.settings.get("profile_enabled", False))
         
         # 자동 저장 설정
         auto_save_enabled = self.settings.get("auto_save_enabled", False)
@@ -253,6 +395,23 @@ class SettingsDialog(QDialog):
         # 자동 저장 간격 SpinBox 활성화 상태 설정
         self.auto_save_interval_spinbox.setEnabled(auto_save_enabled)
         
+        # OCR 성능 설정
+        self.ocr_parallel_checkbox.setChecked(self.settings.get("ocr_parallel", False))
+        self.ocr_batch_checkbox.setChecked(self.settings.get("ocr_batch", True))
+        self.ocr_script_detect_checkbox.setChecked(self.settings.get("ocr_script_detect", True))
+        self.ocr_deferred_checkbox.setChecked(self.settings.get("ocr_deferred", False))
+        backend = self.settings.get("capture_backend", "auto")
+        self.capture_backend_combo.setCurrentIndex(SCREEN_BACKENDS.index(backend) if backend in SCREEN_BACKENDS else 0)
+        self.fuzzy_threshold_spinbox.setValue(self.settings.get("fuzzy_threshold", DEFAULT_THRESHOLD))
+        
+        # 스크린샷 보관 설정
+        self.screenshot_dedup_checkbox.setChecked(self.settings.get("screenshot_dedup", True))
+        self.retention_days_spinbox.setValue(self.settings.get("artifact_retention_days", 0))
+        self.retention_mb_spinbox.setValue(self.settings.get("artifact_retention_mb", 0))
+        self.retention_sessions_spinbox.setValue(self.settings.get("artifact_retention_sessions", 0))
+        self.compact_days_spinbox.setValue(self.settings.get("artifact_compact_days", 0))
+        self.report_retention_days_spinbox.setValue(self.settings.get("report_retention_days", 0))
+        
         # 경로 유효성 검사
         self.validate_tesseract_path()
     
@@ -400,8 +559,21 @@ class SettingsDialog(QDialog):
         # 설정 업데이트
         self.settings["tesseract_path"] = tesseract_path
         self.settings["debug_mode"] = self.debug_mode_checkbox.isChecked()
+        self.settings["profile_enabled"] = self.profile_checkbox.isChecked()
         self.settings["auto_save_enabled"] = self.auto_save_checkbox.isChecked()
         self.settings["auto_save_interval"] = self.auto_save_interval_spinbox.value()
+        self.settings["ocr_parallel"] = self.ocr_parallel_checkbox.isChecked()
+        self.settings["ocr_batch"] = self.ocr_batch_checkbox.isChecked()
+        self.settings["ocr_script_detect"] = self.ocr_script_detect_checkbox.isChecked()
+        self.settings["ocr_deferred"] = self.ocr_deferred_checkbox.isChecked()
+        self.settings["capture_backend"] = self.capture_backend_combo.currentText()
+        self.settings["fuzzy_threshold"] = round(self.fuzzy_threshold_spinbox.value(), 2)
+        self.settings["screenshot_dedup"] = self.screenshot_dedup_checkbox.isChecked()
+        self.settings["artifact_retention_days"] = self.retention_days_spinbox.value()
+        self.settings["artifact_retention_mb"] = self.retention_mb_spinbox.value()
+        self.settings["artifact_retention_sessions"] = self.retention_sessions_spinbox.value()
+        self.settings["artifact_compact_days"] = self.compact_days_spinbox.value()
+        self.settings["report_retention_days"] = self.report_retention_days_spinbox.value()
         
         # 설정 저장
         if self.save_settings():
@@ -0,0 +1,231 @@
+"""
+템플릿(이미지) 매칭 - 아이콘/버튼/로딩 스피너처럼 글자가 없는 대상을 화면에서 찾기
+
+OCR 대신 정규화 상호상관(NCC)으로 참조 이미지의 위치를 찾습니다.
+
+1. 검색 영역과 템플릿을 2배씩 평균 축소한 피라미드로 만들고
+2. 가장 작은 단계에서 전체 위치의 NCC를 FFT로 한 번에 계산해 후보 몇 개를 고른 뒤
+3. 한 단계씩 키우며 후보 주변 몇 픽셀만 다시 계산하여 위치를 정밀하게 맞춥니다.
+
+템플릿 피라미드(축소 배열, 평균 제거, 노름)는 파일 수정 시각/배율별로 캐시하므로
+폴링 중 반복 호출에서는 검색 영역 축소와 FFT 한 번 정도의 비용만 듭니다. (수 ms)
+"""
+
+# 로그 설정을 가장 먼저 import
+import logger_setup
+
+import os
+import threading
+from collections import OrderedDict, namedtuple
+import numpy as np
+from PIL import Image
+from numpy.lib.stride_tricks import sliding_window_view
+from constants import current_dir
+
+# 템플릿 이미지 기본 폴더 (상대 경로는 여기 또는 프로그램 폴더 기준)
+template_dir = os.path.join(current_dir, 'templates')
+
+# 가장 작은 피라미드 단계에서 템플릿의 짧은 변 최소 크기 (너무 작으면 특징이 사라짐)
+_MIN_TEMPLATE_SIDE = 8
+_MAX_LEVELS = 4
+# 축소 단계에서 고를 후보 수 / 단계마다 다시 찾을 주변 범위(픽셀)
+_CANDIDATES = 3
+_REFINE_RADIUS = 2
+# 분산이 이보다 작은 창(단색 영역)은 NCC 0으로 처리
+_FLAT_EPSILON = 1e-6
+
+TemplateMatch = namedtuple('TemplateMatch', ['x', 'y', 'width', 'height', 'score'])
+
+
+def resolve_template_path(path):
+    """템플릿 경로 해석 (절대 경로 → templates 폴더 → 프로그램 폴더 순)"""
+    if os.path.isabs(path):
+        return path
+    for base in (template_dir, current_dir):
+        candidate = os.path.join(base, path)
+        if os.path.exists(candidate):
+            return candidate
+    return os.path.join(template_dir, path)
+
+
+def _to_gray_array(image):
+    return np.asarray(image.convert('L'), dtype=np.float32)
+
+
+def _downsample(arr):
+    """2x2 평균 축소"""
+    h, w = arr.shape[0] // 2 * 2, arr.shape[1] // 2 * 2
+    # 축 평균(reshape().mean)보다 짝/홀 픽셀 슬라이스 4개를 더하는 쪽이 훨씬 빠름
+    out = arr[0:h:2, 0:w:2] + arr[1:h:2, 0:w:2]
+    out += arr[0:h:2, 1:w:2]
+    out += arr[1:h:2, 1:w:2]
+    out *= 0.25
+    return out
+
+
+class TemplatePyramid:
+    """템플릿의 단계별 (평균 제거 배열, 노름) - levels[0]이 원본 크기"""
+
+    def __init__(self, arr, levels):
+        self.levels = []
+        for level in range(levels):
+            if level:
+                arr = _downsample(arr)
+            centered = arr - arr.mean()
+            norm = float(np.sqrt((centered * centered).sum()))
+            self.levels.append((centered, norm))
+
+    @property
+    def shape(self):
+        return self.levels[0][0].shape
+
+
+def _level_count(template_shape, region_shape):
+    """템플릿/검색 영역 크기로 사용할 피라미드 단계 수"""
+    side = min(template_shape)
+    levels = 1
+    while (levels < _MAX_LEVELS and side // (2 ** levels) >= _MIN_TEMPLATE_SIDE
+           and min(region_shape) // (2 ** levels) >= _MIN_TEMPLATE_SIDE):
+        levels += 1
+    return levels
+
+
+_pyramid_cache = OrderedDict()
+_pyramid_lock = threading.Lock()
+_PYRAMID_CACHE_SIZE = 32
+
+
+def get_template_pyramid(path, scale=1.0, levels=_MAX_LEVELS):
+    """템플릿 피라미드 (파일 경로/수정 시각/배율/단계 수별 캐시)"""
+    path = resolve_template_path(path)
+    key = (path, os.path.getmtime(path), round(scale, 4), levels)
+    with _pyramid_lock:
+        pyramid = _pyramid_cache.get(key)
+        if pyramid is not None:
+            _pyramid_cache.move_to_end(key)
+            return pyramid
+
+    with Image.open(path) as img:
+        gray = img.convert('L')
+        if abs(scale - 1.0) > 1e-3:
+            size = (max(1, round(gray.width * scale)), max(1, round(gray.height * scale)))
+            gray = gray.resize(size, Image.BILINEAR)
+        pyramid = TemplatePyramid(_to_gray_array(gray), levels)
+
+    with _pyramid_lock:
+        _pyramid_cache[key] = pyramid
+        while len(_pyramid_cache) > _PYRAMID_CACHE_SIZE:
+            _pyramid_cache.popitem(last=False)
+    return pyramid
+
+
+def _window_stats(image, shape):
+    """모든 창 위치의 (합, 분산×픽셀 수) - 적분 영상 사용"""
+    h, w = shape
+    ii = np.zeros((image.shape[0] + 1, image.shape[1] + 1), np.float64)
+    ii2 = np.zeros_like(ii)
+    np.cumsum(np.cumsum(image, axis=0, dtype=np.float64), axis=1, out=ii[1:, 1:])
+    np.cumsum(np.cumsum(np.square(image, dtype=np.float64), axis=0), axis=1, out=ii2[1:, 1:])
+
+    def window_sum(table):
+        return table[h:, w:] - table[:-h, w:] - table[h:, :-w] + table[:-h, :-w]
+
+    total = window_sum(ii)
+    variance = window_sum(ii2) - total * total / (h * w)
+    return total, variance
+
+
+def ncc_map(image, centered, norm):
+    """모든 위치의 NCC (FFT 상호상관) - 결과 크기 (H-h+1, W-w+1)"""
+    h, w = centered.shape
+    H, W = image.shape
+    spectrum = np.fft.rfft2(image, s=(H, W)) * np.conj(np.fft.rfft2(centered, s=(H, W)))
+    numerator = np.fft.irfft2(spectrum, s=(H, W))[:H - h + 1, :W - w + 1]
+    _, variance = _window_stats(image, (h, w))
+    denominator = np.sqrt(np.maximum(variance, 0)) * norm
+    with np.errstate(divide='ignore', invalid='ignore'):
+        result = np.where(denominator > _FLAT_EPSILON, numerator / denominator, 0.0)
+    return result
+
+
+def _ncc_patch(image, centered, norm, x0, y0, x1, y1):
+    """(x0..x1, y0..y1) 범위 위치만 직접 계산한 NCC → (score, x, y) 최댓값"""
+    h, w = centered.shape
+    sub = image[y0:y1 + h, x0:x1 + w]
+    windows = sliding_window_view(sub, (h, w))
+    flat = windows.reshape(windows.shape[0], windows.shape[1], -1)
+    numerator = flat @ centered.ravel()
+    variance = flat.var(axis=2) * (h * w)
+    denominator = np.sqrt(variance) * norm
+    with np.errstate(divide='ignore', invalid='ignore'):
+        scores = np.where(denominator > _FLAT_EPSILON, numerator / denominator, 0.0)
+    iy, ix = np.unravel_index(np.argmax(scores), scores.shape)
+    return float(scores[iy, ix]), x0 + int(ix), y0 + int(iy)
+
+
+def _top_candidates(scores, count, template_shape):
+    """NCC 맵에서 서로 겹치지 않는 상위 후보 위치"""
+    scores = scores.copy()
+    h, w = template_shape
+    candidates = []
+    for _ in range(count):
+        iy, ix = np.unravel_index(np.argmax(scores), scores.shape)
+        score = scores[iy, ix]
+        if not np.isfinite(score) or score <= 0:
+            break
+        candidates.append((int(ix), int(iy)))
+        scores[max(0, iy - h // 2):iy + h // 2 + 1, max(0, ix - w // 2):ix + w // 2 + 1] = -np.inf
+    return candidates
+
+
+def find_template(image, template_path, scale=1.0):
+    """검색 이미지에서 템플릿과 가장 비슷한 위치
+
+    Args:
+        image: 검색 영역 이미지 (PIL)
+        template_path: 템플릿 이미지 경로
+        scale: 템플릿 배율 (1.0: 캡처한 크기 그대로)
+
+    Returns:
+        TemplateMatch(x, y, width, height, score) - 좌표는 image 기준 좌상단, score는 -1~1
+        템플릿이 검색 영역보다 크면 None
+    """
+    region = _to_gray_array(image)
+    with Image.open(resolve_template_path(template_path)) as img:
+        template_shape = (max(1, round(img.height * scale)), max(1, round(img.width * scale)))
+    if template_shape[0] > region.shape[0] or template_shape[1] > region.shape[1]:
+        return None
+
+    levels = _level_count(template_shape, region.shape)
+    pyramid = get_template_pyramid(template_path, scale, levels)
+    images = [region]
+    for _ in range(levels - 1):
+        images.append(_downsample(images[-1]))
+
+    # 가장 작은 단계: 전체 위치를 FFT로 계산 후 후보 선택
+    coarse_centered, coarse_norm = pyramid.levels[-1]
+    scores = ncc_map(images[-1], coarse_centered, coarse_norm)
+    candidates = _top_candidates(scores, _CANDIDATES, coarse_centered.shape)
+    if not candidates:
+        return TemplateMatch(0, 0, pyramid.shape[1], pyramid.shape[0], 0.0)
+
+    # 단계별로 후보 주변만 다시 계산하며 정밀화
+    best = None
+    for x, y in candidates:
+        score = float(scores[y, x])
+        for level in range(levels - 2, -1, -1):
+            centered, norm = pyramid.levels[level]
+            h, w = centered.shape
+            level_image = images[level]
+            max_x = level_image.shape[1] - w
+            max_y = level_image.shape[0] - h
+            cx, cy = min(x * 2, max_x), min(y * 2, max_y)
+            score, x, y = _ncc_patch(
+                level_image, centered, norm,
+                max(0, cx - _REFINE_RADIUS), max(0, cy - _REFINE_RADIUS),
+                min(max_x, cx + _REFINE_RADIUS), min(max_y, cy + _REFINE_RADIUS))
+        if best is None or score > best[0]:
+            best = (score, x, y)
+
+    score, x, y = best
+    return TemplateMatch(x, y, pyramid.shape[1], pyramid.shape[0], score)
@@ -1,12 +1,383 @@
 # 로그 설정을 가장 먼저 import
 import logger_setup
 
+import os
+import time
+import threading
 import pytesseract
+import ocr_engine
+from ocr_strategy import get_strategy_store, variant_name
+from preprocess import get_pipeline
+from text_match import get_text_matcher, resolve_threshold
+from script_detect import get_script_detector
+from ocr_cache import image_digest
+from profiler import profile_span
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
 from PIL import Image, ImageOps, ImageEnhance, ImageFilter
-pytesseract.pytesseract.tesseract_cmd = fr'C:\Program Files\Tesseract-OCR\tesseract.exe'
+# Windows 기본 설치 경로가 있으면 사용 (없으면 PATH의 tesseract - Linux 헤드리스 벤치마크 등)
+_WINDOWS_TESSERACT_CMD = fr'C:\Program Files\Tesseract-OCR\tesseract.exe'
+if os.path.exists(_WINDOWS_TESSERACT_CMD):
+    pytesseract.pytesseract.tesseract_cmd = _WINDOWS_TESSERACT_CMD
 
-# 전역 변수: 마지막 OCR 시도 정보 저장
-_last_ocr_attempts = []
+# 마지막 OCR 시도 정보와 단계별 소요시간/Tesseract 호출 횟수 (스레드별 저장)
+# 지연 검사 작업자/다중 클라이언트 스레드가 동시에 OCR하므로 다른 호출의 결과와 섞이지 않도록 분리
+_last_ocr = threading.local()
+
+# True: image_to_data 1회 호출로 텍스트+신뢰도 동시 추출
+# False: 기존 방식 (image_to_string + image_to_data 2회 호출, 벤치마크 비교용)
+OCR_SINGLE_PASS = True
+
+# True: 모든 OCR 변형(원본/전처리/반전 × PSM × 언어)을 프로세스 풀에 동시에 보내고
+# 조건을 만족하는 첫 결과에서 나머지를 취소 (set_parallel_mode로 변경)
+OCR_PARALLEL = False
+
+# 학습된 변형을 기대 텍스트 없이 채택할 신뢰도 (캐스케이드 단계별 기준과 동일 수준)
+_LEARNED_MIN_CONFIDENCE = {'원본': 70, '전처리': 60, '반전': 50}
+
+
+def get_last_ocr_attempts():
+    """현재 스레드의 마지막 OCR 시도 목록 [(text, conf, info), ...]"""
+    return getattr(_last_ocr, 'attempts', [])
+
+
+def get_last_ocr_stats():
+    """현재 스레드의 마지막 OCR 단계별 소요시간/Tesseract 호출 횟수 (벤치마크용)"""
+    return getattr(_last_ocr, 'stats', {})
+
+
+def set_last_ocr(attempts, stats):
+    """현재 스레드의 마지막 OCR 정보 설정 (캐시 적중 등 OCR 없이 결과를 낸 경우)"""
+    _last_ocr.attempts = attempts
+    _last_ocr.stats = stats
+
+
+def _count_tesseract_call():
+    stats = getattr(_last_ocr, 'stats', None)
+    if stats is not None:
+        stats['tesseract_calls'] = stats.get('tesseract_calls', 0) + 1
+
+# 병렬 OCR 프로세스 풀 (최초 사용 시 생성)
+_process_pool = None
+_process_pool_workers = None
+_process_pool_lock = threading.Lock()
+
+
+def preprocess_image(img, mode='standard', resize=True, sharpen=True, thresholding=True):
+    """다양한 전처리 모드 지원"""
+    # 그레이스케일
+    img = img.convert("L")
+
+    if mode == 'standard':
+        # 리사이즈 (2배 확대)
+        if resize:
+            img = img.resize((img.width * 2, img.height * 2))
+        # 샤프닝
+        if sharpen:
+            img = img.filter(ImageFilter.SHARPEN)
+        # 이진화
+        if thresholding:
+            img = img.point(lambda x: 0 if x < 160 else 255, '1')
+
+    elif mode == 'enhanced':
+        # 고품질 리사이즈 (3배 확대)
+        img = img.resize((img.width * 3, img.height * 3), Image.Resampling.LANCZOS)
+        # 대비 향상
+        enhancer = ImageEnhance.Contrast(img)
+        img = enhancer.enhance(2.0)
+        # 샤프닝
+        img = img.filter(ImageFilter.SHARPEN)
+        # 적응형 이진화
+        img = img.point(lambda x: 0 if x < 140 else 255, '1')
+
+    elif mode == 'light':
+        # 밝은 텍스트용
+        if resize:
+            img = img.resize((img.width * 2, img.height * 2))
+        # 밝기 조정
+        enhancer = ImageEnhance.Brightness(img)
+        img = enhancer.enhance(1.5)
+        # 이진화 (낮은 임계값)
+        img = img.point(lambda x: 0 if x < 180 else 255, '1')
+
+    return img
+
+
+def data_to_text(data):
+    """image_to_data 결과(DICT)에서 텍스트 재구성
+
+    block/par/line 번호로 줄바꿈을 복원합니다.
+    (같은 줄 단어는 공백, 줄은 '\n', 문단/블록 사이는 빈 줄로 구분 - image_to_string과 동일)
+    """
+    lines = []
+    current_key = None
+    current_par = None
+    words = []
+
+    for i, word in enumerate(data.get('text', [])):
+        word = (word or '').strip()
+        if not word:
+            continue
+        par_key = (data['page_num'][i], data['block_num'][i], data['par_num'][i])
+        line_key = par_key + (data['line_num'][i],)
+        if line_key != current_key:
+            if words:
+                lines.append(' '.join(words))
+            if current_par is not None and par_key != current_par:
+                lines.append('')
+            words = []
+            current_key = line_key
+            current_par = par_key
+        words.append(word)
+
+    if words:
+        lines.append(' '.join(words))
+
+    return '\n'.join(lines).strip()
+
+
+def data_to_confidence(data):
+    """image_to_data 결과(DICT)에서 단어 평균 신뢰도 계산 (-1: 단어가 아닌 레벨)"""
+    confidences = []
+    for conf, word in zip(data.get('conf', []), data.get('text', [])):
+        try:
+            conf = float(conf)
+        except (TypeError, ValueError):
+            continue
+        if conf >= 0 and (word or '').strip():
+            confidences.append(conf)
+    return sum(confidences) / len(confidences) if confidences else 0
+
+
+def try_ocr_with_confidence(image, lang_code, psm_mode):
+    """OCR 실행하고 신뢰도와 함께 반환
+
+    OCR_SINGLE_PASS이면 image_to_data 한 번으로 텍스트와 신뢰도를 함께 얻습니다.
+    (기존 방식은 같은 이미지로 Tesseract를 두 번 실행)
+    단일 호출은 ocr_engine의 상주 인스턴스 풀을 통해 실행됩니다.
+    """
+    start_time = time.time()
+
+    try:
+        custom_config = f'--psm {psm_mode} --oem 3'
+
+        if OCR_SINGLE_PASS:
+            data = ocr_engine.image_to_data(image, lang_code, psm_mode)
+            _count_tesseract_call()
+            text = data_to_text(data)
+            avg_confidence = data_to_confidence(data)
+            total_time = time.time() - start_time
+
+            result_preview = text[:30] + "..." if len(text) > 30 else text
+            print(f"    [{lang_code}|PSM{psm_mode}] {total_time:.2f}s "
+                  f"→ 신뢰도:{avg_confidence:.1f}% '{result_preview}'")
+            return text, avg_confidence
+
+        # 텍스트 추출
+        ocr_start = time.time()
+        text = pytesseract.image_to_string(image, lang=lang_code, config=custom_config).strip()
+        _count_tesseract_call()
+        ocr_time = time.time() - ocr_start
+
+        # 신뢰도 정보 추출 (있는 경우)
+        conf_start = time.time()
+        try:
+            data = pytesseract.image_to_data(image, lang=lang_code, config=custom_config, output_type=pytesseract.Output.DICT)
+            _count_tesseract_call()
+            avg_confidence = data_to_confidence(data)
+        except:
+            # 신뢰도 계산 실패 시 텍스트 길이로 대체
+            avg_confidence = min(len(text) * 10, 100)  # 텍스트가 길수록 높은 점수
+        conf_time = time.time() - conf_start
+
+        total_time = time.time() - start_time
+
+        # 상세 로그 출력
+        result_preview = text[:30] + "..." if len(text) > 30 else text
+        print(f"    [{lang_code}|PSM{psm_mode}] {total_time:.2f}s (OCR:{ocr_time:.2f}s, Conf:{conf_time:.2f}s) "
+              f"→ 신뢰도:{avg_confidence:.1f}% '{result_preview}'")
+
+        return text, avg_confidence
+    except Exception as e:
+        total_time = time.time() - start_time
+        print(f"    [{lang_code}|PSM{psm_mode}] {total_time:.2f}s → 실패: {e}")
+        return "", 0
+
+
+def is_expected_match(text, expected_text, exact_match=False, fuzzy=None):
+    """OCR 결과가 기대 텍스트와 일치하는지 (완전일치 / 일부포함)
+
+    Args:
+        fuzzy: 유사 일치 기준 (None이면 사용 안 함, True면 전역 기준, 숫자면 해당 유사도)
+            그대로 일치하지 않아도 정규화/편집 거리 기준으로 거의 같으면 일치로 판정 (text_match.py 참고)
+    """
+    if not expected_text or not text:
+        return False
+    with profile_span('match', 'stage'):
+        if exact_match:
+            matched = text.strip() == expected_text.strip()
+        else:
+            matched = expected_text in text
+        if matched or fuzzy is None or fuzzy is False:
+            return matched
+        return get_text_matcher().matches(text, expected_text, exact_match, resolve_threshold(fuzzy))
+
+
+def set_parallel_mode(enabled, max_workers=None):
+    """병렬 OCR 모드 설정 (max_workers 기본값: CPU 코어 수)"""
+    global OCR_PARALLEL, _process_pool_workers
+    OCR_PARALLEL = bool(enabled)
+    if max_workers != _process_pool_workers:
+        _process_pool_workers = max_workers
+        shutdown_process_pool()
+    print(f"OCR 병렬 모드: {'활성화' if OCR_PARALLEL else '비활성화'}")
+
+
+def _process_pool_size():
+    """프로세스 풀 작업자 수 (set_parallel_mode의 max_workers, 없으면 CPU 코어 수)"""
+    return _process_pool_workers or os.cpu_count() or 2
+
+
+def _get_process_pool():
+    global _process_pool
+    with _process_pool_lock:
+        if _process_pool is None:
+            workers = _process_pool_size()
+            _process_pool = ProcessPoolExecutor(max_workers=workers)
+            print(f"OCR 프로세스 풀 생성 (작업자 {workers}개)")
+        return _process_pool
+
+
+def shutdown_process_pool():
+    """병렬 OCR 프로세스 풀 종료 (진행 중이 아닌 작업은 취소)"""
+    global _process_pool
+    with _process_pool_lock:
+        if _process_pool is not None:
+            _process_pool.shutdown(wait=False, cancel_futures=True)
+            _process_pool = None
+
+
+def _ocr_variant_worker(image, lang_code, psm_mode, tesseract_cmd):
+    """프로세스 풀 작업자: OCR 변형 하나 실행"""
+    pytesseract.pytesseract.tesseract_cmd = tesseract_cmd
+    return try_ocr_with_confidence(image, lang_code, psm_mode)
+
+
+def _preprocess(img, pipeline=None, resize=True, sharpen=True, thresholding=True):
+    """전처리 단계 이미지 (pipeline이 있으면 NumPy 파이프라인, 없으면 기존 standard 모드)"""
+    with profile_span('preprocess', 'stage', pipeline=pipeline.spec if pipeline is not None else 'standard'):
+        if pipeline is not None:
+            return pipeline.run(img)
+        return preprocess_image(img, mode='standard', resize=resize, sharpen=sharpen, thresholding=thresholding)
+
+
+def _variant_image(img, label, resize=True, sharpen=True, thresholding=True, pipeline=None):
+    """변형 이름(원본/전처리/반전)에 해당하는 입력 이미지 생성"""
+    if label == '전처리':
+        return _preprocess(img, pipeline, resize, sharpen, thresholding)
+    if label == '반전':
+        return _preprocess(ImageOps.invert(img.convert("RGB")), pipeline, resize, sharpen, thresholding)
+    return img
+
+
+def build_ocr_variants(img, languages, psm_modes, resize=True, sharpen=True, thresholding=True, pipeline=None,
+                       stage1_languages=None):
+    """순차 캐스케이드와 같은 OCR 변형 목록 생성
+
+    Args:
+        stage1_languages: 1단계(원본) 언어 후보 (문자 체계 판별 결과, 없으면 languages)
+
+    Returns:
+        [(stage, label, image, lang_code, psm, min_confidence), ...]
+        min_confidence: 기대 텍스트 없이도 즉시 채택할 수 있는 신뢰도 (None이면 즉시 채택 안 함)
+    """
+    processed = _variant_image(img, '전처리', resize, sharpen, thresholding, pipeline)
+    inverted = _variant_image(img, '반전', resize, sharpen, thresholding, pipeline)
+    # 파이프라인에 invert(극성 정규화) 단계가 있으면 반전 이미지가 전처리 이미지와 같으므로 제외
+    if image_digest(inverted) == image_digest(processed):
+        inverted = None
+    variants = []
+    for lang_code in stage1_languages or languages:
+        for psm in psm_modes:
+            variants.append(('1단계', '원본', img, lang_code, psm, 70))
+    for lang_code in languages:
+        for psm in psm_modes:
+            variants.append(('2단계', '전처리', processed, lang_code, psm, 60))
+    if inverted is not None:
+        for lang_code in languages:
+            variants.append(('3단계', '반전', inverted, lang_code, 6, None))
+    return variants
+
+
+def _image_to_text_parallel(img, languages, psm_modes, expected_text, exact_match,
+                            resize, sharpen, thresholding, pipeline=None, fuzzy=None,
+                            stage1_languages=None, script=None):
+    """OCR 변형을 작업자 수만큼씩 동시에 실행하고 조건을 만족하는 첫 결과 반환
+
+    변형은 단계 순서대로 작업자 수만큼만 제출하고, 하나가 끝날 때마다 다음 변형을 채워 넣습니다.
+    실행 중인 작업은 취소할 수 없으므로 결과가 채택되면 더 이상 제출하지 않습니다.
+    1단계는 순차 모드와 같은 언어 후보(stage1_languages)를 사용하고, 문자 체계 판별로 고른 단일 모델(script)은
+    기대 텍스트가 있으면 신뢰도만으로 채택하지 않습니다.
+
+    Returns:
+        (best_result, best_info, attempts, winner) - 실패 시 예외 발생 (호출 측에서 순차 모드로 대체)
+        winner: 채택된 변형 (label, lang_code, psm), 채택 기준을 만족한 변형이 없으면 None
+    """
+    variants = build_ocr_variants(img, languages, psm_modes, resize, sharpen, thresholding, pipeline,
+                                  stage1_languages)
+    pool = _get_process_pool()
+    workers = _process_pool_size()
+    tesseract_cmd = pytesseract.pytesseract.tesseract_cmd
+    print(f"  [병렬] {len(variants)}개 변형 실행 (동시 최대 {workers}개)...")
+
+    remaining = iter(variants)
+    futures = {}
+
+    def submit_next():
+        """다음 변형 하나 제출 (남은 변형이 없으면 False)"""
+        for stage, label, image, lang_code, psm, min_conf in remaining:
+            future = pool.submit(_ocr_variant_worker, image, lang_code, psm, tesseract_cmd)
+            futures[future] = (stage, label, lang_code, psm, min_conf)
+            return True
+        return False
+
+    best_result = ""
+    best_confidence = 0
+    best_info = ""
+    attempts = []
+    try:
+        while len(futures) < workers and submit_next():
+            pass
+        while futures:
+            done, _ = wait(futures, return_when=FIRST_COMPLETED)
+            for future in done:
+                stage, label, lang_code, psm, min_conf = futures.pop(future)
+                text, conf = future.result()
+                _count_tesseract_call()
+                if not text:
+                    continue
+                attempts.append((text, conf, f"{label}|PSM{psm}"))
+                if conf > best_confidence:
+                    best_result = text
+                    best_confidence = conf
+                    best_info = f"{label} (PSM={psm}, 신뢰도={conf:.1f})"
+
+                # 기대 텍스트 발견 또는 단계별 신뢰도 기준 충족 시 추가 제출 중단
+                if is_expected_match(text, expected_text, exact_match, fuzzy):
+                    return text, f"{label} (PSM={psm}, 신뢰도={conf:.1f}, 기대 텍스트 발견)", attempts, (label, lang_code, psm)
+                if stage == '1단계' and expected_text and lang_code == script:
+                    continue  # 단일 모델이 기대 텍스트를 못 찾았으면 조합 모델 결과까지 대기
+                if min_conf is not None and conf > min_conf:
+                    # 기대 텍스트가 있는데 일치하지 않은 결과는 학습하지 않음
+                    winner = None if expected_text else (label, lang_code, psm)
+                    return best_result, best_info, attempts, winner
+            while len(futures) < workers and submit_next():
+                pass
+    finally:
+        skipped = sum(1 for _ in remaining) + sum(1 for f in futures if f.cancel())
+        if skipped:
+            print(f"  [병렬] 남은 변형 {skipped}개 생략")
+
+    return best_result, best_info, attempts, None
 
 
 def image_to_text_with_fallback(
@@ -18,7 +389,10 @@ def image_to_text_with_fallback(
     thresholding=True,
     preview=False,
     expected_text=None,
-    exact_match=False
+    exact_match=False,
+    strategy_key=None,
+    preprocess=None,
+    fuzzy=None
 ):
     """
     개선된 OCR 함수 - 자동 언어 감지 및 다중 줄 지원
@@ -28,98 +402,31 @@ def image_to_text_with_fallback(
     2. 다중 줄 지원: 여러 PSM 모드 시도
     3. 신뢰도 기반 최적 결과 선택
     4. 조기 종료: expected_text가 발견되면 즉시 반환 (속도 향상)
+    5. 문자 체계 판별: 한글만/영문만인 영역은 1단계에서 단일 언어 모델 우선 (script_detect.py)
     
     Args:
         expected_text: 찾을 텍스트 (있으면 발견 시 즉시 종료)
         exact_match: True면 완전일치, False면 일부포함
+        strategy_key: 영역 식별 키 (있으면 이 영역에서 이전에 성공한 변형을 먼저 시도하고 결과를 학습)
+        preprocess: 전처리 파이프라인 명세 (예: 'sauvola', 'gray,invert,otsu,crop,scale2'),
+            없으면 기존 standard 전처리 사용
+        fuzzy: 유사 일치 기준 (None이면 사용 안 함) - 오인식 한두 글자 차이의 결과도 1단계에서 조기 종료
     """
     
-    def preprocess_image(img, mode='standard'):
-        """다양한 전처리 모드 지원"""
-        # 그레이스케일
-        img = img.convert("L")
-
-        if mode == 'standard':
-            # 리사이즈 (2배 확대)
-            if resize:
-                img = img.resize((img.width * 2, img.height * 2))
-            # 샤프닝
-            if sharpen:
-                img = img.filter(ImageFilter.SHARPEN)
-            # 이진화
-            if thresholding:
-                img = img.point(lambda x: 0 if x < 160 else 255, '1')
-        
-        elif mode == 'enhanced':
-            # 고품질 리사이즈 (3배 확대)
-            img = img.resize((img.width * 3, img.height * 3), Image.Resampling.LANCZOS)
-            # 대비 향상
-            enhancer = ImageEnhance.Contrast(img)
-            img = enhancer.enhance(2.0)
-            # 샤프닝
-            img = img.filter(ImageFilter.SHARPEN)
-            # 적응형 이진화
-            img = img.point(lambda x: 0 if x < 140 else 255, '1')
-        
-        elif mode == 'light':
-            # 밝은 텍스트용
-            if resize:
-                img = img.resize((img.width * 2, img.height * 2))
-            # 밝기 조정
-            enhancer = ImageEnhance.Brightness(img)
-            img = enhancer.enhance(1.5)
-            # 이진화 (낮은 임계값)
-            img = img.point(lambda x: 0 if x < 180 else 255, '1')
-
-        return img
-
-    def try_ocr_with_confidence(image, lang_code, psm_mode):
-        """OCR 실행하고 신뢰도와 함께 반환"""
-        import time
-        start_time = time.time()
-        
-        try:
-            custom_config = f'--psm {psm_mode} --oem 3'
-            
-            # 텍스트 추출
-            ocr_start = time.time()
-            text = pytesseract.image_to_string(image, lang=lang_code, config=custom_config).strip()
-            ocr_time = time.time() - ocr_start
-            
-            # 신뢰도 정보 추출 (있는 경우)
-            conf_start = time.time()
-            try:
-                data = pytesseract.image_to_data(image, lang=lang_code, config=custom_config, output_type=pytesseract.Output.DICT)
-                confidences = [int(conf) for conf in data['conf'] if conf != '-1']
-                avg_confidence = sum(confidences) / len(confidences) if confidences else 0
-            except:
-                # 신뢰도 계산 실패 시 텍스트 길이로 대체
-                avg_confidence = min(len(text) * 10, 100)  # 텍스트가 길수록 높은 점수
-            conf_time = time.time() - conf_start
-            
-            total_time = time.time() - start_time
-            
-            # 상세 로그 출력
-            result_preview = text[:30] + "..." if len(text) > 30 else text
-            print(f"    [{lang_code}|PSM{psm_mode}] {total_time:.2f}s (OCR:{ocr_time:.2f}s, Conf:{conf_time:.2f}s) "
-                  f"→ 신뢰도:{avg_confidence:.1f}% '{result_preview}'")
-            
-            return text, avg_confidence
-        except Exception as e:
-            total_time = time.time() - start_time
-            print(f"    [{lang_code}|PSM{psm_mode}] {total_time:.2f}s → 실패: {e}")
-            return "", 0
-
-    # 전역 변수 초기화 (이전 실행 결과 제거)
-    global _last_ocr_attempts
-    _last_ocr_attempts = []
+    # 현재 스레드의 시도 정보/통계 초기화 (이전 실행 결과 제거)
+    stats = {'stages': {}, 'tesseract_calls': 0, 'total': 0}
+    set_last_ocr([], stats)
     
     try:
-        import time
         total_start_time = time.time()
         
-        print(f"🔍 OCR 처리 중: {img_path}")
-        img = Image.open(img_path)
+        # 파일 경로 또는 이미 열린 PIL 이미지 모두 지원
+        img = img_path if isinstance(img_path, Image.Image) else Image.open(img_path)
+        source = getattr(img, 'filename', '') or f"메모리 이미지 {img.width}x{img.height}"
+        print(f"🔍 OCR 처리 중: {source}")
+        pipeline = get_pipeline(preprocess) if preprocess else None
+        if pipeline is not None:
+            print(f"  전처리: {pipeline.spec}")
         
         if preview:
             img.show()
@@ -140,6 +447,11 @@ def image_to_text_with_fallback(
             languages = [lang]
             print(f"  언어: {lang}")
         
+        # 문자 체계를 확신할 수 있으면 1단계는 단일 언어 모델을 먼저 시도 (조합 모델보다 빠름)
+        stage1_languages, script = get_script_detector().languages(lang, expected_text, strategy_key)
+        if script:
+            print(f"  언어: 1단계 단일 모델 '{script}' 우선 (문자 체계 판별)")
+        
         # PSM 모드 (속도 최적화: 가장 범용적인 2개만)
         # 7: 단일 텍스트 줄
         # 6: 단일 균일 텍스트 블록 (여러 줄 지원, 가장 범용적)
@@ -147,11 +459,69 @@ def image_to_text_with_fallback(
         
         attempts = []
         
+        # 학습된 변형이 있으면 그 변형 하나만 먼저 시도 (반복 실행은 대부분 Tesseract 1회로 끝남)
+        store = get_strategy_store()
+        learned = store.preferred(strategy_key)
+        if learned and learned[1] not in stage1_languages + languages:
+            learned = None
+        if learned:
+            learned_start = time.time()
+            label, lang_code, psm = learned
+            print(f"  [학습] {variant_name(label, lang_code, psm)} 우선 시도...")
+            text, conf = try_ocr_with_confidence(
+                _variant_image(img, label, resize, sharpen, thresholding, pipeline), lang_code, psm)
+            stats['stages']['학습'] = time.time() - learned_start
+            if text:
+                attempts.append((text, conf, f"{label}|PSM{psm}"))
+                best_result = text
+                best_confidence = conf
+                best_info = f"{label} (PSM={psm}, 신뢰도={conf:.1f}, 학습된 변형)"
+                if expected_text:
+                    accepted = is_expected_match(text, expected_text, exact_match, fuzzy)
+                else:
+                    accepted = conf > _LEARNED_MIN_CONFIDENCE.get(label, 70)
+                if accepted:
+                    store.record_hit(strategy_key)
+                    total_time = time.time() - total_start_time
+                    stats['total'] = total_time
+                    print(f"✅ OCR 성공 (학습된 변형, 총 {total_time:.2f}s): '{text}'")
+                    print(f"   {best_info}")
+                    _last_ocr.attempts = attempts
+                    return text
+            print("  [학습] 학습된 변형 실패 - 전체 단계 진행")
+        
+        # 병렬 모드: 모든 변형을 동시에 실행 (최악 지연 = 가장 느린 단일 변형 수준)
+        if OCR_PARALLEL:
+            parallel_start = time.time()
+            try:
+                best_result, best_info, parallel_attempts, winner = _image_to_text_parallel(
+                    img, languages, psm_modes, expected_text, exact_match,
+                    resize, sharpen, thresholding, pipeline, fuzzy, stage1_languages, script
+                )
+                attempts.extend(parallel_attempts)
+                if winner:
+                    store.record_winner(strategy_key, *winner)
+                total_time = time.time() - total_start_time
+                stats['stages']['병렬'] = time.time() - parallel_start
+                stats['total'] = total_time
+                if best_result:
+                    print(f"✅ OCR 성공 (병렬, 총 {total_time:.2f}s): '{best_result}'")
+                    print(f"   {best_info}")
+                else:
+                    print(f"⚠️ OCR 결과 없음 (병렬, 총 {total_time:.2f}s) - 텍스트를 찾지 못했습니다")
+                _last_ocr.attempts = attempts
+                return best_result
+            except Exception as e:
+                print(f"⚠️ 병렬 OCR 실패, 순차 모드로 진행: {e}")
+                shutdown_process_pool()
+        
         # 1단계: 원본 이미지로 빠른 시도
         stage1_start = time.time()
         print("  [1단계] 원본 이미지 시도...")
-        for lang_code in languages:
+        for lang_code in stage1_languages:
             for psm in psm_modes:
+                if learned == ('원본', lang_code, psm):
+                    continue  # 학습 단계에서 이미 시도
                 text, conf = try_ocr_with_confidence(img, lang_code, psm)
                 if text:
                     attempts.append((text, conf, f"원본|PSM{psm}"))
@@ -161,40 +531,44 @@ def image_to_text_with_fallback(
                         best_info = f"원본 (PSM={psm}, 신뢰도={conf:.1f})"
                     
                     # 기대 텍스트가 있고 발견되면 즉시 종료 (최고 속도 최적화!)
-                    if expected_text and text:
-                        is_match = False
-                        if exact_match:
-                            is_match = text.strip() == expected_text.strip()
-                        else:
-                            is_match = expected_text in text
-                        
-                        if is_match:
+                    if is_expected_match(text, expected_text, exact_match, fuzzy):
                             stage1_time = time.time() - stage1_start
+                            stats['stages']['1단계'] = stage1_time
                             total_time = time.time() - total_start_time
+                            stats['total'] = total_time
                             print(f"  ⏱️ 1단계 소요시간: {stage1_time:.2f}s")
+                            store.record_winner(strategy_key, '원본', lang_code, psm)
                             print(f"✅ OCR 성공 (기대 텍스트 발견, 총 {total_time:.2f}s): '{text}'")
                             print(f"   원본 (PSM={psm}, 신뢰도={conf:.1f})")
                             return text
                     
                     # 신뢰도가 높으면 바로 종료 (속도 최적화)
-                    if conf > 70:
+                    # 단, 단일 언어 모델이 기대 텍스트를 못 찾았으면 조합 모델까지 시도
+                    if conf > 70 and not (expected_text and lang_code == script):
+                        if not expected_text:
+                            store.record_winner(strategy_key, '원본', lang_code, psm)
                         stage1_time = time.time() - stage1_start
+                        stats['stages']['1단계'] = stage1_time
                         total_time = time.time() - total_start_time
+                        stats['total'] = total_time
                         print(f"  ⏱️ 1단계 소요시간: {stage1_time:.2f}s")
                         print(f"✅ OCR 성공 (고신뢰도, 총 {total_time:.2f}s): '{best_result}'")
                         print(f"   {best_info}")
                         return best_result
         
         stage1_time = time.time() - stage1_start
+        stats['stages']['1단계'] = stage1_time
         print(f"  ⏱️ 1단계 완료: {stage1_time:.2f}s (최고 신뢰도: {best_confidence:.1f}%)")
         
         # 2단계: 신뢰도가 낮으면 전처리 1회만 시도
         if best_confidence < 50:
             stage2_start = time.time()
             print("  [2단계] 전처리 이미지 시도...")
-            processed = preprocess_image(img, mode='standard')
+            processed = _preprocess(img, pipeline, resize, sharpen, thresholding)
             for lang_code in languages:
                 for psm in psm_modes:
+                    if learned == ('전처리', lang_code, psm):
+                        continue  # 학습 단계에서 이미 시도
                     text, conf = try_ocr_with_confidence(processed, lang_code, psm)
                     if text:
                         attempts.append((text, conf, f"전처리|PSM{psm}"))
@@ -204,49 +578,58 @@ def image_to_text_with_fallback(
                             best_info = f"전처리 (PSM={psm}, 신뢰도={conf:.1f})"
                         
                         # 기대 텍스트가 있고 발견되면 즉시 종료
-                        if expected_text and text:
-                            is_match = False
-                            if exact_match:
-                                is_match = text.strip() == expected_text.strip()
-                            else:
-                                is_match = expected_text in text
-                            
-                            if is_match:
+                        if is_expected_match(text, expected_text, exact_match, fuzzy):
                                 stage2_time = time.time() - stage2_start
+                                stats['stages']['2단계'] = stage2_time
                                 total_time = time.time() - total_start_time
+                                stats['total'] = total_time
                                 print(f"  ⏱️ 2단계 소요시간: {stage2_time:.2f}s")
+                                store.record_winner(strategy_key, '전처리', lang_code, psm)
                                 print(f"✅ OCR 성공 (기대 텍스트 발견, 총 {total_time:.2f}s): '{text}'")
                                 print(f"   전처리 (PSM={psm}, 신뢰도={conf:.1f})")
                                 return text
                         
                         # 전처리 후 신뢰도 60 이상이면 충분
                         if conf > 60:
+                            if not expected_text:
+                                store.record_winner(strategy_key, '전처리', lang_code, psm)
                             stage2_time = time.time() - stage2_start
+                            stats['stages']['2단계'] = stage2_time
                             total_time = time.time() - total_start_time
+                            stats['total'] = total_time
                             print(f"  ⏱️ 2단계 소요시간: {stage2_time:.2f}s")
                             print(f"✅ OCR 성공 (전처리, 총 {total_time:.2f}s): '{best_result}'")
                             print(f"   {best_info}")
                             return best_result
             
             stage2_time = time.time() - stage2_start
+            stats['stages']['2단계'] = stage2_time
             print(f"  ⏱️ 2단계 완료: {stage2_time:.2f}s (최고 신뢰도: {best_confidence:.1f}%)")
         
         # 3단계: 여전히 안 되면 반전 시도 (최소한으로)
+        # 파이프라인에 invert(극성 정규화) 단계가 있으면 반전 이미지가 2단계 전처리 이미지와 같으므로 생략
+        inverted = None
         if best_confidence < 30:
             stage3_start = time.time()
+            inverted = _variant_image(img, '반전', resize, sharpen, thresholding, pipeline)
+            if image_digest(inverted) == image_digest(processed):
+                print("  [3단계] 반전 이미지가 전처리 이미지와 같아 생략")
+                inverted = None
+        if inverted is not None:
             print("  [3단계] 반전 이미지 시도...")
-            inverted = ImageOps.invert(img.convert("RGB"))
-            processed = preprocess_image(inverted, mode='standard')
+            processed = inverted
             
             if preview:
                 processed.show()
             
-            if save_inverted:
+            if save_inverted and isinstance(img_path, str):
                 test_path = img_path.replace(".jpg", "_inverted_preprocessed.jpg")
                 processed.save(test_path)
                 print(f"    🖼 반전+전처리 이미지 저장: {test_path}")
             
             for lang_code in languages:
+                if learned == ('반전', lang_code, 6):
+                    continue  # 학습 단계에서 이미 시도
                 text, conf = try_ocr_with_confidence(processed, lang_code, 6)  # PSM 6만 시도
                 if text:
                     attempts.append((text, conf, "반전"))
@@ -256,17 +639,13 @@ def image_to_text_with_fallback(
                         best_info = f"반전 (신뢰도={conf:.1f})"
                     
                     # 기대 텍스트가 있고 발견되면 즉시 종료
-                    if expected_text and text:
-                        is_match = False
-                        if exact_match:
-                            is_match = text.strip() == expected_text.strip()
-                        else:
-                            is_match = expected_text in text
-                        
-                        if is_match:
+                    if is_expected_match(text, expected_text, exact_match, fuzzy):
                             stage3_time = time.time() - stage3_start
+                            stats['stages']['3단계'] = stage3_time
                             total_time = time.time() - total_start_time
+                            stats['total'] = total_time
                             print(f"  ⏱️ 3단계 소요시간: {stage3_time:.2f}s")
+                            store.record_winner(strategy_key, '반전', lang_code, 6)
                             print(f"✅ OCR 성공 (기대 텍스트 발견, 총 {total_time:.2f}s): '{text}'")
                             print(f"   반전 (신뢰도={conf:.1f})")
                             return text
@@ -274,18 +653,20 @@ def image_to_text_with_fallback(
                     break  # 결과가 나오면 즉시 종료
             
             stage3_time = time.time() - stage3_start
+            stats['stages']['3단계'] = stage3_time
             print(f"  ⏱️ 3단계 완료: {stage3_time:.2f}s (최고 신뢰도: {best_confidence:.1f}%)")
         
         # 결과 출력
         total_time = time.time() - total_start_time
+        stats['total'] = total_time
         if best_result:
             print(f"✅ OCR 성공 (총 {total_time:.2f}s): '{best_result}'")
             print(f"   {best_info}")
         else:
             print(f"⚠️ OCR 결과 없음 (총 {total_time:.2f}s) - 텍스트를 찾지 못했습니다")
         
-        # 디버깅을 위해 시도 정보도 저장 (전역 변수는 함수 시작 부분에서 이미 선언됨)
-        _last_ocr_attempts = attempts
+        # 디버깅을 위해 시도 정보도 저장 (현재 스레드)
+        _last_ocr.attempts = attempts
         
         return best_result
 
@@ -295,14 +676,10 @@ def image_to_text_with_fallback(
         traceback.print_exc()
         return None
     
-#image_to_text_with_fallback("test.jpg", lang="kor")
-
-#image_to_text_with_fallback("250411_105635.jpg", lang="kor")
 if __name__ == "__main__":
-    # 예시 이미지 경로
-    #image_path = "250411_105635.jpg"
-    # OCR 처리
-    #image_to_text_with_fallback(image_path, lang="kor", preview=True)
-    
-    # Test with a specific image
-    image_to_text_with_fallback(fr".\screenshot\250527_125958.jpg", lang="kor")
\ No newline at end of file
+    # 단일 이미지 확인용 (코퍼스 단위 속도/정확도 측정은 ocr_benchmark.py 사용)
+    import sys
+    if len(sys.argv) < 2:
+        print("사용법: python tes.py <이미지 경로> [kor|eng|auto]")
+        sys.exit(1)
+    image_to_text_with_fallback(sys.argv[1], lang=sys.argv[2] if len(sys.argv) > 2 else "kor")
@@ -0,0 +1,326 @@
+"""
+기대 텍스트 유사 일치 - OCR 오인식(0/O, l/1, 한글 자모 한 획 차이 등)을 허용하는 비교
+
+TestText/WaitUntil의 기본 비교(완전일치 ==, 일부포함 in)는 글자 하나만 잘못 읽어도
+1단계(원본 이미지)에서 조기 종료하지 못하고 전처리/반전 단계까지 진행한 뒤 Fail이
+되는 경우가 많습니다. 유사 일치 모드는 양쪽 텍스트를 같은 규칙으로 정규화한 뒤
+편집 거리/토큰 유사도로 비교하여, 거의 일치하는 결과에서 바로 캐스케이드를 끝냅니다.
+
+정규화 단계 (설정의 fuzzy_normalize, 쉼표로 구분):
+    width        전각/호환 문자 통일 (NFKC: ＡＢＣ１２３ → ABC123)
+    case         대소문자 무시
+    confusions   OCR 혼동 문자 통일 (o→0, l/i/|/!→1, s→5, z→2, rn→m, vv→w, 따옴표/대시 - 대소문자 무시 후 적용)
+    whitespace   연속 공백/줄바꿈을 공백 하나로
+    jamo         한글 음절을 자모로 분해 (받침/모음 하나 차이가 글자 전체가 아닌 자모 1개 차이)
+
+유사도 (0~1):
+    일부포함  기대 텍스트와 OCR 결과의 부분 문자열 사이 최소 편집 거리 기준
+    완전일치  두 문자열 전체의 편집 거리 기준
+    토큰      기대 텍스트의 각 단어가 OCR 결과의 어떤 단어와 가장 가까운지 (단어 순서/사이 글자 무관)
+편집 거리 유사도와 토큰 유사도 중 높은 값이 기준(fuzzy_threshold, 기본 0.85) 이상이면 일치입니다.
+
+숫자는 허용 오차 없이 비교합니다 ('Level 12'와 'Level 13'은 불일치). 숫자와 그에 붙은 혼동 문자(1O0 → 100)를
+숫자열로 분리해 혼동 문자 통일 후 정확히 비교하고, 편집 거리 허용치는 숫자를 제외한 글자 수로만 계산합니다.
+단어 안에 낀 숫자(Dai1y)와 영문자에 붙은 숫자 하나(Leve1)는 글자 오인식으로 보고 일반 글자처럼 비교합니다.
+일부포함은 기대 텍스트의 숫자열이 OCR 결과에 같은 순서로 연속해서 나와야 합니다.
+"""
+
+# 로그 설정을 가장 먼저 import
+import logger_setup
+
+import re
+import unicodedata
+import threading
+
+# 기본 정규화 단계 (적용 순서는 _NORMALIZE_ORDER 고정)
+DEFAULT_NORMALIZE = ('width', 'case', 'confusions', 'whitespace', 'jamo')
+_NORMALIZE_ORDER = ('width', 'case', 'confusions', 'whitespace', 'jamo')
+
+# 기본 일치 기준
+DEFAULT_THRESHOLD = 0.85
+
+# OCR 혼동 문자 → 대표 문자 (양쪽에 같이 적용되므로 방향은 중요하지 않음, case 단계 뒤라 소문자만)
+_CONFUSION_MAP = {
+    'o': '0',
+    'l': '1', 'i': '1', '|': '1', '!': '1',
+    's': '5',
+    'z': '2',
+    '‘': "'", '’': "'", '`': "'", '´': "'",
+    '“': '"', '”': '"',
+    '–': '-', '—': '-', '−': '-', 'ㅡ': '-',
+}
+_CONFUSION_TABLE = str.maketrans(_CONFUSION_MAP)
+_CONFUSION_PAIRS = (('rn', 'm'), ('vv', 'w'))
+
+# 숫자열: 숫자 하나 이상을 포함한 연속 숫자/숫자 혼동 문자 (1O0, l2 등)
+_DIGIT_LIKE = re.escape(''.join(ch for ch, digit in _CONFUSION_MAP.items() if digit.isdigit()))
+_NUMBER_RE = re.compile(r'[0-9]+')
+_CONFUSABLE_NUMBER_RE = re.compile(f'[0-9{_DIGIT_LIKE}]*[0-9][0-9{_DIGIT_LIKE}]*')
+
+# 정규화 텍스트에서 분리한 숫자열 자리 (사용자 정의 영역 문자라 OCR 결과에 나오지 않음)
+_NUMBER_MARK = '\ue000'
+
+_HANGUL_BASE = 0xAC00
+_HANGUL_LAST = 0xD7A3
+
+
+def _is_latin(ch):
+    return 'a' <= ch <= 'z' or 'A' <= ch <= 'Z'
+
+
+def _decompose_jamo(text):
+    """한글 음절 → 초성/중성/종성 자모 (그 외 문자는 그대로)"""
+    out = []
+    for ch in text:
+        code = ord(ch)
+        if _HANGUL_BASE <= code <= _HANGUL_LAST:
+            index = code - _HANGUL_BASE
+            out.append(chr(0x1100 + index // 588))
+            out.append(chr(0x1161 + (index % 588) // 28))
+            if index % 28:
+                out.append(chr(0x11A7 + index % 28))
+        else:
+            out.append(ch)
+    return ''.join(out)
+
+
+def parse_normalize(spec):
+    """'width,case,...' 문자열 또는 목록 → 정규화 단계 튜플 (알 수 없는 단계는 ValueError)"""
+    if isinstance(spec, str):
+        spec = [token.strip().lower() for token in spec.split(',')]
+    steps = tuple(step for step in spec if step)
+    unknown = [step for step in steps if step not in _NORMALIZE_ORDER]
+    if unknown:
+        raise ValueError(f"알 수 없는 정규화 단계: {', '.join(unknown)} (사용 가능: {', '.join(_NORMALIZE_ORDER)})")
+    return steps
+
+
+def normalize_text(text, steps=DEFAULT_NORMALIZE, numbers=None):
+    """비교용 정규화 (steps에 포함된 단계만 고정 순서로 적용)
+
+    Args:
+        numbers: 목록을 주면 숫자열을 분리해 추가하고 텍스트에는 자리 표시 문자만 남김
+    """
+    text = text or ''
+    if 'width' in steps:
+        text = unicodedata.normalize('NFKC', text)
+    if 'case' in steps:
+        text = text.casefold()
+    if numbers is not None:
+        confusions = 'confusions' in steps
+        pattern = _CONFUSABLE_NUMBER_RE if confusions else _NUMBER_RE
+
+        def mark(match):
+            value = match.group()
+            digits = value.translate(_CONFUSION_TABLE) if confusions else value
+            # 단어 안에 낀 숫자(Dai1y)와 영문자에 붙은 숫자 하나(Leve1)는 글자 오인식으로 보고 일반 글자로 비교
+            # (혼동 문자 통일 후 숫자 수로 판단하므로 x1O/HP1OO는 x10/HP100과 같이 숫자열)
+            before = match.start() > 0 and _is_latin(text[match.start() - 1])
+            after = match.end() < len(text) and _is_latin(text[match.end()])
+            if (before and after) or ((before or after) and sum(ch.isdigit() for ch in digits) < 2):
+                return value
+            numbers.append(digits)
+            return _NUMBER_MARK
+
+        text = pattern.sub(mark, text)
+    if 'confusions' in steps:
+        for pair, replacement in _CONFUSION_PAIRS:
+            text = text.replace(pair, replacement)
+        text = text.translate(_CONFUSION_TABLE)
+    if 'whitespace' in steps:
+        text = ' '.join(text.split())
+    if 'jamo' in steps:
+        text = _decompose_jamo(text)
+    return text
+
+
+def levenshtein(a, b, limit=None):
+    """편집 거리 (limit를 넘는 것이 확정되면 limit + 1 반환)"""
+    if len(a) < len(b):
+        a, b = b, a
+    if not b:
+        return len(a)
+    previous = list(range(len(b) + 1))
+    for i, ca in enumerate(a, 1):
+        current = [i]
+        for j, cb in enumerate(b, 1):
+            current.append(min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (ca != cb)))
+        if limit is not None and min(current) > limit:
+            return limit + 1
+        previous = current
+    return previous[-1]
+
+
+def substring_distance(pattern, text, limit=None):
+    """pattern과 text의 임의 부분 문자열 사이 최소 편집 거리 (Sellers 알고리즘)"""
+    if not pattern:
+        return 0
+    # 열 = pattern 위치, text 어디서든 시작 가능하므로 각 행의 0번 열은 항상 0
+    previous = list(range(len(pattern) + 1))
+    best = previous[-1]
+    for ct in text:
+        current = [0]
+        for j, cp in enumerate(pattern, 1):
+            current.append(min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (cp != ct)))
+        best = min(best, current[-1])
+        if best == 0:
+            return 0
+        previous = current
+    if limit is not None and best > limit:
+        return limit + 1
+    return best
+
+
+class TextMatcher:
+    """정규화 + 편집 거리/토큰 유사도 기반 기대 텍스트 비교
+
+    Args:
+        normalize: 정규화 단계 목록 (DEFAULT_NORMALIZE 참고)
+        threshold: 일치로 판정할 최소 유사도 (0~1)
+    """
+
+    def __init__(self, normalize=DEFAULT_NORMALIZE, threshold=DEFAULT_THRESHOLD):
+        self.normalize = parse_normalize(normalize)
+        self.threshold = threshold
+        self._cache = {}
+        self._lock = threading.Lock()
+
+    def _normalized(self, text):
+        """정규화 텍스트(숫자열은 자리 표시) + 숫자열 튜플"""
+        # 폴링 중 같은 기대 텍스트를 반복 정규화하지 않도록 작은 캐시 사용
+        with self._lock:
+            value = self._cache.get(text)
+            if value is None:
+                if len(self._cache) > 256:
+                    self._cache.clear()
+                numbers = []
+                normalized = normalize_text(text, self.normalize, numbers)
+                value = self._cache[text] = (normalized, tuple(numbers))
+            return value
+
+    @staticmethod
+    def _numbers_match(numbers, expected_numbers, exact_match):
+        """숫자열 정확 비교 (일부포함: 기대 숫자열이 같은 순서로 연속해서 포함)"""
+        if exact_match:
+            return numbers == expected_numbers
+        size = len(expected_numbers)
+        if not size:
+            return True
+        return any(numbers[i:i + size] == expected_numbers for i in range(len(numbers) - size + 1))
+
+    @staticmethod
+    def _letters(text):
+        """편집 거리 허용치 계산에 쓰는 글자 수 (숫자열 제외)"""
+        return max(len(text) - text.count(_NUMBER_MARK), 1)
+
+    def _token_similarity(self, text, expected, exact_match):
+        """기대 텍스트의 모든 단어가 OCR 결과 단어 중 하나와 얼마나 가까운지 (가장 먼 단어 기준)"""
+        expected_tokens = expected.split()
+        text_tokens = text.split()
+        if not expected_tokens or not text_tokens:
+            return 0.0
+        if exact_match and len(expected_tokens) != len(text_tokens):
+            return 0.0
+        worst = 1.0
+        for token in expected_tokens:
+            best = max(1 - levenshtein(token, candidate) / max(self._letters(token), self._letters(candidate))
+                       for candidate in text_tokens)
+            worst = min(worst, best)
+        return worst
+
+    def score(self, text, expected_text, exact_match=False):
+        """정규화된 두 텍스트의 유사도 (0~1, 숫자열이 다르면 0)"""
+        text, numbers = self._normalized(text)
+        expected, expected_numbers = self._normalized(expected_text)
+        if not expected or not text or not self._numbers_match(numbers, expected_numbers, exact_match):
+            return 0.0
+        if exact_match:
+            if text == expected:
+                return 1.0
+            edit = 1 - levenshtein(text, expected) / max(self._letters(text), self._letters(expected))
+        else:
+            if expected in text:
+                return 1.0
+            edit = 1 - substring_distance(expected, text) / self._letters(expected)
+        return max(edit, self._token_similarity(text, expected, exact_match), 0.0)
+
+    def matches(self, text, expected_text, exact_match=False, threshold=None):
+        """유사도가 기준 이상인지 (숫자열은 정확히 일치해야 함)"""
+        threshold = self.threshold if threshold is None else threshold
+        text_n, numbers = self._normalized(text)
+        expected, expected_numbers = self._normalized(expected_text)
+        if not expected or not text_n:
+            return False
+        if not self._numbers_match(numbers, expected_numbers, exact_match):
+            return False
+        # 기준상 허용 편집 거리(숫자 제외 글자 수 기준)로 먼저 잘라 긴 OCR 결과에서 불필요한 계산 방지
+        if exact_match:
+            limit = int((1 - threshold) * max(self._letters(text_n), self._letters(expected)))
+            if text_n == expected or levenshtein(text_n, expected, limit) <= limit:
+                return True
+        else:
+            limit = int((1 - threshold) * self._letters(expected))
+            if expected in text_n or substring_distance(expected, text_n, limit) <= limit:
+                return True
+        return self._token_similarity(text_n, expected, exact_match) >= threshold
+
+
+# 전역 비교기
+_text_matcher = TextMatcher()
+
+
+def get_text_matcher():
+    """전역 기대 텍스트 비교기 반환"""
+    return _text_matcher
+
+
+def configure_text_matcher(normalize=None, threshold=None):
+    """설정 값으로 전역 비교기 교체 (잘못된 정규화 명세는 경고 후 기본값 사용)"""
+    global _text_matcher
+    try:
+        steps = parse_normalize(normalize) if normalize is not None else DEFAULT_NORMALIZE
+    except ValueError as e:
+        print(f"유사 일치 정규화 설정 무시 (기본값 사용): {e}")
+        steps = DEFAULT_NORMALIZE
+    _text_matcher = TextMatcher(steps, DEFAULT_THRESHOLD if threshold is None else threshold)
+    return _text_matcher
+
+
+def resolve_threshold(value):
+    """명령어 fuzzy 옵션 값 → 기준 유사도 (None: 유사 일치 사용 안 함, True: 전역 기준)"""
+    if value is None or value is False:
+        return None
+    if value is True:
+        return _text_matcher.threshold
+    return float(value)
+
+
+# 회귀 검사 사례 (OCR 결과, 기대 텍스트, 완전일치 여부, 기대 판정) - python text_match.py로 확인
+REGRESSION_CASES = (
+    ('Level 12', 'Level 13', True, False),
+    ('Gold 900', 'Gold 100', False, False),
+    ('보상 7000 골드', '보상 1000 골드', False, False),
+    ('Gold 1O0', 'Gold 100', True, True),
+    ('Leve1 12', 'Level 12', True, True),
+    ('퀘스트 완료 보상 1000 골드 획득', '보상 1000 골드', False, True),
+    ('퀘스트 왼료', '퀘스트 완료', True, True),
+    ('Dai1y Reward', 'Daily Reward', False, True),
+    ('x1O', 'x10', True, True),
+    ('보상 x1O 획득', 'x10', False, True),
+    ('HP1OO', 'HP100', True, True),
+    ('현재 HP1OO', 'HP100', False, True),
+    ('Lv1O', 'Lv10', True, True),
+    ('던전 Lv1O 입장', 'Lv10', False, True),
+    ('Lv19', 'Lv10', True, False),
+)
+
+
+if __name__ == "__main__":
+    failed = 0
+    for text, expected_text, exact_match, expected in REGRESSION_CASES:
+        result = get_text_matcher().matches(text, expected_text, exact_match)
+        if result != expected:
+            failed += 1
+        print(f"{'OK ' if result == expected else 'FAIL'} {text!r} / {expected_text!r} "
+              f"({'완전일치' if exact_match else '일부포함'}) → {result}")
+    raise SystemExit(1 if failed else 0)
@@ -5,75 +5,204 @@ import os
 import time
 import json
 import threading
-import pyautogui as pag
+from headless import HEADLESS
+if HEADLESS:
+    from headless import input_modules
+    pag = input_modules('pag')
+else:
+    import pyautogui as pag
 import pytesseract
 from datetime import datetime
 from constants import current_dir, screenshot_dir, DEFAULT_TESSERACT_PATHS
+import tes
+import capture
 from tes import image_to_text_with_fallback
+import ocr_engine
+from ocr_cache import get_ocr_cache, image_digest
+from ocr_strategy import get_strategy_store
+from script_detect import get_script_detector
+from frame_buffer import get_frame_buffer
+from artifact_writer import get_artifact_writer
+from capture_index import get_capture_index
+from artifact_store import get_artifact_store, RetentionPolicy
+from deferred_checks import get_deferred_checks
+from text_match import configure_text_matcher
+from profiler import profile_span, get_profiler
 
 
 def set_pytesseract_cmd(path):
     """Set pytesseract.tesseract_cmd if the path looks valid."""
     if path and os.path.exists(path) and path.lower().endswith('tesseract.exe'):
         pytesseract.pytesseract.tesseract_cmd = path
+        # 상주 OCR 인스턴스는 새 경로의 tessdata로 다시 초기화
+        ocr_engine.reset_engine()
         return True
     return False
 
 
+# 같은 밀리초에 저장한 파일이 서로 덮어쓰지 않도록 이름 발급을 직렬화
+_screenshot_name_lock = threading.Lock()
+_last_screenshot_stamp = None
+_screenshot_stamp_seq = 0
+
+
+def screenshot_path_for(prefix='', timestamp=None, directory=screenshot_dir):
+    """겹치지 않는 스크린샷 파일 경로 (밀리초 단위 시각 + 같은 시각이면 순번)
+
+    Args:
+        prefix: 파일명 접두어 (예: 'fail_')
+        timestamp: 캡처 시각 (time.time() 값, 없으면 현재 시각)
+    """
+    global _last_screenshot_stamp, _screenshot_stamp_seq
+    moment = datetime.fromtimestamp(timestamp) if timestamp is not None else datetime.now()
+    stamp = moment.strftime('%y%m%d_%H%M%S_%f')[:-3]
+    with _screenshot_name_lock:
+        if stamp == _last_screenshot_stamp:
+            _screenshot_stamp_seq += 1
+        else:
+            _last_screenshot_stamp = stamp
+            _screenshot_stamp_seq = 0
+        seq = _screenshot_stamp_seq
+        while True:
+            name = f"{prefix}{stamp}_{seq}.jpg" if seq else f"{prefix}{stamp}.jpg"
+            path = os.path.join(directory, name)
+            if not os.path.exists(path):
+                break
+            seq += 1  # 다른 프로세스가 같은 이름을 이미 사용
+        _screenshot_stamp_seq = seq
+    return path
+
+
 def take_screenshot():
     """Take a full-screen screenshot."""
-    timestamp = datetime.now().strftime('%y%m%d_%H%M%S')
-    screenshot_path = os.path.join(screenshot_dir, f"{timestamp}.jpg")
-    
-    screenshot = pag.screenshot()
-    screenshot.save(screenshot_path)
-    return screenshot_path
+    return save_screenshot(capture.grab_screen())
+
+
+def capture_region(x, y, w, h):
+    """지정 영역을 메모리 이미지(PIL)로 캡처 (캡처 백엔드는 capture.py)
+
+    프레임은 영역별 링 버퍼에만 보관하며 디스크에는 실패/리포트/디버그 모드일 때만 저장합니다.
+    """
+    image = capture.grab(x, y, w, h)
+    get_frame_buffer().record((x, y, w, h), image)
+    return image
+
+
+def capture_screen():
+    """주 모니터 전체를 메모리 이미지(PIL)로 캡처"""
+    image = capture.grab_screen()
+    get_frame_buffer().record('screen', image)
+    return image
+
+
+def save_screenshot(image, prefix='', timestamp=None):
+    """메모리 이미지를 스크린샷 폴더에 저장하고 경로 반환 (실패/리포트용 지연 저장)
+
+    인코딩/쓰기는 백그라운드 저장기(artifact_writer.py)가 처리하므로 경로는 즉시 반환됩니다.
+    파일을 바로 읽어야 하면 get_artifact_writer().wait_for(경로)로 기록 완료를 기다리세요.
+    픽셀이 같은 이미지를 이미 저장했으면 새로 쓰지 않고 기존 경로를 반환합니다 (artifact_store.py).
+    """
+    if timestamp is None:
+        timestamp = time.time()
+    store = get_artifact_store()
+    digest = image_digest(image) if store.dedup else None
+    existing = store.lookup(digest) if digest else None
+    if existing:
+        get_capture_index().record(existing, timestamp, digest)
+        return existing
+    screenshot_path = screenshot_path_for(prefix, timestamp)
+    get_capture_index().record(screenshot_path, timestamp, digest)
+    if digest:
+        store.remember(digest, screenshot_path)
+    return get_artifact_writer().submit(image, screenshot_path)
 
 
 def take_screenshot_with_coords(x, y, w, h):
     """Take a screenshot at specified coordinates."""
-    timestamp = datetime.now().strftime('%y%m%d_%H%M%S')
-    screenshot_path = os.path.join(screenshot_dir, f"{timestamp}.jpg")
-    
-    screenshot = pag.screenshot(region=(x, y, w, h))
-    screenshot.save(screenshot_path)
-    return screenshot_path
+    return save_screenshot(capture.grab(x, y, w, h))
 
 
-def image_to_text(img_path="", lang='auto', expected_text=None, exact_match=False):
+def image_to_text(img_path="", lang='auto', expected_text=None, exact_match=False, strategy_key=None,
+                  preprocess=None, fuzzy=None):
     """
     Convert the most recent screenshot to text.
     
     Args:
-        img_path: 이미지 파일 경로 (비어있으면 최신 스크린샷 사용)
+        img_path: 이미지 파일 경로 또는 메모리 이미지(PIL) (비어있으면 최신 스크린샷 사용)
         lang: 언어 설정
             - 'auto': 자동 감지 (영어+한글 동시 시도, 권장)
             - 'kor': 한글 우선
             - 'eng': 영어만
         expected_text: 기대되는 텍스트 (선택사항, 조기 종료에 사용)
         exact_match: 완전일치 모드 여부 (expected_text와 함께 사용)
+        strategy_key: 영역 식별 키 (같은 영역에서 이전에 성공한 OCR 변형을 먼저 시도)
+        preprocess: 전처리 파이프라인 명세 (없으면 기본 전처리, preprocess.py 참고)
+        fuzzy: 유사 일치 기준 (None이면 사용 안 함, text_match.py 참고)
             
     Returns:
         추출된 텍스트 (실패 시 None 또는 빈 문자열)
     """
-    if img_path == "":
-        if not os.path.exists(screenshot_dir):
-            print("Screenshot directory does not exist.")
-            return None
-
-        screenshots = sorted(
-            [f for f in os.listdir(screenshot_dir) if f.endswith('.jpg')],
-            key=lambda f: os.path.getmtime(os.path.join(screenshot_dir, f)),
-            reverse=True
-        )
+    if isinstance(img_path, str):
+        # 백그라운드 저장 중인 파일이면 기록이 끝날 때까지 대기
+        if img_path:
+            get_artifact_writer().wait_for(img_path)
+        else:
+            get_artifact_writer().flush()
 
-        if not screenshots:
+    if isinstance(img_path, str) and img_path == "":
+        # 폴더를 정렬하지 않고 캡처 인덱스의 최신 포인터 사용
+        img_path = get_capture_index().latest()
+        if not img_path:
             print("No screenshots found.")
             return None
 
-        img_path = os.path.join(screenshot_dir, screenshots[0])
+    # 같은 프레임(픽셀 동일)+같은 옵션이면 캐시된 결과 즉시 반환
+    cache = get_ocr_cache()
+    cache_key = None
+    if cache.enabled:
+        try:
+            if isinstance(img_path, str):
+                from PIL import Image
+                image = Image.open(img_path)
+                image.load()
+            else:
+                image = img_path
+            cache_key = cache.make_key(image, 'fallback', lang, expected_text, exact_match, preprocess, fuzzy)
+            cached = cache.get(cache_key)
+            if cached is not None:
+                text, attempts = cached
+                tes.set_last_ocr(attempts, {'stages': {}, 'tesseract_calls': 0, 'total': 0, 'cache_hit': True})
+                print(f"⚡ OCR 캐시 적중: '{text}' ({format_ocr_cache_stats()})")
+                return text
+            img_path = image
+        except Exception as e:
+            print(f"OCR 캐시 조회 실패 (캐시 없이 진행): {e}")
+            cache_key = None
+
+    # OCR 캐스케이드 전체 구간 (하위에 전처리/Tesseract/비교 구간이 중첩됨)
+    with profile_span('ocr', 'stage', lang=lang):
+        text = image_to_text_with_fallback(img_path=img_path, lang=lang, preview=False, expected_text=expected_text, exact_match=exact_match,
+                                           strategy_key=strategy_key, preprocess=preprocess, fuzzy=fuzzy)
+    if cache_key is not None and text is not None:
+        # 시도 정보는 스레드별로 저장되므로 같은 스레드에서 방금 실행한 OCR의 시도 목록
+        cache.put(cache_key, text, tes.get_last_ocr_attempts())
+    if text:
+        get_script_detector().record(strategy_key, text)
+    return text
+
+
+def format_ocr_cache_stats():
+    """OCR 캐시 통계 한 줄 요약"""
+    stats = get_ocr_cache().stats()
+    return (f"적중 {stats['hits']} / 미스 {stats['misses']} "
+            f"(적중률 {stats['hit_rate'] * 100:.0f}%, {stats['entries']}개, {stats['bytes'] // 1024}KB)")
 
-    return image_to_text_with_fallback(img_path=img_path, lang=lang, preview=False, expected_text=expected_text, exact_match=exact_match)
+
+def format_ocr_strategy_stats():
+    """OCR 전략 학습 통계 한 줄 요약"""
+    stats = get_strategy_store().stats()
+    return (f"학습 변형 적중 {stats['hits']} / 미스 {stats['misses']} "
+            f"(적중률 {stats['hit_rate'] * 100:.0f}%, {stats['entries']}개 영역)")
 
 
 def load_config():
@@ -93,6 +222,25 @@ def load_config():
     return False
 
 
+def apply_engine_settings(settings):
+    """OCR/화면 캡처/산출물 관련 설정(config.json)을 각 모듈에 반영 (GUI와 헤드리스 실행 공용)"""
+    # 환경변수(PBBAUTO_CAPTURE/PBBAUTO_REPLAY)로 지정한 캡처 백엔드가 설정보다 우선
+    if not os.environ.get('PBBAUTO_CAPTURE') and not os.environ.get('PBBAUTO_REPLAY'):
+        capture.set_capture_backend(settings.get("capture_backend", "auto"))
+    tes.set_parallel_mode(settings.get("ocr_parallel", False))
+    get_script_detector().enabled = settings.get("ocr_script_detect", True)
+    get_deferred_checks().enabled = settings.get("ocr_deferred", False)
+    # 디버그 모드에서는 모든 캡처 프레임을 디스크에 저장 (평소에는 실패/리포트 프레임만)
+    get_frame_buffer().persist_all = settings.get("debug_mode", False)
+    # 스크린샷 중복 제거/보관 정책
+    get_artifact_store().dedup = settings.get("screenshot_dedup", True)
+    get_artifact_store().policy = RetentionPolicy.from_settings(settings)
+    configure_text_matcher(settings.get("fuzzy_normalize"), settings.get("fuzzy_threshold"))
+    # 단계/OCR 구간 프로파일링 (환경변수 PBBAUTO_PROFILE로 켠 경우는 유지)
+    get_profiler().enabled = (bool(settings.get("profile_enabled", False))
+                              or os.environ.get('PBBAUTO_PROFILE', '') not in ('', '0'))
+
+
 def save_config(tesseract_path):
     """Save current tesseract path to config.json."""
     config_path = os.path.join(current_dir, 'config.json')
@@ -0,0 +1,176 @@
+"""
+대상 윈도우 좌표 캐시 - 명령어마다 윈도우 목록을 훑지 않고 좌표 조회
+
+CommandProcessor.get_current_window_coords와 마우스 추적 타이머(100ms)가 호출마다
+드롭다운 텍스트를 읽고 pygetwindow.getWindowsWithTitle로 모든 최상위 윈도우를 훑었습니다.
+
+- 대상 윈도우 제목은 드롭다운이 바뀔 때만 갱신 (set_target) → 실행 스레드가 Qt 위젯을 읽지 않음
+- 찾은 윈도우 객체(핸들)와 좌표를 캐시하고 TTL이 지나면 같은 핸들에서 좌표만 다시 읽음
+  (창이 닫혔거나 제목이 바뀐 경우에만 윈도우 목록을 다시 훑음)
+- Windows에서는 이동/크기 변경 이벤트(EVENT_OBJECT_LOCATIONCHANGE)를 받아 즉시 캐시 무효화
+  (install_move_hook, 메시지 루프가 있는 GUI 스레드에서 호출) → 이벤트를 받는 동안은 TTL을 길게 사용
+"""
+
+# 로그 설정을 가장 먼저 import
+import logger_setup
+
+import sys
+import time
+import threading
+
+try:
+    import pygetwindow as gw
+except (ImportError, NotImplementedError):
+    gw = None  # Linux 등 pygetwindow 미지원 환경 (헤드리스 실행은 고정 영역 사용)
+
+# 좌표 캐시 유지 시간 (이동 이벤트를 받지 못하는 환경 / 이벤트를 받는 환경)
+DEFAULT_TTL = 0.25
+HOOKED_TTL = 2.0
+
+
+def _window_rect(window):
+    """윈도우 객체 → (left, top, width, height)"""
+    box = getattr(window, 'box', None)
+    if box is not None:
+        return tuple(int(v) for v in box)
+    return window.left, window.top, window.width, window.height
+
+
+class WindowGeometry:
+    """대상 윈도우 핸들/좌표 캐시
+
+    Args:
+        ttl: 좌표 캐시 유지 시간 (초)
+    """
+
+    def __init__(self, ttl=DEFAULT_TTL):
+        self.ttl = ttl
+        self.target = None  # 드롭다운에서 선택한 윈도우 제목 (None이면 호출자가 제목 전달)
+        self.fixed = None   # 고정 영역 (left, top, width, height) - 헤드리스/리플레이 실행용, 지정하면 윈도우를 찾지 않음
+        self._window = None
+        self._title = None
+        self._rect = None
+        self._checked_at = 0.0
+        self._lock = threading.Lock()
+        self._hook = None
+        self.lookups = 0     # 윈도우 목록 조회 횟수
+        self.refreshes = 0   # 같은 핸들에서 좌표만 다시 읽은 횟수
+        self.hits = 0
+
+    def set_target(self, title):
+        """대상 윈도우 변경 (드롭다운 선택 변경 시)"""
+        with self._lock:
+            self.target = title or None
+            if self._title != self.target:
+                self._window = None
+                self._rect = None
+
+    def set_fixed(self, rect):
+        """윈도우 대신 고정 영역 사용 (None이면 해제)"""
+        with self._lock:
+            self.fixed = tuple(rect) if rect else None
+
+    def invalidate(self):
+        """좌표 캐시 무효화 (이동/크기 변경 알림)"""
+        with self._lock:
+            self._checked_at = 0.0
+
+    def _lookup(self, title):
+        """윈도우 목록에서 제목으로 찾기 (잠금 안에서 호출)"""
+        self.lookups += 1
+        windows = gw.getWindowsWithTitle(title) if gw is not None else []
+        self._window = windows[0] if windows else None
+        self._title = title
+        self._rect = _window_rect(self._window) if self._window is not None else None
+        self._checked_at = time.monotonic()
+
+    def window(self, title=None):
+        """대상 윈도우 객체 (없으면 None)"""
+        title = title or self.target
+        if not title:
+            return None
+        with self._lock:
+            if self._window is None or self._title != title:
+                self._lookup(title)
+            return self._window
+
+    def coords(self, title=None):
+        """대상 윈도우 (left, top, width, height) - 없으면 None (고정 영역이 있으면 고정 영역)
+
+        Args:
+            title: 윈도우 제목 (생략하면 set_target으로 지정한 대상)
+        """
+        if self.fixed is not None:
+            return self.fixed
+        title = title or self.target
+        if not title:
+            return None
+        with self._lock:
+            now = time.monotonic()
+            if self._title == title and now - self._checked_at < self.ttl:
+                self.hits += 1
+                return self._rect
+            if self._window is not None and self._title == title:
+                # 같은 핸들에서 좌표만 다시 읽음 (창이 닫혔거나 제목이 바뀌었으면 다시 찾기)
+                try:
+                    if self._window.title == title:
+                        self._rect = _window_rect(self._window)
+                        self._checked_at = now
+                        self.refreshes += 1
+                        return self._rect
+                except Exception:
+                    pass
+            self._lookup(title)
+            return self._rect
+
+    def install_move_hook(self):
+        """Windows 이동/크기 변경 이벤트로 캐시 무효화 (GUI 스레드에서 호출, 실패하면 TTL만 사용)"""
+        if sys.platform != 'win32' or self._hook is not None:
+            return False
+        try:
+            import ctypes
+            from ctypes import wintypes
+
+            EVENT_OBJECT_LOCATIONCHANGE = 0x800B
+            WINEVENT_OUTOFCONTEXT = 0x0000
+            OBJID_WINDOW = 0
+            callback_type = ctypes.WINFUNCTYPE(None, wintypes.HANDLE, wintypes.DWORD, wintypes.HWND,
+                                               wintypes.LONG, wintypes.LONG, wintypes.DWORD, wintypes.DWORD)
+
+            def on_event(hook, event, hwnd, id_object, id_child, thread_id, event_time):
+                if id_object != OBJID_WINDOW:
+                    return
+                window = self._window
+                if window is not None and getattr(window, '_hWnd', None) == hwnd:
+                    self.invalidate()
+
+            user32 = ctypes.WinDLL('user32', use_last_error=True)
+            user32.SetWinEventHook.restype = wintypes.HANDLE
+            user32.SetWinEventHook.argtypes = [wintypes.DWORD, wintypes.DWORD, wintypes.HMODULE, callback_type,
+                                               wintypes.DWORD, wintypes.DWORD, wintypes.DWORD]
+            callback = callback_type(on_event)
+            handle = user32.SetWinEventHook(EVENT_OBJECT_LOCATIONCHANGE, EVENT_OBJECT_LOCATIONCHANGE,
+                                            None, callback, 0, 0, WINEVENT_OUTOFCONTEXT)
+            if not handle:
+                return False
+            self._hook = (handle, callback)  # 콜백이 GC되지 않도록 보관
+            self.ttl = max(self.ttl, HOOKED_TTL)
+            print("윈도우 이동 이벤트 감지 사용 (좌표 캐시)")
+            return True
+        except Exception as e:
+            print(f"윈도우 이동 이벤트 감지 실패 (TTL 캐시만 사용): {e}")
+            return False
+
+    def stats(self):
+        with self._lock:
+            return {'lookups': self.lookups, 'refreshes': self.refreshes, 'hits': self.hits,
+                    'hooked': self._hook is not None}
+
+
+# 전역 윈도우 좌표 캐시
+_window_geometry = WindowGeometry()
+
+
+def get_window_geometry():
+    """전역 윈도우 좌표 캐시 반환"""
+    return _window_geometry